@@ -0,0 +1,223 @@
+"""
+API Budget (daily quotas + response cache) for the hybrid news providers
+The free plans only allow so many requests per day:
+    NewsAPI: 100/day    GNews: 100/day    NewsData: 200/day
+Without bookkeeping, one heavy user can spend the whole day's budget before
+lunch and every later search gets nothing.
+
+This file keeps three things on disk (SQLite, under NEWS_DATA_DIR):
+- A usage ledger: how many requests each API key made today (UTC).
+- A response cache: the same provider + query + params within the TTL is
+  answered from disk and costs no quota at all.
+- A scheduler: splits what is left of today's quota across the queued
+  queries by priority, and holds some back for the rest of the day.
+"""
+
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_PATH = os.path.join(os.environ.get("NEWS_DATA_DIR", ".news_data"), "api_budget.sqlite")
+
+DAILY_QUOTAS = {"NewsAPI": 100, "GNews": 100, "NewsData": 200}
+
+# Params that identify the caller, not the request (never part of a cache key)
+_SECRET_PARAMS = {"apiKey", "apikey", "token"}
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    return sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+
+
+def _key_id(api_key: str) -> str:
+    # We never store the raw key, only a short hash of it.
+    return hashlib.sha1((api_key or "").encode("utf-8")).hexdigest()[:12]
+
+
+def _today() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+# ==============================
+# USAGE LEDGER
+# ==============================
+class UsageLedger:
+    """Requests used per (provider, API key, UTC day)."""
+
+    def __init__(self, path: str = DEFAULT_PATH, quotas: Optional[Dict[str, int]] = None):
+        self.quotas = {**DAILY_QUOTAS, **(quotas or {})}
+        self._lock = threading.Lock()
+        self._conn = _connect(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS usage (
+                provider TEXT NOT NULL,
+                key_id TEXT NOT NULL,
+                day TEXT NOT NULL,
+                used INTEGER NOT NULL,
+                PRIMARY KEY (provider, key_id, day)
+            )
+        """)
+
+    def used(self, provider: str, api_key: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT used FROM usage WHERE provider = ? AND key_id = ? AND day = ?",
+                (provider, _key_id(api_key), _today())).fetchone()
+        return row[0] if row else 0
+
+    def remaining(self, provider: str, api_key: str) -> int:
+        return max(0, self.quotas.get(provider, 0) - self.used(provider, api_key))
+
+    def try_consume(self, provider: str, api_key: str, n: int = 1) -> bool:
+        """Book `n` requests if today's quota allows it. Safe across threads and processes."""
+        quota = self.quotas.get(provider, 0)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                key = (provider, _key_id(api_key), _today())
+                row = self._conn.execute(
+                    "SELECT used FROM usage WHERE provider = ? AND key_id = ? AND day = ?", key).fetchone()
+                used = row[0] if row else 0
+                if used + n > quota:
+                    self._conn.execute("ROLLBACK")
+                    return False
+                self._conn.execute(
+                    """INSERT INTO usage (provider, key_id, day, used) VALUES (?, ?, ?, ?)
+                       ON CONFLICT(provider, key_id, day) DO UPDATE SET used = used + ?""",
+                    (*key, n, n))
+                self._conn.execute("COMMIT")
+                return True
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+
+# ==============================
+# RESPONSE CACHE
+# ==============================
+def cache_key(provider: str, params: Dict) -> str:
+    """Provider + normalized query + the other params (keys removed, order ignored)."""
+    clean = {k: v for k, v in params.items() if k not in _SECRET_PARAMS}
+    if "q" in clean:
+        clean["q"] = " ".join(str(clean["q"]).lower().split())
+    raw = json.dumps([provider, sorted((k, str(v)) for k, v in clean.items())])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Provider JSON responses on disk, valid for `ttl` seconds. Expired
+    responses are deleted when the cache opens and then about once per `ttl`
+    while storing new ones, so the file doesn't grow forever.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, ttl: float = 3 * 3600):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._purged_at = 0.0
+        self._conn = _connect(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                cache_key TEXT PRIMARY KEY,
+                stored_at REAL NOT NULL,
+                body BLOB NOT NULL
+            )
+        """)
+        self.purge_expired()
+
+    def get(self, provider: str, params: Dict) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT stored_at, body FROM responses WHERE cache_key = ?",
+                                     (cache_key(provider, params),)).fetchone()
+        if not row or time.time() - row[0] > self.ttl:
+            return None
+        return json.loads(zlib.decompress(row[1]).decode("utf-8"))
+
+    def put(self, provider: str, params: Dict, data: Dict):
+        blob = zlib.compress(json.dumps(data).encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (cache_key, stored_at, body) VALUES (?, ?, ?)",
+                (cache_key(provider, params), time.time(), blob))
+        if time.time() - self._purged_at > self.ttl:
+            self.purge_expired()
+
+    def purge_expired(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE stored_at < ?", (time.time() - self.ttl,))
+            self._purged_at = time.time()
+
+
+# ==============================
+# SCHEDULER
+# ==============================
+class BudgetScheduler:
+    """
+    Decides how many pages each queued query may spend per provider.
+    - Keeps `reserve_ratio` of the quota that belongs to the rest of the day
+      untouched, so the providers don't go dark before midnight (UTC).
+    - Hands out the spendable pages by priority: bigger share first,
+      but never more than `max_pages` per query.
+    """
+
+    def __init__(self, ledger: UsageLedger, reserve_ratio: float = 0.5, max_pages: int = 3):
+        self.ledger = ledger
+        self.reserve_ratio = reserve_ratio
+        self.max_pages = max_pages
+
+    def spendable(self, provider: str, api_key: str) -> int:
+        now = datetime.now(timezone.utc)
+        day_left = 1 - (now.hour * 3600 + now.minute * 60 + now.second) / 86400
+        reserve = math.ceil(self.ledger.quotas.get(provider, 0) * day_left * self.reserve_ratio)
+        return max(0, self.ledger.remaining(provider, api_key) - reserve)
+
+    def allocate(self, provider: str, api_key: str, queued: List[Tuple[str, float]],
+                 max_pages: Optional[int] = None) -> Dict[str, int]:
+        """
+        queued = [(query, priority), ...] -> {query: pages allowed}.
+        `max_pages` lowers the per-query cap for this provider (e.g. when its
+        plan returns no results past a certain page).
+        """
+        cap = self.max_pages if max_pages is None else min(max_pages, self.max_pages)
+        budget = self.spendable(provider, api_key)
+        plan = {query: 0 for query, _ in queued}
+        ranked = sorted(queued, key=lambda qp: -qp[1])
+        total_priority = sum(max(p, 0) for _, p in ranked) or 1
+        # First pass: proportional share (at least one page while budget lasts)
+        for query, priority in ranked:
+            share = max(1, round(budget * max(priority, 0) / total_priority))
+            pages = min(share, cap, budget)
+            plan[query] = pages
+            budget -= pages
+        # Second pass: leftovers go to the highest priorities first
+        for query, _ in ranked:
+            extra = min(cap - plan[query], budget)
+            plan[query] += extra
+            budget -= extra
+        return plan
+
+
+_default_lock = threading.Lock()
+_defaults = {}
+
+
+def default_ledger() -> UsageLedger:
+    with _default_lock:
+        if "ledger" not in _defaults:
+            _defaults["ledger"] = UsageLedger()
+        return _defaults["ledger"]
+
+
+def default_cache() -> ResponseCache:
+    with _default_lock:
+        if "cache" not in _defaults:
+            _defaults["cache"] = ResponseCache()
+        return _defaults["cache"]
@@ -1,4 +1,6 @@
 import os
+import html
+import importlib.util
 import time
 import random
 import json
@@ -8,40 +10,36 @@ import feedparser
 from bs4 import BeautifulSoup
 from newspaper import Article
 import streamlit as st
-from huggingface_hub import InferenceClient
 import pandas as pd
 from io import BytesIO
-from docx import Document
-import base64
 import streamlit.components.v1 as components
 from collections import defaultdict, Counter
 from urllib.parse import urlparse, parse_qs
 from datetime import date, timedelta  # 🆕 for date bucketing
+from dedupe import SyndicationIndex
+from seen_index import SeenIndex, canonical_url, scope_key
+from article_pipeline import ArticlePipeline, DomainPoliteness
+from concurrent.futures import Future
+from summarizer import DEFAULT_MODEL, SummarizationService, hf_backend, summary_or_error
+from extractive_summarizer import LocalSummarizer
+from export_cache import DOCX_MIME, XLSX_MIME, result_fingerprint
+from export_sinks import open_sinks
+from run_history import RunHistory, run_label
+from docx_report import word_basic, word_grouped
+from cluster_matcher import ClusterMatcher, classify_article, classify_batch, cluster_body_counts, compile_patterns
 
 # ======================
 # Hugging Face Setup
 # ======================
-client = InferenceClient(
-    provider="hf-inference",
-    api_key=os.environ.get("xdpooja", "")
-)
-
-def summarize_text(text: str) -> str:
-    if not text or not text.strip():
-        return "No content to summarize."
-    try:
-        result = client.summarization(text, model="Falconsai/text_summarization")
-        if hasattr(result, "summary_text"):
-            return result.summary_text
-        if isinstance(result, list) and result:
-            first = result[0]
-            if isinstance(first, dict) and "summary_text" in first:
-                return first["summary_text"]
-        if isinstance(result, dict) and "summary_text" in result:
-            return result["summary_text"]
-        return str(result)
-    except Exception as e:
-        return f"Error: {e}"
+# One summarization service per process and backend: disk-cached, max 4 requests
+# at once, and failures come back as SummarizationError (never stored as summary text).
+# "local" is the offline extractive summarizer (extractive_summarizer.py).
+@st.cache_resource
+def get_summarizer(kind: str = "remote"):
+    if kind == "local":
+        backend = LocalSummarizer("textrank")
+        return SummarizationService(backend, model=backend.name, max_concurrency=4, max_input_tokens=4000)
+    return SummarizationService(hf_backend(DEFAULT_MODEL), model=DEFAULT_MODEL, max_concurrency=4)
 
 # ======================
 # User-Agents
@@ -229,8 +227,33 @@ def fetch_article_content_adv(url: str) -> str:
 
 # ======================
 # ADVANCED MODE: clusters + matching
-# (unchanged)
+# (term matching and scoring live in cluster_matcher.py)
 # ======================
+# Field weights: a body match counts 4x a headline match
+CLASSIFY_WEIGHTS = dict(w_title=1.0, w_source=1.0, w_url=0.5, w_body=4.0)
+
+def mentions_india(text: str) -> bool:
+    text = (text or "").lower()
+    return ("india" in text) or ("indian" in text)
+
+def entry_description(entry) -> str:
+    """RSS description as plain text (Google News puts a little HTML in it)."""
+    raw = getattr(entry, "summary", None) or (entry.get("summary") if isinstance(entry, dict) else "") or ""
+    return html.unescape(re.sub(r"<[^>]+>", " ", raw))
+
+def prefilter_misses(title: str, source: str, description: str, india_only: bool, matcher=None) -> set:
+    """
+    Which filters an entry fails using only its RSS fields (no network):
+    "india" (India filter on, India not mentioned) and/or "cluster" (no cluster term).
+    """
+    text = " ".join([title or "", source or "", description or ""])
+    misses = set()
+    if india_only and not mentions_india(text):
+        misses.add("india")
+    if matcher is not None and not matcher.cluster_counts(text).any():
+        misses.add("cluster")
+    return misses
+
 def split_terms(s: str):
     if not isinstance(s, str):
         s = str(s)
@@ -279,67 +302,8 @@ def normalize_clusters(obj: dict) -> dict:
                         clusters[str(k)].add(term.lower())
     return {k: sorted(t for t in v if isinstance(t, str) and t.strip()) for k, v in clusters.items() if v}
 
-def _flex(term: str) -> str:
-    t = term.lower()
-    t = t.replace("e-cigarette", r"e[ -]?cigarette")
-    t = t.replace("heat-not-burn", r"heat[ -]?not[ -]?burn")
-    t = t.replace("smoke-free", r"smoke[ -]?free")
-    t = t.replace("nicotine pouch", r"nicotine[ -]?pouch")
-    t = t.replace("heatnotburn", r"heat[ -]?not[ -]?burn")
-    return t
-
-def compile_patterns(cluster_dict: dict):
-    compiled = {}
-    for cluster, terms in (cluster_dict or {}).items():
-        pats = []
-        for t in terms or []:
-            t = str(t or "").strip()
-            if not t:
-                continue
-            pat = _flex(t)
-            try:
-                if re.match(r"^[a-z0-9\-\.]+$", t.lower()):
-                    pats.append(re.compile(rf"\b{pat}\b", re.IGNORECASE))
-                else:
-                    pats.append(re.compile(pat, re.IGNORECASE))
-            except re.error:
-                continue
-        if pats:
-            compiled[cluster] = pats
-    return compiled
-
-def count_matches(text: str, pats) -> int:
-    if not text:
-        return 0
-    total = 0
-    for p in pats:
-        try:
-            total += len(p.findall(text))
-        except Exception:
-            total += 1 if p.search(text) else 0
-    return total
-
-def classify_article(title, source, link, article_text, compiled_clusters,
-                     w_title=1.0, w_source=1.0, w_url=0.5, w_body=4.0):
-    title = title or ""; source = source or ""; link = link or ""; body = article_text or ""
-    scores = {}
-    for cluster, pats in compiled_clusters.items():
-        s = 0.0
-        s += w_title  * count_matches(title,  pats)
-        s += w_source * count_matches(source, pats)
-        s += w_url    * count_matches(link,   pats)
-        s += w_body   * count_matches(body,   pats)
-        if s > 0:
-            scores[cluster] = s
-    if not scores:
-        return None, 0.0, {}
-    best = max(scores.values())
-    tied = [k for k, v in scores.items() if v == best]
-    primary = sorted(tied)[0]
-    return primary, scores[primary], scores
-
 # ======================
-# EXPORTS (unchanged)
+# EXPORTS
 # ======================
 def generate_excel(df: pd.DataFrame) -> bytes:
     buf = BytesIO()
@@ -352,42 +316,29 @@ def generate_excel(df: pd.DataFrame) -> bytes:
         df_out.to_excel(writer, index=False, sheet_name="News")
     return buf.getvalue()
 
+# Word reports are written in bulk by docx_report.py (same documents as the
+# old python-docx loops, a lot faster on big result sets).
 def generate_word_basic(df: pd.DataFrame) -> bytes:
-    doc = Document()
-    doc.add_heading("News Articles", 0)
-    for _, row in df.iterrows():
-        doc.add_heading(row.get('Headline', 'Untitled'), level=1)
-        doc.add_paragraph(f"Source: {row.get('Source','')}")
-        doc.add_paragraph(f"Date: {row.get('Published','')}")
-        doc.add_paragraph(f"Link: {row.get('Link','')}")
-        doc.add_paragraph("Article:", style="Intense Quote")
-        doc.add_paragraph(str(row.get('Article', "")))
-        doc.add_paragraph("Summary:", style="Intense Quote")
-        doc.add_paragraph(str(row.get('Summary', "")))
-        doc.add_paragraph("\n---\n")
-    buf = BytesIO(); doc.save(buf); return buf.getvalue()
+    return word_basic(df)
 
 def generate_word_grouped(df: pd.DataFrame, top_n_per_cluster: int = 5) -> bytes:
-    doc = Document()
-    doc.add_heading("Clustered News Report", 0)
-    if df.empty or "PrimaryCluster" not in df.columns:
-        doc.add_paragraph("No clustered data available.")
-        buf = BytesIO(); doc.save(buf); return buf.getvalue()
-    for cluster in sorted(df["PrimaryCluster"].dropna().unique()):
-        cluster_df = df[df["PrimaryCluster"] == cluster].copy()
-        if cluster_df.empty:
-            continue
-        doc.add_heading(cluster, level=1)
-        doc.add_heading(f"Top {top_n_per_cluster} Articles", level=2)
-        top_articles = (cluster_df.sort_values(["RelevanceScore","Published"], ascending=[False, True]).head(top_n_per_cluster))
-        for _, row in top_articles.iterrows():
-            doc.add_heading(row.get("Headline","Untitled"), level=3)
-            doc.add_paragraph(f"Source: {row.get('Source','')}")
-            doc.add_paragraph(f"Date: {row.get('Published','')}")
-            doc.add_paragraph(f"Link: {row.get('Link','')}")
-            doc.add_paragraph("Summary:", style="Intense Quote")
-            doc.add_paragraph(row.get("Summary","") or "-")
-    buf = BytesIO(); doc.save(buf); return buf.getvalue()
+    return word_grouped(df, top_n_per_cluster)
+
+@st.cache_resource
+def get_seen_index():
+    """One seen-article index for the whole process (shared by all sessions)."""
+    return SeenIndex()
+
+@st.cache_resource
+def get_run_history():
+    """Saved runs on disk (run_history.py); None when pyarrow isn't installed."""
+    try:
+        history = RunHistory()
+    except ImportError:
+        return None
+    # Once per start: drop bodies no saved run uses once they are half the text file
+    history.compact(min_waste=0.5)
+    return history
 
 # ======================
 # UI — Header
@@ -450,6 +401,28 @@ if mode == "Advanced v2 (clusters + scoring)":
 
     st.sidebar.caption("This loader accepts UDAN-style JSON or simple {cluster:[terms]} JSON.")
 
+summarizer_choice = st.sidebar.radio(
+    "Summaries",
+    ["Hugging Face model (remote)", "Local key sentences (fast, offline)"],
+    index=0,
+    help="The local summarizer picks the most important sentences on this machine: no network, thousands per minute."
+)
+
+# Past runs: every finished run is saved, so a refresh or restart doesn't mean re-scraping
+history = get_run_history()
+if history is not None:
+    past_runs = history.list_runs(limit=30, app="app")
+    with st.sidebar.expander("📚 Past runs", expanded=False):
+        if not past_runs:
+            st.caption("Finished runs show up here.")
+        else:
+            picked = st.selectbox("Saved run", past_runs, format_func=run_label, label_visibility="collapsed")
+            if st.button("Load this run"):
+                started = time.perf_counter()
+                st.session_state.data = history.load(picked, with_text="Article")
+                st.session_state.data_clusters = picked.get("clusters")
+                st.success(f"Loaded {len(st.session_state.data)} articles in {time.perf_counter() - started:.2f}s.")
+
 # ======================
 # Search Controls
 # ======================
@@ -464,6 +437,12 @@ with col2:
     duration = st.number_input("Duration (in days, up to 365)", min_value=1, max_value=365, value=1)
 with col3:
     india_only = st.checkbox("India-focused filter", value=False, help="Keep articles that mention India/Indian")
+    prefilter = st.selectbox(
+        "Pre-filter before download", ["Off", "Recall", "Strict"], index=0,
+        help="Check the India filter and (Advanced) cluster terms on the RSS title, source and description first. "
+             "Strict: entries that fail are skipped, no download. "
+             "Recall: they are still downloaded and kept if the article body matches; otherwise they are not summarized."
+    )
 
 # 🆕 Fetch-all controls
 st.markdown("")
@@ -475,11 +454,36 @@ with cfa2:
 
 st.divider()
 
+# ======================
+# Streaming exports (written while the run is going, see export_sinks.py)
+# ======================
+EXPORT_DIR = os.path.join(os.environ.get("NEWS_DATA_DIR", ".news_data"), "exports")
+STREAM_FORMATS = ("csv", "jsonl", "parquet") if importlib.util.find_spec("pyarrow") else ("csv", "jsonl")
+
+def export_base_path(query: str) -> str:
+    name = re.sub(r"[^A-Za-z0-9]+", "_", query or "").strip("_")[:60] or "news"
+    return os.path.join(EXPORT_DIR, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}")
+
+def export_columns(mode: str):
+    columns = ["Source", "Published", "Headline", "Link", "Article", "Summary"]
+    if mode.startswith("Advanced"):
+        columns += ["PrimaryCluster", "RelevanceScore", "MatchedClusters"]
+    return columns
+
 # ======================
 # Run button (label adapts to mode)
 # ======================
 btn_label = "📡 Fetch News (Basic v1)" if mode.startswith("Basic") else "📡 Fetch & Classify News (Advanced v2)"
 show_raw_article = st.checkbox("Show full article text in expanders", value=False)
+incremental = st.checkbox(
+    "Incremental run (reuse articles processed in earlier runs)", value=False,
+    help="Articles resolved, scraped and summarized for this query in the last 2 days are taken from the local index; only new ones hit the network."
+)
+
+stream_to_disk = st.checkbox(
+    "Write results to disk as they finish (CSV + JSONL" + (" + Parquet)" if "parquet" in STREAM_FORMATS else ")"), value=False,
+    help=f"Each finished article is appended under {EXPORT_DIR}. Memory use stays flat and an interrupted run still leaves usable files."
+)
 
 if st.button(btn_label):
     # 🆕 choose fetch strategy
@@ -489,19 +493,33 @@ if st.button(btn_label):
     else:
         entries = fetch_feed(query, int(duration))
 
-    results = []
     progress = st.progress(0)
     status = st.empty()
 
     # advanced compilers if needed
     if mode.startswith("Advanced"):
-        compiled = compile_patterns(st.session_state.get("clusters", DEFAULT_CLUSTERS))
-
-    total = max(1, len(entries))
+        # Matcher that only runs the terms that can match (see cluster_matcher.py)
+        compiled = ClusterMatcher(compile_patterns(st.session_state.get("clusters", DEFAULT_CLUSTERS)))
+
+    # Wire stories (PTI/Reuters/AP) show up on many outlets with the same body.
+    # Only the first copy (the canonical) is summarized; the other copies reuse
+    # its summary. Cluster matching still scores every copy's own body (copies
+    # are only ~70% alike, and matching is cheap), unless the text is identical.
+    syndication = SyndicationIndex()
+    canonical_work = {}
+    reused = 0
+
+    # Seen-article index: skip decode/scrape/summarize for articles from earlier runs
+    seen = get_seen_index() if incremental else None
+    scope = scope_key(mode, query)
+    from_index = 0
+
+    # Read the feed entries and look each one up in the seen index (cheap, local).
+    # The pre-filter runs here too, before any decode or download.
+    prefilter_matcher = compiled if (prefilter != "Off" and mode.startswith("Advanced")) else None
+    pruned = Counter()
+    jobs = []
     for i, entry in enumerate(entries):
-        progress.progress((i + 1) / total)
-        status.text(f"Processing {i + 1}/{total}")
-
         title = getattr(entry, "title", None) or (entry.get("title") if isinstance(entry, dict) else "")
         source = ""
         if isinstance(entry, dict):
@@ -509,111 +527,260 @@ if st.button(btn_label):
             if isinstance(src, dict):
                 source = src.get("title", "")
         published = getattr(entry, "published", None) or (entry.get("published") if isinstance(entry, dict) else "") or getattr(entry, "updated", "")
-
         raw_link = getattr(entry, "link", None) or (entry.get("link") if isinstance(entry, dict) else "")
-
-        if mode.startswith("Basic"):
-            link = get_article_url_basic(raw_link) if raw_link else raw_link
-            article = fetch_article_content_basic(link) if link else ""
-        else:
-            link = get_article_url_adv(raw_link) if raw_link else raw_link
-            article = fetch_article_content_adv(link) if link else ""
-
+        misses = set()
+        if prefilter != "Off":
+            misses = prefilter_misses(title, source, entry_description(entry), india_only, prefilter_matcher)
+            if misses and prefilter == "Strict":
+                pruned.update(misses)
+                pruned["entries"] += 1
+                continue
+        cached, matched_by = seen.lookup(scope, raw_link, title, source) if seen else (None, None)
+        jobs.append({"index": i, "title": title, "source": source, "published": published,
+                     "raw_link": raw_link, "link": raw_link, "article": "",
+                     "cached": cached, "matched_by": matched_by, "misses": misses})
+
+    basic = mode.startswith("Basic")
+    resolve_url = get_article_url_basic if basic else get_article_url_adv
+    extract_text = fetch_article_content_basic if basic else fetch_article_content_adv
+    # Per-website politeness replaces the old sleep after every article.
+    politeness = DomainPoliteness()
+
+    # --- worker threads: no Streamlit calls in here ---
+    def resolve_step(job):
+        cached = job["cached"]
+        if cached and job["matched_by"] == "url":
+            # Exactly this article was processed before: no network at all.
+            job["link"] = cached["link"]
+        elif job["raw_link"]:
+            with politeness.slot(job["raw_link"]):
+                job["link"] = resolve_url(job["raw_link"])
+
+    def fetch_step(job):
+        cached = job["cached"]
+        if cached and job["matched_by"] == "title" and canonical_url(job["link"]) != canonical_url(cached["link"]):
+            # Same headline, different page (often another outlet): its stored body is not this article's
+            job["cached"] = cached = None
+        if cached:
+            job["article"] = cached["article"]
+        elif job["link"]:
+            with politeness.slot(job["link"]):
+                job["article"] = extract_text(job["link"])
+
+    def summarize_step(job):
+        summary_done = job["summary_done"]
+        article = job["article"]
+        if article == "Content could not be extracted.":
+            article = ""
+        job["summary"], job["summary_error"] = summary_or_error(summarizer.summarize, article)
+        summary_done.set_result((job["summary"], job["summary_error"]))
+
+    # --- gate: runs here, in feed order, so filters and syndication match a serial run ---
+    def gate(job):
+        title, source, article = job["title"], job["source"], job["article"]
         if india_only:
             haystack = " ".join([title or "", source or "", article or ""]).lower()
             if ("india" not in haystack) and ("indian" not in haystack):
-                continue
+                if "india" in job["misses"]:
+                    # Recall pre-filter: the body didn't supply India either
+                    pruned["india"] += 1
+                    pruned["entries"] += 1
+                return "drop"
+        # Recall pre-filter: the resolved URL or the body has to supply the cluster
+        # match the RSS fields didn't (both are scored by classify_article)
+        if "cluster" in job["misses"]:
+            job["body_counts"] = cluster_body_counts(article, compiled)
+            if not compiled.cluster_counts(job["link"] or "").any() and not any(job["body_counts"].values()):
+                pruned["cluster"] += 1
+                pruned["entries"] += 1
+                return "drop"
+
+        canonical = syndication.add(job["index"], article)
+        job["canonical"] = canonical
+        job["is_canonical"] = canonical not in canonical_work
+        if not job["is_canonical"]:
+            job["summary_done"], canonical_article, canonical_counts = canonical_work[canonical]
+            if "body_counts" not in job:
+                job["body_counts"] = canonical_counts if article == canonical_article else (
+                    cluster_body_counts(article, compiled) if not basic else None)
+            if job["summary_done"].done():
+                job["summary"], job["summary_error"] = job["summary_done"].result()
+                return "done"
+
+            # Finish when the canonical's summary is ready, without holding a summarize thread
+            def take_summary(done, job=job):
+                job["summary"], job["summary_error"] = done.result()
+            job["summary_done"].add_done_callback(take_summary)
+            return job["summary_done"]
+
+        job["summary_done"] = Future()
+        if "body_counts" not in job:
+            job["body_counts"] = cluster_body_counts(article, compiled) if not basic else None
+        canonical_work[canonical] = (job["summary_done"], article, job["body_counts"])
+        if job["cached"]:
+            job["summary"] = job["cached"]["summary"]
+            job["summary_done"].set_result((job["summary"], None))
+            return "done"
+        return "summarize"
+
+    summarizer = get_summarizer("local" if summarizer_choice.startswith("Local") else "remote")
+    pipeline = ArticlePipeline(resolve_step, fetch_step, summarize_step, summarize_workers=4)
+    total = max(1, len(jobs))
+    if pruned["entries"]:
+        # Strict only (Recall drops happen during the run and are in the final summary)
+        status.text(f"Pre-filter skipped {pruned['entries']} of {len(entries)} entries on their RSS fields, before download")
+    rows = []
+    # Articles arrive in completion order; each one is shown as soon as it is ready.
+    # Optional: every finished article is also appended to files on disk right away
+    sink = open_sinks(export_base_path(query), STREAM_FORMATS, export_columns(mode)) if stream_to_disk else None
+    try:
+        for job in pipeline.run(jobs, gate):
+            progress.progress(pipeline.finished / total)
+            status.text(f"Processing {pipeline.finished}/{total}")
+
+            title, source, published = job["title"], job["source"], job["published"]
+            link, article, summary = job["link"], job["article"], job.get("summary", "")
+            cached = job["cached"]
+
+            if not job["is_canonical"]:
+                reused += 1
+            if cached:
+                from_index += 1
+            elif seen and article != "Content could not be extracted." and not job.get("summary_error") and not job.get("error"):
+                seen.record(scope, {"link": link, "article": article, "summary": summary},
+                            link=job["raw_link"], title=title, source=source)
+
+            row = {
+                "Source": source,
+                "Published": published,
+                "Headline": title,
+                "Link": link,
+                "Article": article,
+                "Summary": summary
+            }
 
-        summary = summarize_text(article)
-
-        row = {
-            "Source": source,
-            "Published": published,
-            "Headline": title,
-            "Link": link,
-            "Article": article,
-            "Summary": summary
-        }
-
-        if mode.startswith("Advanced"):
-            primary_cluster, relevance, matches = classify_article(
-                title, source, link, article, compiled,
-                w_title=1.0, w_source=1.0, w_url=0.5, w_body=4.0
-            )
-            matched_names_sorted = [k for k, _ in sorted(matches.items(), key=lambda kv: kv[1], reverse=True)] if matches else []
-            row.update({
-                "PrimaryCluster": primary_cluster,
-                "RelevanceScore": relevance,
-                "MatchedClusters": matched_names_sorted
-            })
-
-        results.append(row)
-
-        with st.expander(f"📰 {title}"):
-            st.caption(f"Source: {source}")
-            st.caption(f"Date: {published}")
-            if link:
-                st.markdown(f"[Read original article]({link})")
             if mode.startswith("Advanced"):
-                st.caption(f"Primary Cluster: {row.get('PrimaryCluster','-')}  |  Score: {row.get('RelevanceScore',0):.1f}")
-                mc = row.get("MatchedClusters") or []
-                st.caption(f"Matched: {', '.join(mc) or '-'}")
-            if show_raw_article:
-                st.markdown("**Article:**"); st.write(article)
-            st.markdown("**Summary:**"); st.write(summary)
-
-        time.sleep(0.2 + random.random() * 0.4)
+                primary_cluster, relevance, matches = classify_article(
+                    title, source, link, article, compiled, **CLASSIFY_WEIGHTS,
+                    body_counts=job["body_counts"]
+                )
+                matched_names_sorted = [k for k, _ in sorted(matches.items(), key=lambda kv: kv[1], reverse=True)] if matches else []
+                row.update({
+                    "PrimaryCluster": primary_cluster,
+                    "RelevanceScore": relevance,
+                    "MatchedClusters": matched_names_sorted
+                })
+
+            rows.append((job["index"], row))
+            if sink:
+                sink.write(row)
+
+            with st.expander(f"📰 {title}"):
+                st.caption(f"Source: {source}")
+                st.caption(f"Date: {published}")
+                if link:
+                    st.markdown(f"[Read original article]({link})")
+                if not job["is_canonical"]:
+                    st.caption("Syndicated copy of an earlier article (summary reused).")
+                if mode.startswith("Advanced"):
+                    st.caption(f"Primary Cluster: {row.get('PrimaryCluster','-')}  |  Score: {row.get('RelevanceScore',0):.1f}")
+                    mc = row.get("MatchedClusters") or []
+                    st.caption(f"Matched: {', '.join(mc) or '-'}")
+                if show_raw_article:
+                    st.markdown("**Article:**"); st.write(article)
+                st.markdown("**Summary:**")
+                if job.get("summary_error") or job.get("error"):
+                    st.warning(f"Summary unavailable: {job.get('summary_error') or job['error']}")
+                else:
+                    st.write(summary)
+    finally:
+        if sink:
+            sink.close()
 
+    # Back to feed order, so exports are the same as a one-at-a-time run
+    results = [row for _, row in sorted(rows, key=lambda r: r[0])]
     st.session_state.data = results
+    st.session_state.data_clusters = st.session_state.get("clusters") if mode.startswith("Advanced") else None
+    if history is not None and results:
+        try:
+            history.save(results, query, "app", text_field="Article",
+                         meta={"mode": mode.split(" (")[0], "clusters": st.session_state.data_clusters})
+        except Exception as e:
+            st.warning(f"Could not save this run to history: {e}")
     progress.empty()
-    status.success("Done!")
+    notes = []
+    if reused:
+        notes.append(f"{reused} syndicated copies reused")
+    if from_index:
+        notes.append(f"{from_index} articles from earlier runs")
+    if pruned["entries"]:
+        why = ", ".join(f"{pruned[k]} {label}" for k, label in (("india", "without India"), ("cluster", "without a cluster term")) if pruned[k])
+        where = "skipped before download" if prefilter == "Strict" else "not summarized (no match in RSS fields, URL or body)"
+        notes.append(f"pre-filter: {pruned['entries']} {where}: {why}")
+    status.success(f"Done! ({', '.join(notes)})" if notes else "Done!")
+    if sink:
+        st.caption(f"Streamed {sink.rows} articles to: " + ", ".join(f"`{p}`" for p in sink.paths))
+
+# ======================
+# Reclassify (new cluster config, same articles: no refetch)
+# ======================
+if (mode.startswith("Advanced") and st.session_state.data
+        and st.session_state.get("data_clusters") != st.session_state.get("clusters")):
+    st.info("The cluster config changed since these articles were classified.")
+    if st.button(f"🔁 Reclassify {len(st.session_state.data)} articles with the current clusters"):
+        started = time.perf_counter()
+        df_re = pd.DataFrame(st.session_state.data)
+        field = lambda name: df_re[name].fillna("").astype(str).tolist() if name in df_re.columns else [""] * len(df_re)
+        columns = classify_batch(field("Headline"), field("Source"), field("Link"), field("Article"),
+                                 ClusterMatcher(compile_patterns(st.session_state.clusters)), **CLASSIFY_WEIGHTS)
+        st.session_state.data = df_re.assign(**columns).to_dict("records")
+        st.session_state.data_clusters = st.session_state.clusters
+        st.success(f"Reclassified {len(df_re)} articles in {time.perf_counter() - started:.1f}s.")
 
 # ======================
 # Downloads
 # ======================
+# Files are built only when "Prepare" is clicked, cached per result set, and
+# served by st.download_button (no base64 copies in the page).
+@st.cache_resource(max_entries=8, show_spinner="Building file…")
+def build_export(kind: str, fingerprint: str, _rows) -> bytes:
+    df = pd.DataFrame(_rows)
+    if kind == "xlsx":
+        return generate_excel(df)
+    if kind == "docx_grouped":
+        by_cluster = df[df["PrimaryCluster"].notna()] if "PrimaryCluster" in df.columns else pd.DataFrame()
+        return generate_word_grouped(by_cluster, top_n_per_cluster=5)
+    return generate_word_basic(df)
+
+def export_button(kind: str, label: str, file_name: str, mime: str, fingerprint: str):
+    ready = st.session_state.setdefault("exports_ready", {})
+    if ready.get(kind) != fingerprint:
+        if not st.button(f"⚙️ Prepare {label}", key=f"prepare_{kind}"):
+            return
+        ready[kind] = fingerprint
+    st.download_button(f"⬇️ {label}", data=build_export(kind, fingerprint, st.session_state.data),
+                       file_name=file_name, mime=mime, key=f"download_{kind}")
+
 if st.session_state.data:
-    df = pd.DataFrame(st.session_state.data)
     st.subheader("💾 Download")
-
-    excel_bytes = generate_excel(df)
-    b64_xlsx = base64.b64encode(excel_bytes).decode("utf-8")
+    fingerprint = result_fingerprint(st.session_state.data)
     c1, c2, c3 = st.columns(3)
 
     with c1:
-        st.markdown(
-            f'<a href="data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,{b64_xlsx}" download="news.xlsx" style="text-decoration:none; padding:8px 16px; background-color:#4CAF50; color:white; border-radius:4px;">⬇️ Excel</a>',
-            unsafe_allow_html=True,
-        )
+        export_button("xlsx", "Excel", "news.xlsx", XLSX_MIME, fingerprint)
 
     if mode.startswith("Basic"):
-        word_basic = generate_word_basic(df)
-        b64_docx_basic = base64.b64encode(word_basic).decode("utf-8")
         with c2:
-            st.markdown(
-                f'<a href="data:application/vnd.openxmlformats-officedocument.wordprocessingml.document;base64,{b64_docx_basic}" download="news_basic.docx" style="text-decoration:none; padding:8px 16px; background-color:#1976D2; color:white; border-radius:4px;">⬇️ Word (basic)</a>',
-                unsafe_allow_html=True,
-            )
+            export_button("docx_basic", "Word (basic)", "news_basic.docx", DOCX_MIME, fingerprint)
         with c3:
             st.caption("—")
     else:
-        word_basic = generate_word_basic(df)
-        b64_docx_flat = base64.b64encode(word_basic).decode("utf-8")
         with c2:
-            st.markdown(
-                f'<a href="data:application/vnd.openxmlformats-officedocument.wordprocessingml.document;base64,{b64_docx_flat}" download="news_flat.docx" style="text-decoration:none; padding:8px 16px; background-color:#1976D2; color:white; border-radius:4px;">⬇️ Word (flat)</a>',
-                unsafe_allow_html=True,
-            )
-        by_cluster = df[df["PrimaryCluster"].notna()] if "PrimaryCluster" in df.columns else pd.DataFrame()
-        if not by_cluster.empty:
-            word_grouped = generate_word_grouped(by_cluster, top_n_per_cluster=5)
-            b64_docx_grouped = base64.b64encode(word_grouped).decode("utf-8")
-            with c3:
-                st.markdown(
-                    f'<a href="data:application/vnd.openxmlformats-officedocument.wordprocessingml.document;base64,{b64_docx_grouped}" download="news_by_cluster.docx" style="text-decoration:none; padding:8px 16px; background-color:#7B1FA2; color:white; border-radius:4px;">⬇️ Word (by cluster)</a>',
-                    unsafe_allow_html=True,
-                )
-        else:
-            with c3:
+            export_button("docx_flat", "Word (flat)", "news_flat.docx", DOCX_MIME, fingerprint)
+        with c3:
+            if any(row.get("PrimaryCluster") for row in st.session_state.data):
+                export_button("docx_grouped", "Word (by cluster)", "news_by_cluster.docx", DOCX_MIME, fingerprint)
+            else:
                 st.caption("No clustered data yet.")
 
 st.markdown("---")
@@ -2,14 +2,22 @@ import os
 import streamlit as st
 import pandas as pd
 from io import BytesIO
-import asyncio
+import time
+import uuid
 # import aiohttp # Not used directly here
 # import re # Not used directly here
 
 # Import our helper tools (which we wrote in other files)
-from gdelt_fetcher import fetch_gdelt_simple
-from article_scraper import enhance_articles_async
+from news_sources import SOURCE_NAMES
 from sector_classifier import classify_sector
+from article_record import Article, articles_to_dataframe
+from seen_index import SeenIndex
+from export_cache import CSV_MIME, XLSX_MIME, result_fingerprint
+from run_history import RunHistory, run_label
+from job_runner import FINISHED, JobRunner
+from search_job import run_search, search_key
+from pub_dates import newest_first
+from result_pager import PAGE_SIZES, PAYWALL_FILTERS, matching_indices, page_bounds, page_count
 
 # --- PAGE SETUP ---
 # This configures the browser tab title and layout
@@ -53,10 +61,51 @@ if os.path.exists("Mavericks logo.png"):
 st.title("📰 News Search Engine")
 st.caption("Enter a keyword to find the latest news articles with full content previews.")
 
+# The "seen articles" notebook is shared by everyone using this server.
+@st.cache_resource
+def get_seen_index():
+    return SeenIndex()
+
+# Finished searches saved on disk (needs pyarrow; without it there is no history)
+@st.cache_resource
+def get_run_history():
+    try:
+        history = RunHistory()
+    except ImportError:
+        return None
+    # Unsaved and deleted searches leave bodies behind: clear them out at start-up
+    history.compact(min_waste=0.5)
+    return history
+
+# Searches run on a few background threads shared by everyone on this server.
+# Finished searches are saved to the run history under their job id.
+# The same search asked again within SHARED_RESULT_TTL (by anyone) gets the
+# finished results right away; asked while it is still running, it joins it.
+@st.cache_resource
+def get_job_runner():
+    return JobRunner(workers=2, history=get_run_history())
+
+SHARED_RESULT_TTL = 15 * 60
+
+# Export files (Excel/CSV) are made only when asked, once per result set.
+# The fingerprint skips the full text so it never has to be read from disk.
+EXPORT_FIELDS = ("title", "source", "link", "published", "summary", "text_ref", "is_paywall")
+
+@st.cache_resource(max_entries=8, show_spinner="Building file…")
+def build_export(kind: str, fingerprint: str, _articles) -> bytes:
+    df = articles_to_dataframe(_articles)
+    if kind == "csv":
+        return df.to_csv(index=False).encode("utf-8")
+    buffer = BytesIO()
+    with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
+        df.to_excel(writer, index=False, sheet_name='News')
+    return buffer.getvalue()
+
 # Initialize our "memory" to store articles
 if "articles" not in st.session_state:
     st.session_state.articles = []
 
+
 # --- INPUT SECTION (Search Bar) ---
 col1, col2 = st.columns([3, 1])
 with col1:
@@ -72,25 +121,50 @@ with col1:
     else:
         query = sector_input
 
+    # Google News RSS and the paid APIs can be searched together in one pass
+    selected_sources = st.multiselect("🛰️ Sources", SOURCE_NAMES, default=["Google News RSS"],
+                                      help="All selected sources are searched at the same time; copies are removed once.")
+
 with col2:
     duration = st.number_input("📅 Days back", min_value=1, max_value=3650, value=7)
+    incremental = st.checkbox("♻️ Reuse articles read in earlier searches", value=False,
+                              help="Only visit websites for articles not read for this topic in the last 2 days.")
+    share_recent = st.checkbox("🤝 Reuse the same search from the last 15 minutes", value=True,
+                               help="If someone ran (or is running) exactly this search just now, show those results instead of searching again.")
+    fast_mode = st.checkbox("⚡ Fast results", value=False,
+                            help="Stop searching after a few seconds (or once enough links are found) instead of waiting for the slowest feed.")
+    if fast_mode:
+        time_limit = st.number_input("⏱️ Seconds to wait", min_value=1, max_value=120, value=5)
+        target_links = st.number_input("🎯 Enough links", min_value=10, max_value=5000, value=300, step=50)
+    else:
+        time_limit = target_links = None
+    summary_style = st.selectbox("📝 Summary", ["First paragraphs", "Key sentences"],
+                                 help="'Key sentences' picks the most important sentences of each article (runs locally, no extra waiting).")
+
+# --- PAST SEARCHES ---
+# Every finished search is saved to disk (run_history.py), so a refresh or a
+# restart doesn't mean visiting every website again. Bodies stay on disk until opened.
+history = get_run_history()
+if history is not None:
+    past_runs = history.list_runs(limit=30, app="app2")
+    if past_runs:
+        with st.expander("📚 Past searches", expanded=False):
+            col_run, col_load = st.columns([4, 1])
+            with col_run:
+                picked_run = st.selectbox("Saved search", past_runs, format_func=run_label, label_visibility="collapsed")
+            with col_load:
+                if st.button("Load", use_container_width=True):
+                    st.session_state.articles = [Article.from_gdelt(row) for row in history.load(picked_run)]
+                    st.session_state.last_query = picked_run.get("query", "")
+                    st.session_state.classified_sector = None
 
 st.markdown("---")
 
 # --- SEARCH ACTION ---
-# This runs when you click the big red button
+# This runs when you click the big red button. The search itself runs in the
+# background (job_runner.py + search_job.py): the page only starts it and then
+# checks on it, so clicking around or rerunning doesn't stop it.
 if st.button("🚀 Find News Articles", type="primary", use_container_width=True):
-    # --- CUSTOM LOADER ---
-    # Increased size: Ratio 2:5, Width 250
-    col_img, col_txt = st.columns([2, 5])
-    with col_img:
-        if os.path.exists("loader.jpg"):
-            st.image("loader.jpg", width=250)
-    with col_txt:
-        st.markdown("### We are working for you, be patient... ⏳")
-        # Initialize Progress Bar immediately here to show 0%
-        main_progress = st.progress(0, text="0% complete")
-
     # --- INTERNAL CLASSIFICATION (For Custom Keywords) ---
     if sector_input == "CUSTOM" and query:
         # Get API key from secrets
@@ -110,67 +184,79 @@ if st.button("🚀 Find News Articles", type="primary", use_container_width=True
         # Reset if not custom
         st.session_state.classified_sector = None
 
-    
-    # --- PROGRESSIVE LOADING STATUS ---
-    with st.status("🤖 AI Agent is working...", expanded=True) as status:
-        
-        # STEP 1: FIND LINKS
-        # Fake a small progress update to show activity
-        main_progress.progress(10, text="10% complete - Searching for links...")
-        status.write(f"🔍 Searching Google News for '{query}'...")
-        
-        # We ask for up to 5000 links
-        raw_articles = fetch_gdelt_simple(query, days=duration, max_articles=5000)
-        
-        # Jump to 20% after finding links
-        main_progress.progress(20, text=f"20% complete - Found {len(raw_articles)} links...")
-        
-        if not raw_articles:
-            status.update(label="❌ No news found!", state="error", expanded=False)
-            st.error("No news found for this keyword. Please try another.")
-            st.session_state.articles = []
-        else:
-            status.write(f"✅ Found {len(raw_articles)} links from around the web.")
-            
-            # STEP 2: READ CONTENT
-            status.write(f"📖 Visiting all {len(raw_articles)} websites to extract content...")
-            
-            # This little function updates the main progress bar
-            def update_progress(current, total):
-                # We map the scraping progress (0-100%) to the remaining main progress (20-100%)
-                scrape_percent = (current / total)
-                total_percent = int(20 + (scrape_percent * 80))
-                
-                main_progress.progress(total_percent, text=f"{total_percent}% complete - Reading article {current}/{total}")
-                
-                # Update text every few items inside the status box too
-                if current % 5 == 0 or current == total:
-                     status.update(label=f"📖 Reading articles... ({int(scrape_percent*100)}%)")
-            
-            # RUN THE SCRAPER! (This visits all sites)
-            try:
-                # DEBUG: Check raw articles count
-                st.write(f"DEBUG: Starting scrape for {len(raw_articles)} articles...")
-                
-                enhanced_articles = asyncio.run(enhance_articles_async(
-                    raw_articles, 
-                    limit=None, 
-                    progress_callback=update_progress
-                ))
-                
-                # DEBUG: Check result count
-                st.write(f"DEBUG: Scrape finished. Enhanced {len(enhanced_articles)} articles.")
-                
-                main_progress.progress(100, text="100% complete - Done!")
-                
-                st.session_state.articles = enhanced_articles
-                st.session_state.last_query = query
-                
-                # Collapse the status box when done
-                status.update(label="✅ All Done! Articles ready.", state="complete", expanded=False)
-            except Exception as e:
-                st.error(f"CRITICAL ERROR during scraping: {e}")
-                status.update(label="❌ Error during scraping", state="error")
+    # Scraped texts go straight into the run history's text file (on disk),
+    # so saving the finished search doesn't copy them again.
+    # An identical search already running is always joined; finished ones
+    # are only reused when "Reuse the same search" is on.
+    submitted_at = time.time()
+    previous_job = st.session_state.get("job_id")
+    session_id = st.session_state.setdefault("session_id", uuid.uuid4().hex)
+    st.session_state.job_id = get_job_runner().submit(
+        run_search, query, duration, selected_sources, time_limit, target_links, summary_style,
+        seen=get_seen_index() if incremental else None,
+        text_store=history.texts if history is not None else None,
+        label=query,
+        save_as={"query": query, "app": "app2",
+                 "meta": {"sources": selected_sources, "summary_style": summary_style}},
+        key=search_key(query, duration, selected_sources, time_limit, target_links, summary_style),
+        ttl=SHARED_RESULT_TTL if share_recent else 0,
+        subscriber=session_id,
+    )
+    # A new search replaces this session's old one: stop waiting on it
+    if previous_job and previous_job != st.session_state.job_id:
+        get_job_runner().cancel(previous_job, session_id)
+    joined = get_job_runner().status(st.session_state.job_id)
+    st.session_state.job_shared = bool(joined and joined["created"] < submitted_at
+                                       and previous_job != st.session_state.job_id)
+
+# --- RUNNING SEARCH ---
+# While a search runs, show how far it got and check again every second.
+poll_job = False
+if st.session_state.get("job_id"):
+    runner = get_job_runner()
+    job_id = st.session_state.job_id
+    job = runner.status(job_id)
+    if job is None:
+        st.session_state.job_id = None
+    elif job["status"] not in FINISHED:
+        poll_job = True
+        # --- CUSTOM LOADER ---
+        # Increased size: Ratio 2:5, Width 250
+        col_img, col_txt = st.columns([2, 5])
+        with col_img:
+            if os.path.exists("loader.jpg"):
+                st.image("loader.jpg", width=250)
+        with col_txt:
+            st.markdown("### We are working for you, be patient... ⏳")
+            percent = int(100 * job["done"] / job["total"]) if job["total"] else 0
+            st.progress(percent, text=f"{percent}% complete - {job['message'] or 'Starting...'}")
+            st.caption(f"{job['partial']} links found so far. You can keep using the page while this runs.")
+            if st.session_state.get("job_shared"):
+                st.caption("🤝 Someone else started this exact search a moment ago; you are sharing it.")
+            if st.button("⏹️ Stop this search", help="Stops visiting websites right away (unless someone else shares this search)."):
+                runner.cancel(job_id, st.session_state.get("session_id"))
+        with st.status("🤖 AI Agent is working...", expanded=True):
+            for line in job["notes"]:
+                st.write(line)
+    else:
+        st.session_state.job_id = None
+        with st.status("✅ All Done! Articles ready." if job["status"] == "done" else "❌ Search stopped",
+                       state="complete" if job["status"] == "done" else "error", expanded=False):
+            for line in job["notes"]:
+                st.write(line)
+        if job["status"] == "done":
+            if st.session_state.get("job_shared"):
+                minutes = int((time.time() - job["finished"]) // 60)
+                st.caption(f"🤝 The same search was just run by someone else; showing its results "
+                           f"(finished {'just now' if minutes < 1 else f'{minutes} min ago'}).")
+            # Shared results: every session gets its own records to change
+            st.session_state.articles = [a.copy() if isinstance(a, Article) else Article.from_gdelt(a)
+                                         for a in runner.results(job_id)]
+            st.session_state.last_query = job["label"]
+            if not st.session_state.articles:
+                st.error("No news found for this keyword. Please try another.")
+        elif job["status"] == "failed":
+            st.error(f"CRITICAL ERROR during scraping: {job['error']}")
 
 # --- DISPLAY RESULTS ---
 # --- DISPLAY RESULTS ---
@@ -187,62 +273,89 @@ if st.session_state.articles:
     with col_sort1:
         sort_order = st.radio("Sort by Date:", ["Newest First ⬇️", "Oldest First ⬆️"], index=0)
     
-    # Sort the articles based on selection
-    try:
-        reverse_sort = True if "Newest" in sort_order else False
-        
-        # Helper function to normalize timestamps (handles both tz-aware and tz-naive)
-        def get_sortable_timestamp(article):
-            if not article.get('published'):
-                return pd.Timestamp.min.tz_localize(None)  # Make tz-naive
-            
-            timestamp = pd.to_datetime(article['published'], errors='coerce')
-            
-            if timestamp is pd.NaT:
-                return pd.Timestamp.min.tz_localize(None)
-            
-            # Convert to timezone-naive for consistent comparison
-            if timestamp.tz is not None:
-                timestamp = timestamp.tz_localize(None)
-            
-            return timestamp
-        
-        st.session_state.articles.sort(
-            key=get_sortable_timestamp, 
-            reverse=reverse_sort
-        )
-    except Exception as e:
-        st.warning(f"Could not sort articles: {e}")
+    # Dates were parsed once when the articles arrived (pub_dates.py); the
+    # newest-first order is worked out once per result set and "oldest first"
+    # just reads it backwards, so this toggle costs nothing.
+    articles = st.session_state.articles
+    if st.session_state.get("order_for") != (id(articles), len(articles)):
+        st.session_state.order_for = (id(articles), len(articles))
+        st.session_state.article_order = newest_first(articles)
+    order = st.session_state.article_order if "Newest" in sort_order else st.session_state.article_order[::-1]
+
+    # --- FIND IN RESULTS + PAGES ---
+    # Only one page of cards is drawn per rerun, and a full text is only read
+    # and sent when its switch is turned on (see result_pager.py).
+    col_find, col_src, col_pay, col_size = st.columns([3, 2, 1, 1])
+    with col_find:
+        search = st.text_input("🔎 Find in results", placeholder="Words in the title, source or summary")
+    with col_src:
+        source_filter = st.multiselect("Sources", sorted({a['source'] for a in articles if a['source']}))
+    with col_pay:
+        paywall_filter = st.selectbox("Paywall", PAYWALL_FILTERS)
+    with col_size:
+        page_size = st.selectbox("Per page", PAGE_SIZES, index=1)
+    hide_syndicated = st.checkbox("Hide syndicated copies", value=False)
+
+    shown = matching_indices(articles, search, source_filter, hide_syndicated, paywall_filter, order=order)
+    pages = page_count(len(shown), page_size)
+
+    # New results, sort or filters -> back to page 1
+    view = (id(articles), len(articles), sort_order, search, tuple(source_filter), paywall_filter, hide_syndicated, page_size)
+    if st.session_state.get("result_view") != view:
+        st.session_state.result_view = view
+        st.session_state.result_page = 1
+    st.session_state.result_page = min(st.session_state.get("result_page", 1), pages)
+
+    def turn_page(step):
+        st.session_state.result_page = min(max(st.session_state.result_page + step, 1), pages)
+
+    col_prev, col_page, col_next, col_info = st.columns([1, 1, 1, 4])
+    with col_prev:
+        st.button("◀ Previous", on_click=turn_page, args=(-1,), disabled=st.session_state.result_page <= 1,
+                  use_container_width=True)
+    with col_page:
+        st.number_input("Page", min_value=1, max_value=pages, key="result_page", label_visibility="collapsed")
+    with col_next:
+        st.button("Next ▶", on_click=turn_page, args=(1,), disabled=st.session_state.result_page >= pages,
+                  use_container_width=True)
+    start, end = page_bounds(len(shown), st.session_state.result_page, page_size)
+    with col_info:
+        st.caption(f"Page {st.session_state.result_page} of {pages} · showing {start + 1 if shown else 0}–{end} "
+                   f"of {len(shown)} matching articles ({len(articles)} found)")
+
     # --- SCROLLABLE CONTAINER ---
     # A box with fixed height (800px) so you can scroll inside it.
     with st.container(height=800):
-        for i, article in enumerate(st.session_state.articles):
+        if not shown:
+            st.info("No articles match these filters.")
+        for n, i in enumerate(shown[start:end], start=start + 1):
+            article = articles[i]
             title = article['title']
             source = article['source']
-            summary = article.get('summary', 'No summary available.')
-            full_text = article.get('full_text', '')
-            is_paywall = article.get('is_paywall', False)
             link = article['link']
             published = article['published']
             
             # --- ARTICLE CARD ---
             with st.container():
                 # Title fits?
-                st.markdown(f"### {i+1}. [{title}]({link})")
+                st.markdown(f"### {n}. [{title}]({link})")
                 st.caption(f"**Source:** {source} | **Published:** {published}")
+                if not article.get('is_canonical', True):
+                    st.caption("🧬 Syndicated copy: the same story was published by another outlet in these results.")
                 
-                # DROPDOWN: "Read Full Article Content"
-                # Everything inside here is hidden until clicked
-                with st.expander("📖 Read Full Article Content"):
+                # SWITCH: "Read full article"
+                # Nothing below is read from disk or sent to the browser until it is turned on
+                if st.toggle("📖 Read full article", key=f"open_{i}_{link}"):
                     # 1. Summary
                     st.markdown("#### Summary")
-                    st.info(summary)
+                    st.info(article.get('summary') or 'No summary available.')
                     
                     # 2. Full Text
                     st.markdown("#### Full Article")
-                    if is_paywall:
+                    if article.get('is_paywall', False):
                         st.warning("🔒 **Subscription Required**: This article seems to be behind a paywall.")
                     
+                    full_text = article.get('full_text', '')
                     if full_text:
                         st.write(full_text)
                     else:
@@ -252,27 +365,29 @@ if st.session_state.articles:
                 st.markdown("---")
 
     # --- DOWNLOAD BUTTONS ---
-    df = pd.DataFrame(st.session_state.articles)
-    
-    # Prepare Excel file
-    buffer = BytesIO()
-    with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
-        df.to_excel(writer, index=False, sheet_name='News')
-    buffer.seek(0)
-    
+    # Built only when asked, and cached per result set: clicking around the
+    # page no longer rebuilds the Excel and CSV (see export_cache.py).
+    # (Files follow the order chosen above)
+    fingerprint = f"{result_fingerprint(articles, EXPORT_FIELDS)}-{'newest' if 'Newest' in sort_order else 'oldest'}"
+    file_stem = f"news_{st.session_state.get('last_query', 'results')}"
+    ready = st.session_state.setdefault("exports_ready", {})
+
     col_dl1, col_dl2 = st.columns(2)
-    with col_dl1:
-        st.download_button(
-            label="📥 Download as Excel",
-            data=buffer,
-            file_name=f"news_{st.session_state.get('last_query', 'results')}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
-    with col_dl2:
-        csv = df.to_csv(index=False)
-        st.download_button(
-            label="📥 Download as CSV",
-            data=csv,
-            file_name=f"news_{st.session_state.get('last_query', 'results')}.csv",
-            mime="text/csv"
-        )
+    for col, kind, label, mime in ((col_dl1, "xlsx", "Excel", XLSX_MIME), (col_dl2, "csv", "CSV", CSV_MIME)):
+        with col:
+            if ready.get(kind) != fingerprint:
+                if not st.button(f"⚙️ Prepare {label}", key=f"prepare_{kind}"):
+                    continue
+                ready[kind] = fingerprint
+            st.download_button(
+                label=f"📥 Download as {label}",
+                data=build_export(kind, fingerprint, [articles[i] for i in order]),
+                file_name=f"{file_stem}.{kind}",
+                mime=mime,
+                key=f"download_{kind}"
+            )
+
+# Check on the running search again in a second (after the page is drawn)
+if poll_job:
+    time.sleep(1)
+    st.rerun()
@@ -0,0 +1,150 @@
+"""
+Article Pipeline (resolve -> fetch -> summarize, all at once)
+app.py used to handle one RSS entry at a time: decode the Google link, then
+download the page, then ask Hugging Face for a summary, then sleep 0.2-0.6s
+to be polite. Every article waited for the one before it.
+
+This file runs the three steps as a conveyor belt:
+- Each step has its own pool of worker threads, so 8 links can be decoded
+  while 8 pages download and 4 summaries are being written.
+- Politeness is per website (`DomainPoliteness`): we never hit the same
+  domain more than `max_per_domain` times at once, and space requests to it
+  out by `min_interval`. Different websites don't wait for each other.
+- Between "fetch" and "summarize" there is a `gate` that runs on the
+  caller's (Streamlit) thread in the ORIGINAL order, so order-sensitive
+  decisions (filters, syndicated copies) come out exactly as before.
+- A job that only waits for another one (a syndicated copy waiting for its
+  canonical's summary) never takes a summarize thread: the gate hands back
+  the Future it waits on, and the job finishes when that Future does.
+- Finished articles come back in completion order, so the UI can show
+  each one as soon as it is ready.
+"""
+
+import queue
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+
+
+class DomainPoliteness:
+    """Per-domain concurrency cap + minimum spacing between requests."""
+
+    def __init__(self, min_interval: float = 0.3, max_per_domain: int = 2, jitter: float = 0.3):
+        self.min_interval = min_interval
+        self.max_per_domain = max_per_domain
+        self.jitter = jitter
+        self._lock = threading.Lock()
+        self._slots: Dict[str, threading.Semaphore] = {}
+        self._next_time: Dict[str, float] = {}
+
+    @staticmethod
+    def domain(url: str) -> str:
+        try:
+            netloc = urlparse(url or "").netloc.lower()
+        except Exception:
+            return ""
+        return netloc[4:] if netloc.startswith("www.") else netloc
+
+    @contextmanager
+    def slot(self, url: str):
+        """Hold one of this domain's request slots, waiting our turn first."""
+        domain = self.domain(url)
+        with self._lock:
+            sem = self._slots.setdefault(domain, threading.Semaphore(self.max_per_domain))
+        with sem:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_time.get(domain, 0.0))
+                self._next_time[domain] = start + self.min_interval + random.random() * self.jitter
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+
+class ArticlePipeline:
+    """
+    Three thread pools joined by queues.
+
+    - `resolve(job)` and `fetch(job)` run in worker threads and fill in the job dict.
+    - `gate(job)` runs on the caller's thread, in input order, after fetch. It
+      returns "summarize" (send to the summarize pool), "done" (finished, no
+      summary needed), "drop" (filtered out) or a Future (finished once the
+      Future is; add your own callbacks to it before returning it).
+    - `summarize(job)` runs in the summarize pool.
+    A step that raises leaves the job as it was and stores the error in job["error"].
+    """
+
+    def __init__(self, resolve: Callable[[Dict], None], fetch: Callable[[Dict], None],
+                 summarize: Callable[[Dict], None], resolve_workers: int = 8,
+                 fetch_workers: int = 8, summarize_workers: int = 4):
+        self.resolve = resolve
+        self.fetch = fetch
+        self.summarize = summarize
+        self.workers = (resolve_workers, fetch_workers, summarize_workers)
+        self.finished = 0   # jobs that came out (done or dropped)
+        self.dropped = 0
+
+    @staticmethod
+    def _safe(step: Callable[[Dict], None], job: Dict):
+        try:
+            step(job)
+        except Exception as e:
+            job.setdefault("error", f"{getattr(step, '__name__', 'step')}: {e}")
+
+    def run(self, jobs: List[Dict], gate: Callable[[Dict], str]) -> Iterator[Dict]:
+        """Push every job through the pipeline; yield finished jobs as they complete."""
+        events = queue.Queue()
+        resolve_workers, fetch_workers, summarize_workers = self.workers
+        resolvers = ThreadPoolExecutor(resolve_workers, thread_name_prefix="resolve")
+        fetchers = ThreadPoolExecutor(fetch_workers, thread_name_prefix="fetch")
+        summarizers = ThreadPoolExecutor(summarize_workers, thread_name_prefix="summarize")
+
+        def resolve_then_fetch(seq, job):
+            self._safe(self.resolve, job)
+            fetchers.submit(fetch_step, seq, job)
+
+        def fetch_step(seq, job):
+            self._safe(self.fetch, job)
+            events.put(("fetched", seq, job))
+
+        def summarize_step(seq, job):
+            self._safe(self.summarize, job)
+            events.put(("summarized", seq, job))
+
+        try:
+            for seq, job in enumerate(jobs):
+                resolvers.submit(resolve_then_fetch, seq, job)
+
+            waiting = {}          # fetched jobs waiting for their turn at the gate
+            next_seq = 0
+            while self.finished < len(jobs):
+                kind, seq, job = events.get()
+                if kind == "summarized":
+                    self.finished += 1
+                    yield job
+                    continue
+
+                waiting[seq] = job
+                while next_seq in waiting:
+                    ready = waiting.pop(next_seq)
+                    next_seq += 1
+                    decision = gate(ready)
+                    if isinstance(decision, Future):
+                        decision.add_done_callback(
+                            lambda _, seq=next_seq - 1, job=ready: events.put(("summarized", seq, job)))
+                    elif decision == "summarize":
+                        summarizers.submit(summarize_step, next_seq - 1, ready)
+                    elif decision == "drop":
+                        self.dropped += 1
+                        self.finished += 1
+                    else:
+                        self.finished += 1
+                        yield ready
+        finally:
+            # If the caller stops early, don't start anything new.
+            for pool in (resolvers, fetchers, summarizers):
+                pool.shutdown(wait=False, cancel_futures=True)
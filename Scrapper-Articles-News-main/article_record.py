@@ -0,0 +1,244 @@
+"""
+Compact Article Record
+Every part of the app passes news articles around. Before this file, each
+article was a plain dict of strings, and the fetchers didn't even agree on the
+key names (`title`/`link` in gdelt_fetcher vs `headline`/`url` in the hybrid
+fetcher).
+
+`Article` is one small, fixed-shape record:
+- `__slots__` means no per-article dict, so thousands of them stay light.
+- Source names and domains repeat a lot ("Reuters", "msn.com"), so we intern
+  them and every article shares the same string object.
+- It still behaves like the old dict (`article['title']`, `.get(...)`,
+  `article['full_text'] = ...`), so older code keeps working.
+- The full text can live in a compressed `FullTextStore` (see text_store.py);
+  then the record only holds a small `text_ref` and reads the text on demand.
+- The published date is parsed once into `published_ts` (UTC epoch seconds,
+  see pub_dates.py), so sorting never has to read date text again.
+"""
+
+import sys
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+from pub_dates import parse_published
+from text_store import load_text
+
+
+def _intern(value) -> str:
+    """Intern short repeated strings (source names, domains)."""
+    if not value:
+        return ""
+    return sys.intern(str(value))
+
+
+def domain_of(link: str) -> str:
+    """Return the bare domain of a link ('https://www.msn.com/x' -> 'msn.com')."""
+    if not link:
+        return ""
+    try:
+        netloc = urlparse(link).netloc.lower()
+    except Exception:
+        return ""
+    if netloc.startswith("www."):
+        netloc = netloc[4:]
+    return _intern(netloc)
+
+
+class Article:
+    """One news article, whichever fetcher it came from."""
+
+    __slots__ = (
+        "title", "description", "source", "link", "published",
+        "domain", "api_source", "_full_text", "text_ref", "summary", "is_paywall", "extra",
+        "published_ts",
+    )
+
+    # The dict view uses the gdelt_fetcher names; the hybrid names still work.
+    FIELDS = ("title", "description", "source", "link", "published",
+              "full_text", "summary", "is_paywall")
+    ALIASES = {"headline": "title", "url": "link"}
+    _NAMES = frozenset(FIELDS) | {"domain", "api_source", "text_ref", "published_ts"}
+
+    def __init__(self, title="", description="", source="", link="", published="",
+                 api_source=None, full_text=None, summary=None, is_paywall=None, extra=None,
+                 text_ref=None, published_ts=None):
+        self.title = title or ""
+        self.description = description or ""
+        self.source = _intern(source)
+        self.link = link or ""
+        self.published = published or ""
+        self.published_ts = published_ts if published_ts is not None else parse_published(self.published)
+        self.domain = domain_of(self.link)
+        self.api_source = _intern(api_source) if api_source else None
+        self._full_text = full_text
+        self.text_ref = text_ref
+        self.summary = summary
+        self.is_paywall = is_paywall
+        # Anything that doesn't fit a slot (e.g. 'source_diversity') lives here.
+        # It stays None for most articles so it costs nothing.
+        self.extra = dict(extra) if extra else None
+
+    # --- FULL TEXT (in memory or in a FullTextStore) ---
+    @property
+    def full_text(self):
+        if self._full_text is not None:
+            return self._full_text
+        if self.text_ref:
+            return load_text(self.text_ref)
+        return None
+
+    @full_text.setter
+    def full_text(self, value):
+        self._full_text = value
+        self.text_ref = None
+
+    def offload_text(self, store) -> None:
+        """Move the full text into `store`, keeping only its ref in memory."""
+        if self._full_text:
+            self.text_ref = store.put(self._full_text)
+            self._full_text = None
+
+    # --- DICT VIEW (backward compatibility) ---
+    def _slot_name(self, key):
+        key = self.ALIASES.get(key, key)
+        return key if key in self._NAMES else None
+
+    def __getitem__(self, key):
+        name = self._slot_name(key)
+        if name is not None:
+            value = getattr(self, name)
+            if value is None:
+                raise KeyError(key)
+            return value
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        name = self._slot_name(key)
+        if name is None:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+        elif name == "source":
+            self.source = _intern(value)
+        elif name == "link":
+            self.link = value or ""
+            self.domain = domain_of(self.link)
+        elif name == "published":
+            self.published = value or ""
+            self.published_ts = parse_published(self.published)
+        else:
+            setattr(self, name, value)
+
+    def __contains__(self, key):
+        try:
+            self[key]
+            return True
+        except KeyError:
+            return False
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> List[str]:
+        keys = [f for f in self.FIELDS if f != "full_text" and getattr(self, f) is not None]
+        if self._full_text is not None or self.text_ref:
+            keys.insert(5, "full_text")
+        if self.api_source:
+            keys.append("api_source")
+        if self.extra:
+            keys.extend(self.extra)
+        return keys
+
+    def copy(self) -> "Article":
+        """A separate record with the same values (the text itself is shared through `text_ref`)."""
+        other = Article.__new__(Article)
+        for name in self.__slots__:
+            setattr(other, name, getattr(self, name))
+        other.extra = dict(self.extra) if self.extra else None
+        return other
+
+    def replace_with(self, other: "Article"):
+        """Take over every value of `other` (a better copy of the same story)."""
+        for name in self.__slots__:
+            setattr(self, name, getattr(other, name))
+        self.extra = dict(other.extra) if other.extra else None
+
+    def to_dict(self) -> Dict:
+        """Plain dict in the old gdelt_fetcher/article_scraper shape."""
+        return {k: self[k] for k in self.keys()}
+
+    def __repr__(self):
+        return f"Article(title={self.title[:40]!r}, source={self.source!r}, domain={self.domain!r})"
+
+    # --- CONVERTERS (one per fetcher) ---
+    @classmethod
+    def from_gdelt(cls, d: Dict) -> "Article":
+        """From a `fetch_gdelt_simple` dict (title/description/source/link/published)."""
+        known = {"title", "description", "source", "link", "published", "api_source",
+                 "full_text", "text_ref", "summary", "is_paywall", "published_ts"}
+        return cls(
+            title=d.get("title", ""),
+            description=d.get("description", ""),
+            source=d.get("source", ""),
+            link=d.get("link", ""),
+            published=d.get("published", ""),
+            api_source=d.get("api_source"),
+            full_text=d.get("full_text"),
+            summary=d.get("summary"),
+            is_paywall=d.get("is_paywall"),
+            extra={k: v for k, v in d.items() if k not in known},
+            text_ref=d.get("text_ref"),
+            published_ts=d.get("published_ts"),
+        )
+
+    @classmethod
+    def from_hybrid(cls, d: Dict) -> "Article":
+        """From a `HybridNewsFetcher` dict (headline/description/source/url/published/api_source)."""
+        known = {"headline", "description", "source", "url", "published", "api_source", "published_ts"}
+        return cls(
+            title=d.get("headline", ""),
+            description=d.get("description", "") or "",
+            source=d.get("source", ""),
+            link=d.get("url", ""),
+            published=d.get("published", ""),
+            api_source=d.get("api_source"),
+            extra={k: v for k, v in d.items() if k not in known},
+            published_ts=d.get("published_ts"),
+        )
+
+
+def from_gdelt_articles(items: Iterable[Dict]) -> List[Article]:
+    return [a if isinstance(a, Article) else Article.from_gdelt(a) for a in items]
+
+
+def from_hybrid_articles(items: Iterable[Dict]) -> List[Article]:
+    return [a if isinstance(a, Article) else Article.from_hybrid(a) for a in items]
+
+
+# --- BULK EXPORT ---
+# Building a DataFrame column by column is much faster than handing pandas
+# thousands of dicts and letting it work out the keys row by row.
+def _columns(articles: List[Article], columns: Optional[List[str]] = None) -> Dict[str, list]:
+    if columns is None:
+        columns = [f for f in Article.FIELDS
+                   if f != "full_text" and any(getattr(a, f) is not None for a in articles)]
+        if any(a._full_text is not None or a.text_ref for a in articles):
+            columns.insert(min(5, len(columns)), "full_text")
+        if any(a.api_source for a in articles):
+            columns.append("api_source")
+        for a in articles:
+            for k in (a.extra or ()):
+                if k not in columns:
+                    columns.append(k)
+    return {c: [a.get(c) for a in articles] for c in columns}
+
+
+def articles_to_dataframe(articles: List[Article], columns: Optional[List[str]] = None):
+    import pandas as pd
+    return pd.DataFrame(_columns(articles, columns))
@@ -12,6 +12,14 @@ import json
 import random
 from urllib.parse import urlparse, parse_qs
 
+from loop_service import pooled_session
+from summarizer import SummarizationError
+
+def _find_data_p(html):
+    c_wiz = BeautifulSoup(html, 'lxml').select_one('c-wiz[data-p]')
+    return c_wiz.get('data-p') if c_wiz else None
+
+
 # --- GOOGLE NEWS DECODER ---
 # What is this?
 # Google News gives us "encrypted" links (like news.google.com/Cahd...).
@@ -40,16 +48,14 @@ async def decode_google_news_url(session, url):
             text = await resp.text()
 
         # 2. Extract the hidden code (called 'data-p') from the page HTML
-        soup = BeautifulSoup(text, 'lxml')
-        c_wiz = soup.select_one('c-wiz[data-p]')
+        # (parsed on a worker thread: the event loop is shared by every search)
+        data_p = await asyncio.to_thread(_find_data_p, text)
         
-        if not c_wiz:
+        if not data_p:
             # If we can't find the code, maybe it's already a real link?
             if "news.google.com" not in str(resp.url):
                 return str(resp.url)
             return url
-
-        data_p = c_wiz.get('data-p')
         
         # 3. Prepare a "secret message" to send to Google's backend API
         # We replace some characters to match the format Google expects.
@@ -88,6 +94,96 @@ async def decode_google_news_url(session, url):
         return url
 
 
+# The CPU-heavy part of reading a page (BeautifulSoup/lxml). It runs on a
+# worker thread so one search's parsing doesn't hold up everyone's downloads.
+def parse_article_html(html):
+    """Turn a downloaded page into {full_text, summary, is_paywall}."""
+    soup = BeautifulSoup(html, 'lxml') # BeautifulSoup makes the HTML readable
+
+    # --- PAYWALL DETECTION ---
+    # We look for specific words that mean "You need to pay".
+    paywall_keywords = [
+        "subscription required", "subscribe now", "already a subscriber", 
+        "log in to continue", "read the full article", "premium content", 
+        "register to continue", "you have reached your limit"
+    ]
+
+    text_lower = soup.get_text().lower()
+    is_paywall = False
+    for keyword in paywall_keywords:
+        if keyword in text_lower[:1000]: # Check top of page
+            is_paywall = True
+            break
+
+    # --- CLEANING THE PAGE ---
+    # Remove ads, menus, popups, and other junk.
+    for noise in soup(["script", "style", "nav", "header", "footer", "aside", "form", "iframe", "button", "ads", "noscript", "svg"]):
+        noise.decompose()
+
+    # --- FINDING THE ARTICLE TEXT (Smart Logic) ---
+    # 1. Try to find the <article> tag (Standard HTML5)
+    article_tag = soup.find('article')
+    if article_tag:
+         target = article_tag
+    else:
+         # 2. Heuristic: Find the element with the most paragraph text
+         # We look for parents of <p> tags and see which one contains the most text.
+         parents = {}
+         for p in soup.find_all('p'):
+            text = p.get_text(strip=True)
+            if len(text) > 50: # Only count substantial paragraphs
+                parent = p.parent
+                if parent not in parents:
+                    parents[parent] = 0
+                parents[parent] += len(text)
+
+         # Pick the parent with the most text
+         if parents:
+             target = max(parents, key=parents.get)
+         else:
+             target = soup.body
+
+    if not target: target = soup
+
+    # Collect all paragraphs from the best container
+    paragraphs = []
+    # Get all text, but ensure nice spacing
+    for p in target.find_all(['p', 'h2', 'h3', 'li']):
+        # Simple filter: don't include copyright footers or tiny text
+        text = p.get_text(separator=' ', strip=True)
+        if len(text) > 30 and "copyright" not in text.lower():
+            paragraphs.append(text)
+
+    # Join them
+    full_text = '\n\n'.join(paragraphs)
+
+    # FAILSAFE: If the "Smart" logic found nothing (maybe it's a div-soup website)
+    # Try just grabbing all text from the body if it's not too huge
+    if len(full_text) < 200:
+        all_text = soup.get_text(separator='\n\n', strip=True)
+        # If the raw text isn't massive (garbage), use it
+        if len(all_text) > 200 and len(all_text) < 50000:
+             full_text = all_text
+
+    full_text = re.sub(r'\n{3,}', '\n\n', full_text)
+
+    # Create a short summary (first 3 paragraphs)
+    if len(paragraphs) > 0:
+        summary = ' '.join(paragraphs[:3])
+    else:
+        summary = full_text[:400] + "..." if len(full_text) > 400 else full_text
+
+    # Final Check for Paywalls
+    if len(full_text) < 500 and ("subscribe" in text_lower or "login" in text_lower or "register" in text_lower):
+        is_paywall = True
+
+    return {
+        "full_text": full_text,
+        "summary": summary,
+        "is_paywall": is_paywall
+    }
+
+
 # This function goes to a single website link and reads the FULL text.
 async def scrape_article_content_async(session, url):
     """
@@ -128,100 +224,26 @@ async def scrape_article_content_async(session, url):
                 return None
             
             html = await response.text()
-            soup = BeautifulSoup(html, 'lxml') # BeautifulSoup makes the HTML readable
-            
-            # --- PAYWALL DETECTION ---
-            # We look for specific words that mean "You need to pay".
-            paywall_keywords = [
-                "subscription required", "subscribe now", "already a subscriber", 
-                "log in to continue", "read the full article", "premium content", 
-                "register to continue", "you have reached your limit"
-            ]
-            
-            text_lower = soup.get_text().lower()
-            is_paywall = False
-            for keyword in paywall_keywords:
-                if keyword in text_lower[:1000]: # Check top of page
-                    is_paywall = True
-                    break
-            
-            # --- CLEANING THE PAGE ---
-            # Remove ads, menus, popups, and other junk.
-            for noise in soup(["script", "style", "nav", "header", "footer", "aside", "form", "iframe", "button", "ads", "noscript", "svg"]):
-                noise.decompose()
-            
-            # --- FINDING THE ARTICLE TEXT (Smart Logic) ---
-            # 1. Try to find the <article> tag (Standard HTML5)
-            article_tag = soup.find('article')
-            if article_tag:
-                 target = article_tag
-            else:
-                 # 2. Heuristic: Find the element with the most paragraph text
-                 # We look for parents of <p> tags and see which one contains the most text.
-                 parents = {}
-                 for p in soup.find_all('p'):
-                    text = p.get_text(strip=True)
-                    if len(text) > 50: # Only count substantial paragraphs
-                        parent = p.parent
-                        if parent not in parents:
-                            parents[parent] = 0
-                        parents[parent] += len(text)
-                 
-                 # Pick the parent with the most text
-                 if parents:
-                     target = max(parents, key=parents.get)
-                 else:
-                     target = soup.body
-
-            if not target: target = soup
-            
-            # Collect all paragraphs from the best container
-            paragraphs = []
-            # Get all text, but ensure nice spacing
-            for p in target.find_all(['p', 'h2', 'h3', 'li']):
-                # Simple filter: don't include copyright footers or tiny text
-                text = p.get_text(separator=' ', strip=True)
-                if len(text) > 30 and "copyright" not in text.lower():
-                    paragraphs.append(text)
-            
-            # Join them
-            full_text = '\n\n'.join(paragraphs)
-            
-            # FAILSAFE: If the "Smart" logic found nothing (maybe it's a div-soup website)
-            # Try just grabbing all text from the body if it's not too huge
-            if len(full_text) < 200:
-                all_text = soup.get_text(separator='\n\n', strip=True)
-                # If the raw text isn't massive (garbage), use it
-                if len(all_text) > 200 and len(all_text) < 50000:
-                     full_text = all_text
-
-            full_text = re.sub(r'\n{3,}', '\n\n', full_text)
-            
-            # Create a short summary (first 3 paragraphs)
-            if len(paragraphs) > 0:
-                summary = ' '.join(paragraphs[:3])
-            else:
-                summary = full_text[:400] + "..." if len(full_text) > 400 else full_text
-            
-            # Final Check for Paywalls
-            if len(full_text) < 500 and ("subscribe" in text_lower or "login" in text_lower or "register" in text_lower):
-                is_paywall = True
-
-            return {
-                "full_text": full_text,
-                "summary": summary,
-                "is_paywall": is_paywall
-            }
+        return await asyncio.to_thread(parse_article_html, html)
     
     except Exception:
         # If scraping fails, we ignore it safely.
         return None
 
 # This function updates our list of articles with the detailed info
-async def enhance_articles_async(articles, limit=None, progress_callback=None):
+async def enhance_articles_async(articles, limit=None, progress_callback=None, text_store=None,
+                                 summarize=None, stop=None):
     """
     Process articles to get full content.
     This runs 'scrape_article_content_async' for MANY articles at once.
+    If a 'text_store' (FullTextStore) is given, the scraped text goes there
+    and the article only keeps a small 'text_ref' instead of the whole text.
+    If 'summarize' (text -> summary) is given, it writes the summary instead
+    of the "first 3 paragraphs" one (e.g. the local extractive summarizer).
+    If it raises a SummarizationError, the article keeps the "first 3
+    paragraphs" summary and the error goes to its 'summary_error'.
+    If 'stop' (e.g. a threading.Event) is set, the articles not visited yet
+    are skipped and nothing is written back to the articles.
     """
     targets = articles[:limit] if limit else articles
     total = len(targets)
@@ -232,7 +254,17 @@ async def enhance_articles_async(articles, limit=None, progress_callback=None):
 
     async def sem_scrape(session, url):
         async with semaphore:
+            if stop is not None and stop.is_set():
+                return None
             result = await scrape_article_content_async(session, url)
+            if summarize is not None and result and len(result.get('full_text', '')) > 100:
+                # Summarizing is CPU work too: keep it off the shared event loop
+                try:
+                    result['summary'] = await asyncio.to_thread(summarize, result['full_text']) or result['summary']
+                except SummarizationError as e:
+                    # Keep the "first paragraphs" summary, but say why
+                    print(f"Summary failed for {url}: {e}")
+                    result['summary_error'] = str(e)
             
             nonlocal completed
             completed += 1
@@ -243,20 +275,28 @@ async def enhance_articles_async(articles, limit=None, progress_callback=None):
                     pass
             return result
 
-    async with aiohttp.ClientSession(cookie_jar=jar) as session:
+    # Own cookies per run, but the connections come from the shared pool (loop_service.py)
+    async with pooled_session(cookie_jar=jar) as session:
         tasks = []
         for article in targets:
             tasks.append(sem_scrape(session, article['link']))
         
         results = await asyncio.gather(*tasks)
+        if stop is not None and stop.is_set():
+            return targets
         
         for i, result in enumerate(results):
             original_description = targets[i].get('description', '')
             
             if result and len(result.get('full_text', '')) > 100:
                 # Success!
-                targets[i]['full_text'] = result['full_text']
+                if text_store is not None:
+                    targets[i]['text_ref'] = text_store.put(result['full_text'])
+                else:
+                    targets[i]['full_text'] = result['full_text']
                 targets[i]['summary'] = result['summary']
+                if result.get('summary_error'):
+                    targets[i]['summary_error'] = result['summary_error']
                 targets[i]['is_paywall'] = result['is_paywall']
             else:
                 # FALLBACK: If scraping failed or returned empty text
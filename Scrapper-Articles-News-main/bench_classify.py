@@ -0,0 +1,128 @@
+"""
+Benchmark + equivalence check: cluster classification
+Compares the original per-term loop (`classify_article` with the plain dict
+of compiled patterns) with `ClusterMatcher` (literal prefilter) on a synthetic
+UDAN-style config and synthetic articles. Every result (primary cluster,
+score and the full score dict, in order) must be identical, and
+`classify_batch` must give the same columns for the whole set at once.
+
+Run:  python bench_classify.py              (300 terms, 500 articles)
+      python bench_classify.py --terms 800  (bigger config)
+      python bench_classify.py --batch 10000 (also time classify_batch on 10k articles)
+"""
+
+import os
+import random
+import sys
+import time
+
+from cluster_matcher import PARALLEL_MIN_TEXTS, ClusterMatcher, classify_article, classify_batch, compile_patterns
+
+# Same as DEFAULT_CLUSTERS in app.py (app.py itself needs Streamlit to import)
+DEFAULT_CLUSTERS = {
+    "Brand Monitoring": ["zyn","snus","tobacco pouch","nicotine pouch","marlboro","iqos"],
+    "KOLs & Experts": ["kiran melkote","nimesh g desai","clive bates","rohan savio sequeira","david sweanor","bejon kumar misra","r zimlichman","upendra nath sharma","bharat gopal","chandrakant s pandav","mohsin wali"],
+    "Regulatory & Institutional": ["icmr","indian council of medical research","who","world health organisation","fda","cdc","tobacco board","association of food scientists and technologists","confederation of indian food trade and industry","doctors against addiction","asian coalition of harm reduction","ache","cppr","the alternatives"],
+    "Market Trends": ["cigarette","smoking","tobacco products","tobacco industry","tobacco use","big tobacco","traditional cigarettes","conventional cigarettes"],
+    "Safer Alternatives (ENDS/HTP)": ["vape","vaping","electronic cigarette","e-cigarette","ends","heat-not-burn","heat not burn","heatnotburn","heated tobacco","electronically heated tobacco products","vaporizer","portable vaporizer","electric smoking system","smoke-free"],
+    "NRT & Other Alternatives": ["nrt","nicotine replacement therapy","nicotine spray","snus","nicotine pouch","nicotine gum"],
+    "Tobacco Control & Anti-Tobacco": ["tobacco control","anti-tobacco","tobacco burden","tobacco disease","healthcare expenditure"],
+    "Economic & Policy": ["economy of tobacco","tobacco harm reduction","tobacco farmers","tobacco-growing","tobacco workers","tobacco control 3.0","human-centric approach to tobacco control"],
+    "Country Comparisons": ["england vapes","england tobacco","new zealand tobacco","japan tobacco","sweden smoke-free"],
+    "Philanthropy & Advocacy": ["bloomberg philanthropies","campaign for tobacco-free kids","vital strategies","pakistan bloomberg"],
+}
+
+FILLER = ("the government said on monday that new rules would apply from next month as the "
+          "industry prepares for changes in demand while analysts expect prices to rise and "
+          "consumers in india and abroad remain cautious about the market outlook").split()
+TRICKY_TERMS = ["u.s.", "who", "ends", "e-cigarette", "heat-not-burn", "nicotine pouch", "smoke-free",
+                "tobacco", "tobacco control", "tobacco control 3.0", "snus", "zyn", "(vape)?", "[iI]qos",
+                "c++", "café", "straße", "kelvin"]
+ODD_TEXT = ["E cigarette", "E-CIGARETTE", "heatnotburn", "heat not burn", "WHO's", "U.S.-based",
+            "Café", "STRASSE", "straße", "Kelvin", "ſnus", "tobacco-control", "snus/zyn", "İqos"]
+
+
+def make_config(n_terms, seed=11):
+    rnd = random.Random(seed)
+    base = sorted({t for terms in DEFAULT_CLUSTERS.values() for t in terms} | set(TRICKY_TERMS))
+    words = sorted(set(FILLER))
+    config = {name: list(terms) for name, terms in DEFAULT_CLUSTERS.items()}
+    clusters = list(config) + [f"Cohort: {i}" for i in range(10)]
+    while sum(len(v) for v in config.values()) < n_terms:
+        cluster = rnd.choice(clusters)
+        r = rnd.random()
+        if r < 0.5:
+            term = rnd.choice(base)
+        elif r < 0.8:
+            term = " ".join(rnd.sample(words, rnd.randint(1, 3)))
+        else:
+            term = rnd.choice(words) + rnd.choice(["", "s", "-led", ".com"])
+        config.setdefault(cluster, []).append(term)
+    return config
+
+
+def make_articles(config, n, seed=5):
+    rnd = random.Random(seed)
+    terms = [t for ts in config.values() for t in ts]
+    out = []
+    for _ in range(n):
+        def text(k):
+            parts = []
+            for _ in range(k):
+                r = rnd.random()
+                parts.append(rnd.choice(terms) if r < 0.08 else rnd.choice(ODD_TEXT) if r < 0.1 else rnd.choice(FILLER))
+            return " ".join(parts)
+        title = text(12).capitalize()
+        out.append((title, rnd.choice(["Reuters", "The Hindu", "WHO News", "Vape Daily"]),
+                    "https://example.com/" + text(6).replace(" ", "-"), text(rnd.randint(300, 900))))
+    return out
+
+
+def main():
+    args = sys.argv[1:]
+    n_terms = int(args[args.index("--terms") + 1]) if "--terms" in args else 300
+    config = make_config(n_terms)
+    compiled = compile_patterns(config)
+    articles = make_articles(config, 500)
+    print(f"{len(compiled)} clusters / {sum(len(p) for p in compiled.values())} compiled terms / {len(articles)} articles")
+
+    start = time.perf_counter()
+    reference = [classify_article(*a, compiled) for a in articles]
+    t_ref = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matcher = ClusterMatcher(compiled)
+    fast = [classify_article(*a, matcher) for a in articles]
+    t_fast = time.perf_counter() - start
+
+    mismatches = [i for i, (r, f) in enumerate(zip(reference, fast))
+                  if r[:2] != f[:2] or list(r[2].items()) != list(f[2].items())]
+    print(f"per-term loop : {t_ref:7.2f}s")
+    print(f"ClusterMatcher: {t_fast:7.2f}s  (x{t_ref / t_fast:.1f}, incl. building the matcher)")
+    print(f"identical results: {not mismatches} ({len(mismatches)} mismatches)")
+
+    # Batch API: the same numbers for the whole result set at once
+    start = time.perf_counter()
+    columns = classify_batch(*zip(*articles), ClusterMatcher(compiled))
+    t_batch = time.perf_counter() - start
+    expected = [(p, s, [k for k, _ in sorted(m.items(), key=lambda kv: kv[1], reverse=True)])
+                for p, s, m in reference]
+    got = list(zip(columns["PrimaryCluster"], columns["RelevanceScore"], columns["MatchedClusters"]))
+    batch_mismatches = [i for i, (e, g) in enumerate(zip(expected, got)) if e != g]
+    print(f"classify_batch: {t_batch:7.2f}s  (x{t_ref / t_batch:.1f})")
+    print(f"identical batch results: {not batch_mismatches} ({len(batch_mismatches)} mismatches)")
+
+    if "--batch" in args:
+        n = int(args[args.index("--batch") + 1])
+        many = make_articles(config, n, seed=9)
+        start = time.perf_counter()
+        classify_batch(*zip(*many), ClusterMatcher(compiled))
+        print(f"classify_batch on {n} articles: {time.perf_counter() - start:.2f}s "
+              f"({os.cpu_count() or 1} worker process(es) for batches of {PARALLEL_MIN_TEXTS}+ texts)")
+
+    if mismatches or batch_mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
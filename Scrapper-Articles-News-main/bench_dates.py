@@ -0,0 +1,99 @@
+"""
+Benchmark + equivalence check: publication dates
+1. parse_published gives the same instant as pandas for every date format the
+   feeds send (RFC-822 with zones, ISO with Z/offsets, NewsData's "YYYY-MM-DD hh:mm:ss").
+2. Times the old app2.py sort (pd.to_datetime per article, on every rerun)
+   against the new one (dates parsed once at ingest, order computed once,
+   "oldest first" = the list read backwards).
+
+Run:  python bench_dates.py
+      python bench_dates.py --articles 20000
+"""
+
+import random
+import sys
+import time
+from email.utils import parsedate_to_datetime
+
+import pandas as pd
+
+from article_record import Article
+from pub_dates import newest_first, parse_published
+
+SAMPLES = [
+    "Mon, 09 Jun 2025 10:00:00 GMT", "Tue, 1 Jul 2025 13:00:00 +0530", "Fri, 06 Jun 2025 23:59:00 -0400",
+    "Sat, 07 Jun 2025 01:00:00 EDT", "07 Jun 2025 01:00 GMT", "2025-06-15T08:00:00Z", "2025-06-15T08:00:00+05:30",
+    "2025-06-15 08:00:00", "2025-06-15T08:00:00.123Z", "2025-06-15",
+]
+
+
+def reference_ts(text):
+    """pandas' answer (the standard library's when pandas can't read the zone name, e.g. EDT)."""
+    ts = pd.to_datetime(text, errors="coerce", utc=True)
+    if ts is pd.NaT:
+        try:
+            return int(parsedate_to_datetime(text).timestamp())
+        except (TypeError, ValueError):
+            return None
+    return int(ts.timestamp())
+
+
+def old_sort(articles, newest):
+    """The old app2.py sort key, run on every rerun."""
+    def get_sortable_timestamp(article):
+        if not article.get('published'):
+            return pd.Timestamp.min.tz_localize(None)
+        timestamp = pd.to_datetime(article['published'], errors='coerce')
+        if timestamp is pd.NaT:
+            return pd.Timestamp.min.tz_localize(None)
+        if timestamp.tz is not None:
+            timestamp = timestamp.tz_localize(None)
+        return timestamp
+    articles.sort(key=get_sortable_timestamp, reverse=newest)
+
+
+def main():
+    args = sys.argv[1:]
+    n = int(args[args.index("--articles") + 1]) if "--articles" in args else 5000
+
+    ok = True
+    for text in SAMPLES:
+        got, want = parse_published(text), reference_ts(text)
+        ok &= got == want
+        print(f"{text:<34} {got} {'ok' if got == want else f'!= pandas {want}'}")
+    ok &= parse_published("") is None and parse_published("not a date") is None
+
+    rnd = random.Random(3)
+    base = 1_750_000_000
+    texts = [time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(base + rnd.randint(0, 30 * 86400)))
+             if i % 50 else "" for i in range(n)]
+
+    start = time.perf_counter()
+    articles = [Article(title=str(i), link=f"https://example.com/{i}", published=t) for i, t in enumerate(texts)]
+    t_ingest = time.perf_counter() - start
+
+    start = time.perf_counter()
+    old_sort(list(articles), newest=True)
+    t_old = time.perf_counter() - start
+
+    start = time.perf_counter()
+    order = newest_first(articles)
+    t_order = time.perf_counter() - start
+    start = time.perf_counter()
+    oldest = order[::-1]
+    t_flip = time.perf_counter() - start
+
+    stamps = [articles[i].published_ts for i in order if articles[i].published_ts is not None]
+    ok &= stamps == sorted(stamps, reverse=True) and articles[oldest[0]].published_ts is None
+
+    print(f"\n{n} articles: creating them (dates parsed once) {t_ingest * 1000:.0f} ms in total")
+    print(f"  old sort, every rerun:    {t_old * 1000:8.1f} ms")
+    print(f"  newest_first, once:       {t_order * 1000:8.1f} ms")
+    print(f"  oldest first, every rerun:{t_flip * 1000:8.3f} ms")
+    if not ok:
+        print("MISMATCH")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
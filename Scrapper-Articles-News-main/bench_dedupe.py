@@ -0,0 +1,137 @@
+"""
+Benchmark: headline deduplication
+Compares the old compare-with-everything loop from HybridNewsFetcher with
+the MinHash/LSH deduper in dedupe.py on synthetic headlines, then measures
+recall: how many look-alike pairs (fuzz.ratio >= 85) LSH never compares,
+on headlines with typos (the case where banding misses most).
+
+Run:  python bench_dedupe.py            (1k, 10k, 50k; old loop up to 10k)
+      python bench_dedupe.py --legacy-all   (also run the old loop at 50k - very slow)
+"""
+
+import random
+import sys
+import time
+
+from fuzzywuzzy import fuzz
+
+from dedupe import MinHasher, MinHashLSH, char_shingles, deduplicate_headlines
+
+WORDS = ("india tata motors launches new electric suv market share rises shares fall bank rbi "
+         "policy rate hike inflation cools government announces scheme farmers crop monsoon "
+         "rainfall tech startup raises funding series ai model google microsoft apple iphone "
+         "sales quarter profit revenue growth exports imports trade deal china us tariffs court "
+         "verdict election results minister says plan budget tax cut pharma drug approval "
+         "hospital health ministry climate summit solar power project").split()
+SOURCES = ["Reuters", "Reuters.com", "The Hindu", "Economic Times", "Mint", "BBC", "CNBC"]
+PROVIDERS = ["NewsAPI", "GNews", "NewsData"]
+
+
+def make_headlines(n, dup_rate=0.3, seed=7):
+    """Random headlines where ~30% are edited copies (suffix, swapped word, case...)."""
+    rnd = random.Random(seed)
+    base, out = [], []
+    while len(out) < n:
+        if base and rnd.random() < dup_rate:
+            words = rnd.choice(base).split()
+            r = rnd.random()
+            if r < 0.35:
+                words.append("- " + rnd.choice(SOURCES))
+            elif r < 0.7:
+                words[rnd.randrange(len(words))] = rnd.choice(WORDS)
+            else:
+                del words[rnd.randrange(len(words))]
+            headline = " ".join(words)
+        else:
+            headline = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(6, 13))).capitalize()
+            base.append(headline)
+        out.append({"headline": headline, "api_source": rnd.choice(PROVIDERS)})
+    return out
+
+
+def typo_pairs(n, seed=3, threshold=85):
+    """(original, copy with 1-4 character typos) pairs that fuzz.ratio still calls duplicates."""
+    rnd = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz "
+    heads = [a["headline"].lower() for a in make_headlines(2000, dup_rate=0, seed=5)]
+    pairs = []
+    while len(pairs) < n:
+        a = rnd.choice(heads)
+        if rnd.random() < 0.5:
+            a = " ".join(a.split()[:rnd.randint(3, 5)])  # short headlines miss most
+        b = list(a)
+        for _ in range(rnd.randint(1, 4)):
+            k = rnd.randrange(len(b))
+            op = rnd.random()
+            if op < 0.4:
+                b[k] = rnd.choice(letters)
+            elif op < 0.7:
+                del b[k]
+            else:
+                b.insert(k, rnd.choice(letters))
+            b = b or ["x"]
+        b = "".join(b)
+        if fuzz.ratio(a, b) >= threshold:
+            pairs.append((a, b))
+    return pairs
+
+
+def lsh_misses(pairs, num_perm=128, bands=32):
+    """How many pairs never share an LSH band (HeadlineDeduper never compares them)."""
+    hasher = MinHasher(num_perm)
+    missed = 0
+    for a, b in pairs:
+        lsh = MinHashLSH(num_perm, bands)
+        lsh.insert(0, hasher.signature(char_shingles(a)))
+        missed += not lsh.query(hasher.signature(char_shingles(b)))
+    return missed
+
+
+def legacy_dedupe(articles, similarity_threshold=85):
+    """The original HybridNewsFetcher.deduplicate_articles loop."""
+    unique_articles = []
+    for article in articles:
+        headline = article.get("headline", "").lower().strip()
+        if not headline:
+            continue
+        is_duplicate = False
+        for unique in unique_articles:
+            if fuzz.ratio(headline, unique.get("headline", "").lower().strip()) >= similarity_threshold:
+                is_duplicate = True
+                if article.get("api_source") == "NewsAPI" and unique.get("api_source") != "NewsAPI":
+                    unique_articles.remove(unique)
+                    unique_articles.append(article)
+                break
+        if not is_duplicate:
+            unique_articles.append(article)
+    return unique_articles
+
+
+def main():
+    legacy_all = "--legacy-all" in sys.argv
+    for n in (1_000, 10_000, 50_000):
+        articles = make_headlines(n)
+
+        start = time.perf_counter()
+        new = deduplicate_headlines(articles)
+        new_time = time.perf_counter() - start
+        line = f"{n:>6} headlines | LSH: {new_time:7.2f}s -> {len(new)} kept"
+
+        if n <= 10_000 or legacy_all:
+            start = time.perf_counter()
+            old = legacy_dedupe(articles)
+            old_time = time.perf_counter() - start
+            same = [id(a) for a in old] == [id(a) for a in new]
+            line += f" | old loop: {old_time:7.2f}s -> {len(old)} kept | identical: {same}"
+        else:
+            line += " | old loop: skipped (use --legacy-all)"
+        print(line)
+
+    pairs = typo_pairs(5_000)
+    missed = lsh_misses(pairs)
+    print(f"Recall on {len(pairs)} typo pairs with fuzz.ratio >= 85: "
+          f"{missed} never compared by LSH ({missed / len(pairs):.1%} kept as separate articles)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark + equivalence check: Word reports
+Compares the old python-docx builders (copied below from app.py as the
+reference) with docx_report.py on synthetic results: every part of the .docx
+(document.xml, styles, ...) must be identical. Prints time and peak Python
+memory for 1k and 5k articles (tracemalloc doesn't see lxml's own memory, so
+the python-docx figures are lower than what the process really uses).
+
+Run:  python bench_docx.py
+      python bench_docx.py --sizes 1000 5000 20000
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+import zipfile
+from io import BytesIO
+
+import pandas as pd
+from docx import Document
+
+from docx_report import word_basic, word_grouped
+from pub_dates import parse_published
+
+
+# ---------- reference (the old app.py code) ----------
+def generate_word_basic(df: pd.DataFrame) -> bytes:
+    doc = Document()
+    doc.add_heading("News Articles", 0)
+    for _, row in df.iterrows():
+        doc.add_heading(row.get('Headline', 'Untitled'), level=1)
+        doc.add_paragraph(f"Source: {row.get('Source','')}")
+        doc.add_paragraph(f"Date: {row.get('Published','')}")
+        doc.add_paragraph(f"Link: {row.get('Link','')}")
+        doc.add_paragraph("Article:", style="Intense Quote")
+        doc.add_paragraph(str(row.get('Article', "")))
+        doc.add_paragraph("Summary:", style="Intense Quote")
+        doc.add_paragraph(str(row.get('Summary', "")))
+        doc.add_paragraph("\n---\n")
+    buf = BytesIO(); doc.save(buf); return buf.getvalue()
+
+
+def generate_word_grouped(df: pd.DataFrame, top_n_per_cluster: int = 5) -> bytes:
+    doc = Document()
+    doc.add_heading("Clustered News Report", 0)
+    if df.empty or "PrimaryCluster" not in df.columns:
+        doc.add_paragraph("No clustered data available.")
+        buf = BytesIO(); doc.save(buf); return buf.getvalue()
+    for cluster in sorted(df["PrimaryCluster"].dropna().unique()):
+        cluster_df = df[df["PrimaryCluster"] == cluster].copy()
+        if cluster_df.empty:
+            continue
+        doc.add_heading(cluster, level=1)
+        doc.add_heading(f"Top {top_n_per_cluster} Articles", level=2)
+        # (the old code sorted the date text; the report now sorts by the parsed date)
+        cluster_df["_ts"] = cluster_df["Published"].map(parse_published).astype(float)
+        top_articles = (cluster_df.sort_values(["RelevanceScore","_ts"], ascending=[False, True]).head(top_n_per_cluster))
+        for _, row in top_articles.iterrows():
+            doc.add_heading(row.get("Headline","Untitled"), level=3)
+            doc.add_paragraph(f"Source: {row.get('Source','')}")
+            doc.add_paragraph(f"Date: {row.get('Published','')}")
+            doc.add_paragraph(f"Link: {row.get('Link','')}")
+            doc.add_paragraph("Summary:", style="Intense Quote")
+            doc.add_paragraph(row.get("Summary","") or "-")
+    buf = BytesIO(); doc.save(buf); return buf.getvalue()
+
+
+# ---------- synthetic results ----------
+WORDS = ("India tobacco vape policy market rupee growth minister said on Tuesday & <report> "
+         "\"quoted\" café straße 5% — naïve").split()
+DATES = ["Mon, 30 Jun 2025 10:00:00 GMT", "Tue, 01 Jul 2025 09:00:00 GMT", "Tue, 01 Jul 2025 13:00:00 +0530",
+         "Fri, 06 Jun 2025 23:59:00 -0400", "Sat, 07 Jun 2025 01:00:00 GMT", "2025-06-15T08:00:00Z", ""]
+CLUSTERS = ["Brand Monitoring", "Market Trends", "Regulatory & Institutional", "Safer Alternatives (ENDS/HTP)",
+            "KOLs & Experts", "Cohort: <B>"]
+
+
+def make_results(n, seed=7):
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(n):
+        paragraphs = [" ".join(rnd.choice(WORDS) for _ in range(rnd.randint(20, 80))) for _ in range(rnd.randint(3, 12))]
+        rows.append({
+            "Source": rnd.choice(["Reuters", "The Hindu", "Mint", "  Spaced Out  "]),
+            # Few distinct dates + rounded scores, so the sort has plenty of ties;
+            # dates span months and zones, so sorting the text would give the wrong order
+            "Published": rnd.choice(DATES),
+            "Headline": " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(4, 12))).capitalize(),
+            "Link": f"https://example.com/{i}?a=1&b=2",
+            "Article": "\n\n".join(paragraphs) + ("\twith a tab " if i % 7 == 0 else ""),
+            "Summary": "" if i % 11 == 0 else " ".join(rnd.choice(WORDS) for _ in range(40)),
+            "PrimaryCluster": rnd.choice(CLUSTERS) if i % 5 else None,
+            "RelevanceScore": float(rnd.randint(1, 6) * 4),
+            "MatchedClusters": rnd.sample(CLUSTERS, 2),
+        })
+    return pd.DataFrame(rows)
+
+
+def parts(docx_bytes):
+    with zipfile.ZipFile(BytesIO(docx_bytes)) as zf:
+        return {info.filename: zf.read(info.filename) for info in zf.infolist()}
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    out = fn(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return out, elapsed, peak
+
+
+def main():
+    args = sys.argv[1:]
+    sizes = [int(a) for a in args[args.index("--sizes") + 1:]] if "--sizes" in args else [1000, 5000]
+    ok = True
+    for n in sizes:
+        df = make_results(n)
+        by_cluster = df[df["PrimaryCluster"].notna()]
+        for name, old, new, data in (("basic  ", generate_word_basic, word_basic, (df,)),
+                                     ("grouped", generate_word_grouped, word_grouped, (by_cluster,))):
+            ref, t_ref, m_ref = measure(old, *data)
+            got, t_new, m_new = measure(new, *data)
+            same = parts(ref) == parts(got)
+            ok &= same
+            print(f"{n:>6} articles {name}: python-docx {t_ref:6.2f}s {m_ref:7.1f} MB | "
+                  f"docx_report {t_new:6.2f}s {m_new:6.1f} MB (x{t_ref / t_new:.0f}) | identical: {same}")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
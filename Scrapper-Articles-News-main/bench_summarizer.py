@@ -0,0 +1,183 @@
+"""
+Benchmark: local extractive summarizer
+- Throughput: articles per minute for the "textrank" and "tfidf" methods on
+  one CPU.
+- Quality: ROUGE-1/2/L (F1) against two kinds of reference:
+  - "written": hand-written reference summaries (the built-in sample's, or
+    the "reference" field of --sample rows);
+  - "HF model": the Hugging Face model's own summaries (what app.py shows
+    with the remote summarizer), asked for with --hf. This is the
+    comparison that matters when switching app.py to the local summarizer.
+
+Run:  python bench_summarizer.py
+          (built-in mini sample + synthetic articles for throughput)
+      python bench_summarizer.py --hf
+          (also score against the HF model; needs its API key, uses the disk cache)
+      python bench_summarizer.py --sample articles.jsonl [--hf]
+          (one {"text": ..., "reference": ...} per line; "reference" is optional with --hf)
+"""
+
+import json
+import random
+import sys
+import time
+from collections import Counter
+
+from extractive_summarizer import LocalSummarizer, split_sentences
+
+# A tiny built-in sample so the script runs anywhere. For real numbers use
+# --sample with HF summaries of your own scraped articles.
+BUILTIN_SAMPLE = [
+    {
+        "text": "The Reserve Bank of India kept its key repo rate unchanged at 6.5% on Friday, as expected, "
+                "citing sticky food inflation. Governor Shaktikanta Das said the central bank would remain "
+                "focused on bringing inflation down to its 4% target. Retail inflation eased to 4.8% in May "
+                "from 4.83% in April. Economists polled by Reuters had expected no change in rates. The "
+                "monetary policy committee voted 4-2 to hold the rate. Two members voted for a 25 basis "
+                "point cut. The RBI also raised its growth forecast for the current fiscal year to 7.2%. "
+                "Bond yields fell slightly after the decision, while the rupee was little changed.",
+        "reference": "The Reserve Bank of India kept its key repo rate unchanged at 6.5% citing sticky food "
+                     "inflation. The monetary policy committee voted 4-2 to hold the rate and raised its "
+                     "growth forecast to 7.2%.",
+    },
+    {
+        "text": "Tata Motors on Tuesday launched a new electric SUV priced from 17.5 lakh rupees, aiming to "
+                "defend its lead in India's fast-growing EV market. The company said the vehicle offers a "
+                "range of up to 500 km on a single charge. Tata Motors sells about two-thirds of the "
+                "electric cars in India. Rivals including Mahindra and Hyundai are preparing their own "
+                "launches this year. Electric vehicles made up about 2% of India's car sales last year. "
+                "The government wants that share to reach 30% by 2030. Shares of Tata Motors rose 1.2% "
+                "after the launch.",
+        "reference": "Tata Motors launched a new electric SUV priced from 17.5 lakh rupees with a range of up "
+                     "to 500 km. The company sells about two-thirds of the electric cars in India.",
+    },
+    {
+        "text": "Heavy rain lashed Mumbai for a second straight day on Monday, flooding roads and disrupting "
+                "suburban train services. The India Meteorological Department issued a red alert for the "
+                "city and nearby districts. Schools and colleges were ordered shut. Several flights at "
+                "Mumbai airport were diverted because of poor visibility. The city received more than 200 "
+                "mm of rain in 24 hours, the weather office said. Civic officials urged residents to stay "
+                "indoors. Local train services on the Central line were suspended for several hours.",
+        "reference": "Heavy rain flooded Mumbai roads and disrupted train services for a second day. The "
+                     "India Meteorological Department issued a red alert and schools were ordered shut.",
+    },
+    {
+        "text": "Infosys reported a 7% rise in quarterly profit on Thursday, beating analyst estimates, as "
+                "demand for digital services held up. Net profit rose to 6,368 crore rupees in the "
+                "April-June quarter. Revenue grew 3.6% to 39,315 crore rupees. The company kept its full-year "
+                "revenue growth forecast at 1% to 3% in constant currency terms. Chief Executive Salil "
+                "Parekh said large deal wins remained strong. Infosys signed large deals worth $4.1 billion "
+                "in the quarter. Its shares closed 1.5% higher ahead of the results.",
+        "reference": "Infosys reported a 7% rise in quarterly profit, beating estimates, as net profit rose "
+                     "to 6,368 crore rupees. The company kept its full-year revenue growth forecast at 1% to 3%.",
+    },
+]
+
+
+# ---------- ROUGE (F1), no extra dependency ----------
+def _words(text):
+    return [w.strip(".,;:!?\"'()").lower() for w in text.split() if w.strip(".,;:!?\"'()")]
+
+
+def rouge_n(candidate, reference, n):
+    c, r = _words(candidate), _words(reference)
+    cg = Counter(tuple(c[i:i + n]) for i in range(len(c) - n + 1))
+    rg = Counter(tuple(r[i:i + n]) for i in range(len(r) - n + 1))
+    overlap = sum((cg & rg).values())
+    if not overlap:
+        return 0.0
+    p, rec = overlap / sum(cg.values()), overlap / sum(rg.values())
+    return 2 * p * rec / (p + rec)
+
+
+def rouge_l(candidate, reference):
+    c, r = _words(candidate), _words(reference)
+    if not c or not r:
+        return 0.0
+    prev = [0] * (len(r) + 1)
+    for cw in c:
+        cur = [0]
+        for j, rw in enumerate(r):
+            cur.append(prev[j] + 1 if cw == rw else max(prev[j + 1], cur[j]))
+        prev = cur
+    lcs = prev[-1]
+    if not lcs:
+        return 0.0
+    p, rec = lcs / len(c), lcs / len(r)
+    return 2 * p * rec / (p + rec)
+
+
+def load_sample(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def add_hf_summaries(rows):
+    """Put the HF model's summary of each row's text in row["hf"] (skipped where the call fails)."""
+    from summarizer import SummarizationError, SummarizationService
+    try:
+        service = SummarizationService()
+    except ImportError as e:
+        print(f"HF model comparison skipped: {e} (pip install huggingface_hub)")
+        return
+    failed = 0
+    for row, result in zip(rows, service.summarize_many([r["text"] for r in rows])):
+        if isinstance(result, SummarizationError):
+            failed += 1
+        else:
+            row["hf"] = result
+    if failed:
+        print(f"HF model: {failed} of {len(rows)} summaries failed (check the API key); those rows are skipped.")
+
+
+def rouge_scores(summarize, rows, field):
+    """Mean ROUGE-1/2/L of `summarize(text)` against row[field], over rows that have it."""
+    rows = [r for r in rows if r.get(field)]
+    if not rows:
+        return None
+    scores = []
+    for r in rows:
+        candidate = summarize(r["text"])
+        scores.append((rouge_n(candidate, r[field], 1), rouge_n(candidate, r[field], 2),
+                       rouge_l(candidate, r[field])))
+    return tuple(sum(s[i] for s in scores) / len(scores) for i in range(3)) + (len(rows),)
+
+
+def synthetic_articles(sample, n, seed=3):
+    """Articles of 15-40 sentences shuffled together from the sample (throughput only)."""
+    rnd = random.Random(seed)
+    pool = [s for row in sample for s in split_sentences(row["text"])]
+    return [" ".join(rnd.choice(pool) for _ in range(rnd.randint(15, 40))) for _ in range(n)]
+
+
+def main():
+    args = sys.argv[1:]
+    if "--sample" in args:
+        sample = load_sample(args[args.index("--sample") + 1])
+    else:
+        sample = BUILTIN_SAMPLE
+        print("Using the built-in mini sample (pass --sample for your own articles).")
+    if "--hf" in args:
+        add_hf_summaries(sample)
+    else:
+        print("Scoring against hand-written references only (pass --hf to compare with the HF model).")
+    references = [("written", "reference"), ("HF model", "hf")]
+
+    docs = synthetic_articles(sample, 2000)
+    lead_2 = lambda text: " ".join(split_sentences(text)[:2])
+    for method in ("textrank", "tfidf", "lead-2"):
+        summarizer = lead_2 if method == "lead-2" else LocalSummarizer(method)
+        start = time.perf_counter()
+        for doc in docs:
+            summarizer(doc)
+        per_minute = len(docs) / (time.perf_counter() - start) * 60
+        print(f"{method:>9}: {per_minute:9,.0f} articles/min")
+        for label, field in references:
+            scores = rouge_scores(summarizer, sample, field)
+            if scores is not None:
+                r1, r2, rl, n = scores
+                print(f"{'':>9}  vs {label:<8} ROUGE-1 {r1:.3f}  ROUGE-2 {r2:.3f}  ROUGE-L {rl:.3f}  (n={n})")
+
+
+if __name__ == "__main__":
+    main()
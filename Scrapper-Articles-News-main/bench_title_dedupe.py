@@ -0,0 +1,108 @@
+"""
+Benchmark: Google News title dedupe (old 20+20 character key vs SimHash)
+Runs both methods over a small hand-labeled sample of title pairs and
+reports how often each one merges different stories (false merge) or
+keeps two copies of the same story (false split).
+
+Run:  python bench_title_dedupe.py
+"""
+
+from dedupe import TitleDeduper
+
+# (title A, source A, title B, source B, same story?)
+LABELED_PAIRS = [
+    # Same story, different publisher suffix / punctuation / case
+    ("Tata Motors launches new electric SUV in India - Reuters", "Reuters",
+     "Tata Motors launches new electric SUV in India - Reuters.com", "Reuters.com", True),
+    ("RBI keeps repo rate unchanged at 6.5% for eighth time - The Hindu", "The Hindu",
+     "RBI keeps repo rate unchanged at 6.5% for eighth time - The Hindu BusinessLine", "The Hindu BusinessLine", True),
+    ("Apple unveils iPhone 17 with bigger battery - CNBC", "CNBC",
+     "Apple unveils iPhone 17 with bigger battery | CNBC TV18", "CNBC TV18", True),
+    ("Infosys Q2 results: Net profit rises 5% to Rs 6,506 crore - Moneycontrol", "Moneycontrol",
+     "Infosys Q2 Results: Net Profit Rises 5% To Rs 6,506 Crore - moneycontrol.com", "moneycontrol.com", True),
+    ("Heatwave alert issued for Delhi as temperature crosses 45 degrees - NDTV", "NDTV",
+     "Heatwave alert issued for Delhi as temperatures cross 45 degrees - NDTV", "NDTV", True),
+    ("SpaceX launches 23 Starlink satellites from Florida - Space.com", "Space.com",
+     "SpaceX launches 23 Starlink satellites from Florida - Yahoo News", "Yahoo News", True),
+    ("Government extends free ration scheme for five more years - Economic Times", "Economic Times",
+     "Govt extends free ration scheme for five more years - The Economic Times", "The Economic Times", True),
+    ("Sensex jumps 800 points, Nifty reclaims 24,000 amid global rally - Mint", "Mint",
+     "Sensex jumps 800 points; Nifty reclaims 24,000 amid global rally - Livemint", "Livemint", True),
+    ("WHO warns of rising dengue cases across South Asia - BBC", "BBC",
+     "WHO warns of rising dengue cases across South Asia - BBC News", "BBC News", True),
+    ("Adani Group shares surge after US court ruling - Business Standard", "Business Standard",
+     "Adani Group shares surge after US court ruling - Business Standard", "Business Standard", True),
+    ("Maruti Suzuki hikes car prices by up to 2% from January - Autocar India", "Autocar India",
+     "Maruti Suzuki hikes car prices by up to 2 per cent from January - Autocar India", "Autocar India", True),
+    ("Zomato shares hit record high after strong quarterly earnings - Reuters", "Reuters",
+     "Zomato shares hit record high after strong quarterly earnings, brokerages bullish - Reuters", "Reuters", True),
+    ("ISRO successfully tests reusable launch vehicle - The Times of India", "The Times of India",
+     "ISRO successfully tests reusable launch vehicle - Times of India", "Times of India", True),
+    ("Nvidia becomes world's most valuable company - Financial Times", "Financial Times",
+     "Nvidia becomes world’s most valuable company - FT", "FT", True),
+
+    # Different stories that share a boilerplate prefix or suffix
+    ("Stock market today: Sensex falls 500 points as banks drag - Mint", "Mint",
+     "Stock market today: Nifty hits record high on IT rally - Mint", "Mint", False),
+    ("Stock market today: Sensex falls 500 points as banks drag - Mint", "Mint",
+     "Stock market today: Sensex rises 300 points as metals gain - Mint", "Mint", False),
+    ("Gold rate today: Prices fall for third straight day in Mumbai - NDTV", "NDTV",
+     "Gold rate today: Prices rise sharply in Chennai on wedding demand - NDTV", "NDTV", False),
+    ("Live updates: Parliament winter session begins with heated debate - Hindustan Times", "Hindustan Times",
+     "Live updates: India vs Australia third Test day two at Brisbane - Hindustan Times", "Hindustan Times", False),
+    ("Weather update: Heavy rain lashes Mumbai, local trains delayed - NDTV", "NDTV",
+     "Weather update: Cold wave grips north India, Delhi shivers at 4 degrees - NDTV", "NDTV", False),
+    ("Petrol, diesel prices today: Check latest fuel rates in your city - Economic Times", "Economic Times",
+     "Petrol, diesel prices today: Rates unchanged in metros on Sunday - Economic Times", "Economic Times", False),
+    ("Q3 results today: HDFC Bank, Infosys, Wipro to announce earnings - Moneycontrol", "Moneycontrol",
+     "Q3 results today: TCS, ITC and Asian Paints on the calendar - Moneycontrol", "Moneycontrol", False),
+    ("Tata Motors launches new electric SUV in India - Reuters", "Reuters",
+     "Tata Motors recalls electric SUVs in India over battery fault - Reuters", "Reuters", False),
+    ("Apple unveils iPhone 17 with bigger battery - CNBC", "CNBC",
+     "Apple delays iPhone 17 production in India - CNBC", "CNBC", False),
+    ("RBI keeps repo rate unchanged at 6.5% for eighth time - The Hindu", "The Hindu",
+     "RBI cuts repo rate by 25 basis points to 6.25% - The Hindu", "The Hindu", False),
+    ("Breaking news: Earthquake of magnitude 5.2 hits Nepal, tremors felt in Bihar - India Today", "India Today",
+     "Breaking news: Fire breaks out at Delhi factory, 10 fire tenders rushed - India Today", "India Today", False),
+    ("Budget 2025 highlights: What it means for salaried taxpayers - Mint", "Mint",
+     "Budget 2025 highlights: What it means for farmers and rural India - Mint", "Mint", False),
+    ("Explained: Why onion prices are rising again this winter - Indian Express", "Indian Express",
+     "Explained: Why the monsoon is arriving late in Kerala this year - Indian Express", "Indian Express", False),
+    ("Market wrap: Sensex, Nifty end higher led by auto and FMCG stocks - Business Standard", "Business Standard",
+     "Market wrap: Sensex, Nifty end lower as IT and bank stocks slide - Business Standard", "Business Standard", False),
+]
+
+
+def old_key(title):
+    """The original fetch_gdelt_simple key: first + last 20 chars, no spaces."""
+    if len(title) > 20:
+        return (title[:20] + title[-20:]).lower().replace(" ", "")
+    return title.lower().replace(" ", "")
+
+
+def simhash_merges(a, src_a, b, src_b):
+    deduper = TitleDeduper()
+    deduper.is_duplicate(a, f"{a} {src_a}", src_a)
+    return deduper.is_duplicate(b, f"{b} {src_b}", src_b)
+
+
+def rates(predictions):
+    same = [p for p, (*_, label) in zip(predictions, LABELED_PAIRS) if label]
+    diff = [p for p, (*_, label) in zip(predictions, LABELED_PAIRS) if not label]
+    false_split = sum(1 for p in same if not p) / len(same)
+    false_merge = sum(1 for p in diff if p) / len(diff)
+    return false_merge, false_split
+
+
+def main():
+    old = [old_key(a) == old_key(b) for a, _, b, _, _ in LABELED_PAIRS]
+    new = [simhash_merges(a, sa, b, sb) for a, sa, b, sb, _ in LABELED_PAIRS]
+    print(f"{len(LABELED_PAIRS)} labeled pairs "
+          f"({sum(1 for p in LABELED_PAIRS if p[4])} same story, {sum(1 for p in LABELED_PAIRS if not p[4])} different)")
+    for name, preds in (("old 20+20 key", old), ("SimHash", new)):
+        fm, fs = rates(preds)
+        print(f"{name:>14}: false merge {fm:6.1%} | false split {fs:6.1%}")
+
+
+if __name__ == "__main__":
+    main()
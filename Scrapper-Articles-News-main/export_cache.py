@@ -0,0 +1,44 @@
+"""
+Export Cache (report files built only when asked, once per result set)
+Both apps used to rebuild every download (Excel, Word, CSV) on EVERY
+Streamlit rerun, i.e. on every click anywhere on the page. app.py also
+base64-encoded each file into the page HTML as a `data:` link, which makes it
+a third bigger and keeps extra copies in memory.
+
+Now:
+- `result_fingerprint` gives a short hash of the current results (same rows
+  in the same order -> same fingerprint).
+- The apps build a file only when its "Prepare" button is clicked, cache it
+  under (kind, fingerprint), and hand it to `st.download_button`, which
+  serves it from Streamlit's media endpoint instead of the page HTML.
+- Reruns with unchanged results reuse the cached file; new results get a new
+  fingerprint, so an old file is never served for them.
+"""
+
+import hashlib
+from typing import Iterable, Optional, Sequence
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+CSV_MIME = "text/csv"
+
+
+def result_fingerprint(rows: Iterable, fields: Optional[Sequence[str]] = None) -> str:
+    """
+    Hash of a result set. `rows` are dicts (or dict-like records); with
+    `fields` only those keys are hashed (e.g. to skip full texts that would
+    have to be read from disk).
+    """
+    h = hashlib.sha1()
+    count = 0
+    for row in rows:
+        if fields is None:
+            items = sorted(row.items(), key=lambda kv: str(kv[0]))
+        else:
+            items = [(f, row.get(f)) for f in fields]
+        for key, value in items:
+            h.update(f"{key}={value!r}".encode("utf-8", "surrogatepass"))
+            h.update(b"\x1f")
+        h.update(b"\x1e")
+        count += 1
+    return f"{count}-{h.hexdigest()[:16]}"
@@ -0,0 +1,223 @@
+"""
+Streaming Export Sinks (write results to disk while the run is going)
+Exports used to be made at the very end, from one big DataFrame holding
+every article. A big run needed all of it in memory, and if the run died
+halfway there was no file at all.
+
+A sink takes one finished article (a dict row) at a time:
+- `CsvSink`:     appends one line per article and flushes it.
+- `JsonlSink`:   one JSON object per line, flushed per article.
+- `ParquetSink`: collects `row_group_size` rows, then writes them as one
+                 complete Parquet part file inside a folder
+                 (`news.parquet/part-00000.parquet`, ...). pandas/pyarrow
+                 read the folder as one table.
+Memory stays at most one row group, and after an interruption every line /
+part file already written is complete and readable.
+
+`open_sinks` opens several formats at once and returns one `MultiSink`.
+"""
+
+import abc
+import csv
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Sequence
+
+
+def _cell(value):
+    """Flat value for CSV/Parquet cells (lists like MatchedClusters become 'a, b')."""
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple, set)):
+        return ", ".join(str(v) for v in value)
+    if isinstance(value, BaseException):
+        return str(value)
+    return value
+
+
+class ExportSink(abc.ABC):
+    """Base class: `write(row)` per article, `close()` at the end (also a context manager)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rows = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    @abc.abstractmethod
+    def write(self, row: Dict):
+        """Write one article row."""
+
+    def write_many(self, rows: Iterable[Dict]):
+        for row in rows:
+            self.write(row)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class CsvSink(ExportSink):
+    """Append-only CSV. The header comes from `columns` (or the first row's keys)."""
+
+    def __init__(self, path: str, columns: Optional[Sequence[str]] = None):
+        super().__init__(path)
+        self.columns = list(columns) if columns else None
+        # Appending to an existing file (e.g. a resumed run) must not repeat the header
+        self._has_header = os.path.exists(path) and os.path.getsize(path) > 0
+        self._file = open(path, "a", newline="", encoding="utf-8")
+        self._writer = None
+
+    def write(self, row: Dict):
+        if self._writer is None:
+            self.columns = self.columns or list(row)
+            self._writer = csv.DictWriter(self._file, fieldnames=self.columns, extrasaction="ignore", restval="")
+            if not self._has_header:
+                self._writer.writeheader()
+        self._writer.writerow({k: _cell(row.get(k)) for k in self.columns})
+        self._file.flush()
+        self.rows += 1
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+class JsonlSink(ExportSink):
+    """One JSON object per line (lists stay lists)."""
+
+    def __init__(self, path: str, columns: Optional[Sequence[str]] = None):
+        super().__init__(path)
+        self.columns = list(columns) if columns else None
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, row: Dict):
+        if self.columns:
+            row = {k: row.get(k) for k in self.columns}
+        self._file.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+        self._file.flush()
+        self.rows += 1
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+class ParquetSink(ExportSink):
+    """
+    Parquet in row groups: every `row_group_size` rows become one finished
+    part file in the `path` folder (zstd). Column types come from the first
+    row group: numbers stay numbers, everything else is text. Needs pyarrow.
+    """
+
+    def __init__(self, path: str, columns: Optional[Sequence[str]] = None, row_group_size: int = 1000):
+        import pyarrow  # noqa: F401  (fail early with a clear ImportError)
+        super().__init__(path)
+        os.makedirs(path, exist_ok=True)
+        self.columns = list(columns) if columns else None
+        self.row_group_size = row_group_size
+        self._buffer: List[Dict] = []
+        self._schema = None
+        self._parts = len([f for f in os.listdir(path) if f.endswith(".parquet")])
+
+    def write(self, row: Dict):
+        self.columns = self.columns or list(row)
+        self._buffer.append({k: _cell(row.get(k)) for k in self.columns})
+        self.rows += 1
+        if len(self._buffer) >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        if self._schema is None:
+            self._schema = self._infer_schema(self._buffer)
+        table = pa.Table.from_pylist([self._conform(r) for r in self._buffer], schema=self._schema)
+        final = os.path.join(self.path, f"part-{self._parts:05d}.parquet")
+        # Write under a temp name first, so a half-written part is never picked up
+        tmp = final + ".tmp"
+        pq.write_table(table, tmp, compression="zstd")
+        os.replace(tmp, final)
+        self._parts += 1
+        self._buffer = []
+
+    def _infer_schema(self, rows: List[Dict]):
+        import pyarrow as pa
+        fields = []
+        for name in self.columns:
+            values = [r[name] for r in rows if r[name] != ""]
+            if values and all(isinstance(v, bool) for v in values):
+                kind = pa.bool_()
+            elif values and all(isinstance(v, int) and not isinstance(v, bool) for v in values):
+                kind = pa.int64()
+            elif values and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+                kind = pa.float64()
+            else:
+                kind = pa.string()
+            fields.append(pa.field(name, kind))
+        return pa.schema(fields)
+
+    def _conform(self, row: Dict) -> Dict:
+        """Fit a row to the schema: text columns get str(), typed columns get None when empty or wrong."""
+        import pyarrow as pa
+        out = {}
+        for f in self._schema:
+            v = row[f.name]
+            if f.type == pa.string():
+                out[f.name] = v if isinstance(v, str) else str(v)
+            elif f.type == pa.bool_():
+                out[f.name] = v if isinstance(v, bool) else None
+            elif f.type == pa.int64():
+                out[f.name] = v if isinstance(v, int) and not isinstance(v, bool) else None
+            else:
+                out[f.name] = float(v) if isinstance(v, (int, float)) and not isinstance(v, bool) else None
+        return out
+
+    def close(self):
+        self.flush()
+
+
+class MultiSink(ExportSink):
+    """Writes every row to several sinks."""
+
+    def __init__(self, sinks: List[ExportSink]):
+        self.sinks = sinks
+        self.rows = 0
+
+    @property
+    def paths(self) -> List[str]:
+        return [s.path for s in self.sinks]
+
+    def write(self, row: Dict):
+        for sink in self.sinks:
+            sink.write(row)
+        self.rows += 1
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+SINK_TYPES = {"csv": CsvSink, "jsonl": JsonlSink, "parquet": ParquetSink}
+
+
+def open_sinks(base_path: str, formats: Sequence[str] = ("csv", "jsonl"),
+               columns: Optional[Sequence[str]] = None) -> MultiSink:
+    """One sink per format: `<base_path>.csv`, `<base_path>.jsonl`, `<base_path>.parquet/`."""
+    sinks = []
+    try:
+        for fmt in formats:
+            sinks.append(SINK_TYPES[fmt](f"{base_path}.{fmt}", columns))
+    except BaseException:
+        # e.g. no pyarrow for Parquet: don't leave the CSV/JSONL files open
+        for sink in sinks:
+            sink.close()
+        raise
+    return MultiSink(sinks)
@@ -0,0 +1,152 @@
+"""
+Local Extractive Summarizer (no network, no model download)
+Every summary in app.py needed a round-trip to the Hugging Face endpoint, and
+app2.py just took the first three paragraphs.
+
+This summarizer picks the most important sentences of the article itself:
+1. Split the text into sentences.
+2. Turn each sentence into a TF-IDF vector (NumPy, one matrix per article).
+3. Score sentences:
+   - "textrank": sentences similar to many other sentences are central
+     (PageRank over the sentence-similarity graph).
+   - "tfidf": sentences closest to the article's average TF-IDF vector
+     (its "centroid") score high.
+   News puts the key facts first, so early sentences get a small bonus.
+4. Take the best sentences until the word budget is used, and print them
+   in their original order.
+
+It runs thousands of articles per minute on one CPU. `LocalSummarizer` is a
+plain callable, so it plugs into `SummarizationService` (summarizer.py) as a
+backend and gets the same disk cache.
+"""
+
+import re
+from typing import List
+
+import numpy as np
+
+from summarizer import SummarizationError
+
+# Short abbreviations that end with a dot but don't end a sentence
+_ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "etc", "inc", "ltd", "co",
+                  "corp", "gov", "govt", "no", "rs", "jan", "feb", "mar", "apr", "jun", "jul", "aug",
+                  "sep", "sept", "oct", "nov", "dec", "u.s", "u.k", "e.g", "i.e"}
+_SENTENCE_BREAK = re.compile(r"(?:(?<=[.!?])|(?<=[.!?][\"'”’)\]]))\s+(?=[\"'“‘(\[]?[A-Z0-9])|\n+")
+_WORD = re.compile(r"[a-z0-9]+(?:['-][a-z0-9]+)*")
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further had has
+have having he her here hers herself him himself his how i if in into is it its itself just me more
+most my myself no nor not now of off on once only or other our ours ourselves out over own said same
+she should so some such than that the their theirs them themselves then there these they this those
+through to too under until up very was we were what when where which while who whom why will with
+would you your yours yourself yourselves says say new one two also year years
+""".split())
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split article text into sentences (keeps abbreviations like 'Dr.' together)."""
+    pieces = [p.strip() for p in _SENTENCE_BREAK.split(text or "") if p and p.strip()]
+    sentences = []
+    for piece in pieces:
+        last_word = sentences[-1].rsplit(None, 1)[-1].rstrip(".").lower() if sentences else ""
+        if sentences and (last_word in _ABBREVIATIONS or len(last_word) == 1):
+            sentences[-1] = f"{sentences[-1]} {piece}"
+        else:
+            sentences.append(piece)
+    return sentences
+
+
+def _tokens(sentence: str) -> List[str]:
+    return [w for w in _WORD.findall(sentence.lower()) if w not in STOPWORDS and len(w) > 1]
+
+
+def tfidf_matrix(sentences: List[str]) -> np.ndarray:
+    """Sentence x term TF-IDF matrix (rows L2-normalized). IDF is over the article's sentences."""
+    vocab = {}
+    rows, cols = [], []
+    for i, sentence in enumerate(sentences):
+        for token in _tokens(sentence):
+            rows.append(i)
+            cols.append(vocab.setdefault(token, len(vocab)))
+    counts = np.zeros((len(sentences), max(1, len(vocab))), dtype=np.float32)
+    if rows:
+        np.add.at(counts, (np.array(rows), np.array(cols)), 1.0)
+    df = np.count_nonzero(counts, axis=0)
+    idf = np.log((1 + len(sentences)) / (1 + df)) + 1.0
+    weights = counts * idf
+    norms = np.linalg.norm(weights, axis=1, keepdims=True)
+    return weights / np.where(norms == 0, 1, norms)
+
+
+def textrank_scores(matrix: np.ndarray, damping: float = 0.85, iterations: int = 30) -> np.ndarray:
+    """PageRank over the cosine-similarity graph of the sentences."""
+    n = matrix.shape[0]
+    sim = matrix @ matrix.T
+    np.fill_diagonal(sim, 0.0)
+    out_weight = sim.sum(axis=1, keepdims=True)
+    transition = np.divide(sim, out_weight, out=np.full_like(sim, 1.0 / n), where=out_weight > 0)
+    scores = np.full(n, 1.0 / n, dtype=np.float32)
+    for _ in range(iterations):
+        new = (1 - damping) / n + damping * (transition.T @ scores)
+        if np.abs(new - scores).sum() < 1e-6:
+            return new
+        scores = new
+    return scores
+
+
+class LocalSummarizer:
+    """Extractive summary within `max_words` words (callable: text -> summary)."""
+
+    def __init__(self, method: str = "textrank", max_words: int = 60, max_sentences: int = 3,
+                 lead_bias: float = 0.15, max_input_sentences: int = 120):
+        if method not in ("textrank", "tfidf"):
+            raise ValueError(f"Unknown method: {method}")
+        self.method = method
+        self.max_words = max_words
+        self.max_sentences = max_sentences
+        self.lead_bias = lead_bias
+        self.max_input_sentences = max_input_sentences
+
+    @property
+    def name(self) -> str:
+        return f"local-{self.method}-{self.max_words}w"
+
+    def __call__(self, text: str) -> str:
+        """Like `summarize`, but any failure comes out as a SummarizationError (as with the HF service)."""
+        try:
+            return self.summarize(text)
+        except SummarizationError:
+            raise
+        except Exception as e:
+            raise SummarizationError(f"{self.name} failed: {e}") from e
+
+    def summarize(self, text: str) -> str:
+        sentences = split_sentences(text)[:self.max_input_sentences]
+        if len(sentences) <= 1:
+            return " ".join(sentences)
+
+        matrix = tfidf_matrix(sentences)
+        if self.method == "textrank":
+            scores = textrank_scores(matrix)
+        else:
+            scores = matrix @ matrix.mean(axis=0)
+        scores = scores / (scores.max() or 1)
+        # News leads with the key facts: small bonus for early sentences
+        scores = scores + self.lead_bias / (1 + np.arange(len(sentences)))
+
+        picked, used = [], 0
+        for i in np.argsort(-scores, kind="stable"):
+            words = len(sentences[i].split())
+            if picked and used + words > self.max_words:
+                continue
+            picked.append(int(i))
+            used += words
+            if len(picked) >= self.max_sentences or used >= self.max_words:
+                break
+        return " ".join(sentences[i] for i in sorted(picked))
+
+
+def local_backend(method: str = "textrank", max_words: int = 60) -> LocalSummarizer:
+    return LocalSummarizer(method=method, max_words=max_words)
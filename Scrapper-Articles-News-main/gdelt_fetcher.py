@@ -2,6 +2,9 @@
 Google News Fetcher (Previously named GDELT Fetcher)
 This file searches the internet (via Google News) to find article links.
 It's like the "Search Engine" part of the robot.
+
+The small helpers at the top (build the feed URLs, download one feed, clean
+one entry) are also used by the Google News source in news_sources.py.
 """
 
 import requests
@@ -9,132 +12,212 @@ import feedparser
 import asyncio
 import aiohttp
 from bs4 import BeautifulSoup
-from typing import List, Dict
+from typing import List, Dict, Optional
 import random
 import time
 
+from dedupe import TitleDeduper
+from pub_dates import entry_timestamp
+from latency_slo import Deadline, FetchResult, hedged
+from loop_service import pooled_session, run_async
+
+# We pretend to be different browsers (Chrome, Mac, Linux) so Google doesn't block us.
+USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+]
+
+
+# This function creates MANY different search URLs to get the most results.
+def build_rss_urls(keyword: str, days: int = 7) -> List[str]:
+    base_query = requests.utils.quote(keyword)
+
+    # We try searching for the keyword in many different ways
+    queries = [
+        f"{base_query}",
+        f'"{keyword}"', # Exact match (keeps words together)
+        f"{base_query}%20news",
+        f"{base_query}%20market",
+        f"{base_query}%20industry",
+        f"{base_query}%20report",
+    ]
+
+    # We look for news in these countries (US, UK, India, Australia, Canada, Singapore)
+    regions = [
+        "US:en", "GB:en", "IN:en", "AU:en", "CA:en", "SG:en"
+    ]
+
+    urls = []
+    # For every query variation, pick 4 random countries to search in.
+    for q in queries:
+        selected_regions = random.sample(regions, min(len(regions), 4))
+        for region in selected_regions:
+            hl = "en-" + region.split(':')[0] # Language (e.g., en-US)
+            gl = region.split(':')[0]         # Country (e.g., US)
+            ceid = region                     # Region ID
+
+            # Create the Google News RSS URL
+            # This is the "magic" URL that asks Google for news
+            url = f"https://news.google.com/rss/search?q={q}%20when%3A{days}d&hl={hl}&gl={gl}&ceid={ceid}"
+            urls.append(url)
+    return urls
+
+
+# This small function fetches one single RSS feed link.
+# Pass a `session` to reuse its connections; otherwise a new one is opened.
+async def fetch_rss_async(url: str, session: Optional[aiohttp.ClientSession] = None,
+                          timeout: float = 30) -> list:
+    try:
+        # Pick a random browser identity
+        headers = {'User-Agent': random.choice(USER_AGENTS)}
+        if session is None:
+            async with pooled_session() as own_session:
+                return await fetch_rss_async(url, own_session, timeout)
+        # We wait up to 30 seconds for Google to reply.
+        async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            if response.status == 200:
+                # If success, read the text and parse it as an RSS feed
+                content = await response.text()
+                # feedparser understands RSS format (parsed on a worker thread, off the shared loop)
+                feed = await asyncio.to_thread(feedparser.parse, content)
+                return feed.entries
+            else:
+                return []
+    except Exception as e:
+        # If generic error, just return empty list
+        return []
+
+
+# Turn one RSS entry into our plain article dict (None if it has no title).
+def entry_to_article(entry) -> Optional[Dict]:
+    title = entry.get('title', '')
+    if not title:
+        return None
+
+    # Clean up the HTML from the description
+    raw_description = entry.get('summary', '')
+    soup = BeautifulSoup(raw_description, 'html.parser')
+    clean_description = soup.get_text(separator=' ', strip=True)
+
+    return {
+        'title': title,
+        'description': clean_description if clean_description else 'No description',
+        'source': entry.get('source', {}).get('title', 'Unknown'),
+        'link': entry.get('link', ''), # This link will be encrypted by Google (we fix it later)
+        'published': entry.get('published', ''),
+        # feedparser already parsed the date; keep it as UTC epoch seconds
+        'published_ts': entry_timestamp(entry)
+    }
+
+
+# Keep only the entries whose story we haven't seen yet.
+def _unique_articles(entries, title_deduper: TitleDeduper):
+    for entry in entries or []:
+        article = entry_to_article(entry)
+        if article is None:
+            continue
+
+        # --- Deduplication (Removing copies) ---
+        # If we haven't seen this story before, keep it!
+        # (The dedupe check uses the cleaned description, not the 'No description' filler.)
+        description = '' if article['description'] == 'No description' else article['description']
+        if not title_deduper.is_duplicate(article['title'], description, article['source']):
+            yield article
+
+
+# FAST MODE: all feeds at once, slow feeds hedged, stop at the deadline or target.
+async def _fetch_gdelt_fast(keyword: str, days: int, max_articles: int,
+                            deadline: Optional[float], target: Optional[int]) -> FetchResult:
+    clock = Deadline(deadline)
+    limit = min(target or max_articles, max_articles)
+    title_deduper = TitleDeduper()
+    articles = []
+    reason = "complete"
+    slots = asyncio.Semaphore(10)
+
+    async def one_feed(url, session):
+        async with slots:
+            return await hedged(lambda: fetch_rss_async(url, session), "Google News RSS")
+
+    async with pooled_session() as session:
+        pending = {asyncio.ensure_future(one_feed(url, session)) for url in build_rss_urls(keyword, days)}
+        try:
+            while pending and reason == "complete":
+                done, pending = await asyncio.wait(pending, timeout=clock.remaining(),
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    reason = "deadline"
+                    break
+                for task in done:
+                    for article in _unique_articles(task.result(), title_deduper):
+                        articles.append(article)
+                        if len(articles) >= limit:
+                            reason = "target"
+                            break
+                    if reason != "complete":
+                        break
+        finally:
+            # Cancel the stragglers (their answers would arrive too late)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    # Hitting the normal max_articles cap is not "partial", only a real target is
+    if reason == "target" and target is None:
+        reason = "complete"
+    return FetchResult(articles, partial=reason != "complete", reason=reason, elapsed=clock.elapsed())
+
+
 # This is the main function we use to find news.
-def fetch_gdelt_simple(keyword: str, days: int = 7, max_articles: int = 5000) -> List[Dict]:
+def fetch_gdelt_simple(keyword: str, days: int = 7, max_articles: int = 5000,
+                       deadline: Optional[float] = None, target: Optional[int] = None) -> List[Dict]:
     """
     Search for news articles about a 'keyword'.
     It looks at news from the last 'days' days.
+    Fast mode: give a `deadline` (seconds) and/or a `target` number of articles
+    and it returns as soon as one is reached (the result's `.partial` says so).
     """
-    
+    if deadline is not None or target is not None:
+        return run_async(_fetch_gdelt_fast(keyword, days, max_articles, deadline, target))
+
     articles = []
-    
-    # We pretend to be different browsers (Chrome, Mac, Linux) so Google doesn't block us.
-    user_agents = [
-        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    ]
-    
-    # This small function fetches one single RSS feed link.
-    async def fetch_rss_async(url):
-        try:
-            # Pick a random browser identity
-            headers = {'User-Agent': random.choice(user_agents)}
-            # We wait up to 30 seconds for Google to reply.
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                    if response.status == 200:
-                        # If success, read the text and parse it as an RSS feed
-                        content = await response.text()
-                        feed = feedparser.parse(content) # feedparser understands RSS format
-                        return feed.entries
-                    else:
-                        return []
-        except Exception as e:
-            # If generic error, just return empty list
-            return []
-        
-    # This function creates MANY different search URLs to get the most results.
+
     async def fetch_massive_sources():
-        base_query = requests.utils.quote(keyword)
-        
-        # We try searching for the keyword in many different ways
-        queries = [
-            f"{base_query}", 
-            f'"{keyword}"', # Exact match (keeps words together)
-            f"{base_query}%20news", 
-            f"{base_query}%20market",
-            f"{base_query}%20industry",
-            f"{base_query}%20report",
-        ]
-        
-        # We look for news in these countries (US, UK, India, Australia, Canada, Singapore)
-        regions = [
-            "US:en", "GB:en", "IN:en", "AU:en", "CA:en", "SG:en"
-        ]
-        
-        urls = []
-        # For every query variation, pick 4 random countries to search in.
-        for q in queries:
-            selected_regions = random.sample(regions, min(len(regions), 4))
-            for region in selected_regions: 
-                hl = "en-" + region.split(':')[0] # Language (e.g., en-US)
-                gl = region.split(':')[0]         # Country (e.g., US)
-                ceid = region                     # Region ID
-                
-                # Create the Google News RSS URL
-                # This is the "magic" URL that asks Google for news
-                url = f"https://news.google.com/rss/search?q={q}%20when%3A{days}d&hl={hl}&gl={gl}&ceid={ceid}"
-                urls.append(url)
-        
+        urls = build_rss_urls(keyword, days)
+
         # We search 10 URLs at a time so we don't crash our internet
         batch_size = 10
         all_results = []
-        for i in range(0, len(urls), batch_size):
-            batch = urls[i:i + batch_size]
-            tasks = [fetch_rss_async(url) for url in batch]
-            
-            # 'asyncio.gather' runs all 10 tasks in parallel!
-            results = await asyncio.gather(*tasks)
-            all_results.extend(results)
-            # Sleep for a tiny bit to be polite to the server
-            await asyncio.sleep(0.1)
-            
+        async with pooled_session() as session:
+            for i in range(0, len(urls), batch_size):
+                batch = urls[i:i + batch_size]
+                tasks = [fetch_rss_async(url, session) for url in batch]
+
+                # 'asyncio.gather' runs all 10 tasks in parallel!
+                results = await asyncio.gather(*tasks)
+                all_results.extend(results)
+                # Sleep for a tiny bit to be polite to the server
+                await asyncio.sleep(0.1)
+
         return all_results
-    
+
     # START THE SEARCH!
-    all_entries_lists = asyncio.run(fetch_massive_sources())
-    
-    seen_titles = set()
-    
+    # (on the shared event loop, so its connections stay warm for the next search)
+    all_entries_lists = run_async(fetch_massive_sources())
+
+    # Near-duplicate detector for titles (see dedupe.py).
+    # It ignores the " - Publisher" part and small wording changes, so the
+    # same story from the US and UK feeds is only scraped once.
+    title_deduper = TitleDeduper()
+
     # Process all the results we got back
     for entries in all_entries_lists:
-        if entries:
-            for entry in entries:
-                title = entry.get('title', '')
-                
-                # --- Deduplication (Removing copies) ---
-                # Sometimes we get the exact same article from US and UK feeds.
-                # We check if we've already seen this title (ignoring spaces and case).
-                if len(title) > 20:
-                    # Check start and end of title
-                    norm_title = (title[:20] + title[-20:]).lower().replace(" ", "")
-                else:
-                    norm_title = title.lower().replace(" ", "")
-                
-                # If we haven't seen this title before, add it!
-                if title and norm_title not in seen_titles:
-                    seen_titles.add(norm_title)
-                    
-                    # Clean up the HTML from the description
-                    raw_description = entry.get('summary', '')
-                    soup = BeautifulSoup(raw_description, 'html.parser')
-                    clean_description = soup.get_text(separator=' ', strip=True)
-                    
-                    articles.append({
-                        'title': title,
-                        'description': clean_description if clean_description else 'No description',
-                        'source': entry.get('source', {}).get('title', 'Unknown'),
-                        'link': entry.get('link', ''), # This link will be encrypted by Google (we fix it later)
-                        'published': entry.get('published', '')
-                    })
-                    
-                    # Stop if we have enough articles
-                    if len(articles) >= max_articles:
-                        return articles
-    
+        for article in _unique_articles(entries, title_deduper):
+            articles.append(article)
+
+            # Stop if we have enough articles
+            if len(articles) >= max_articles:
+                return articles
+
     return articles
@@ -4,12 +4,18 @@ Combines NewsAPI.org, GNews, and NewsData.io for maximum coverage
 """
 
 import asyncio
+import math
+from datetime import datetime, timedelta, timezone
 import aiohttp
 import requests
-from typing import List, Dict
-from fuzzywuzzy import fuzz
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from collections import Counter
-import hashlib
+
+from dedupe import HeadlineDeduper
+from api_budget import BudgetScheduler, default_cache, default_ledger
+from latency_slo import Deadline, FetchResult, default_tracker, hedged
+from loop_service import pooled_session, run_async
+from pub_dates import parse_published
 
 # API Keys - Get free keys from:
 # NewsAPI: https://newsapi.org/register
@@ -20,196 +26,402 @@ NEWSAPI_KEY = "YOUR_NEWSAPI_KEY_HERE"  # Free: 100 requests/day, 100 articles ea
 GNEWS_KEY = "YOUR_GNEWS_KEY_HERE"      # Free: 100 requests/day, 10 articles each
 NEWSDATA_KEY = "YOUR_NEWSDATA_KEY_HERE"  # Free: 200 requests/day, 10 articles each
 
+# Articles per page, and the most results a free plan returns for one query
+# (NewsAPI's developer plan stops at 100: later pages only cost quota)
+PAGE_SIZES = {"NewsAPI": 100, "GNews": 10, "NewsData": 10}
+RESULT_CAPS = {"NewsAPI": 100}
+
+# Provider endpoints (override in the constructor to point at a local stub server)
+DEFAULT_ENDPOINTS = {
+    "NewsAPI": "https://newsapi.org/v2/everything",
+    "GNews": "https://gnews.io/api/v4/search",
+    "NewsData": "https://newsdata.io/api/1/news",
+}
+
+
+def since(days: int) -> str:
+    """Start of the `days`-day window as an ISO date (whole days keep cache keys stable)."""
+    start = datetime.now(timezone.utc).date() - timedelta(days=days)
+    return f"{start.isoformat()}T00:00:00Z"
+
 
 class HybridNewsFetcher:
     """Fetches news from multiple sources and deduplicates"""
-    
-    def __init__(self):
+
+    def __init__(self, max_pages: int = 3, page_concurrency: int = 4,
+                 endpoints: Optional[Dict[str, str]] = None, timeout: float = 10,
+                 ledger=None, cache=None, hedge: bool = False, latency_tracker=None,
+                 result_caps: Optional[Dict[str, int]] = None):
         self.newsapi_key = NEWSAPI_KEY
         self.gnews_key = GNEWS_KEY
         self.newsdata_key = NEWSDATA_KEY
-        
-    async def fetch_newsapi(self, query: str, max_articles: int = 100) -> List[Dict]:
-        """Fetch from NewsAPI.org - PRIMARY SOURCE"""
+
+        # Daily quota bookkeeping + response cache (see api_budget.py)
+        self.ledger = ledger if ledger is not None else default_ledger()
+        self.cache = cache if cache is not None else default_cache()
+        self.scheduler = BudgetScheduler(self.ledger, max_pages=max_pages)
+
+        # Paging limits (per provider, per query)
+        self.max_pages = max_pages
+        self.result_caps = {**RESULT_CAPS, **(result_caps or {})}
+        self.page_concurrency = page_concurrency
+        self.endpoints = {**DEFAULT_ENDPOINTS, **(endpoints or {})}
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+
+        # One pooled session for every provider and page (created on first use)
+        self._session = None
+        self._page_slots = None
+
+        # Optional per-provider rate limiters (anything with `async wait()`),
+        # set by news_sources.py when a provider runs as a plugged-in source
+        self.limiters = {}
+
+        # Fast mode: resend pages that are slower than usual (see latency_slo.py)
+        self.hedge = hedge
+        self.latency = latency_tracker or default_tracker()
+
+    # --- SHARED SESSION ---
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = pooled_session(limit=self.page_concurrency * 3, timeout=self.timeout)
+            self._page_slots = asyncio.Semaphore(self.page_concurrency)
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def __aenter__(self):
+        await self._get_session()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def page_limit(self, provider: str, page_size: Optional[int] = None) -> int:
+        """Most pages worth asking `provider` for per query (`max_pages`, lowered by its result cap)."""
+        cap = self.result_caps.get(provider)
+        if not cap:
+            return self.max_pages
+        return min(self.max_pages, max(1, math.ceil(cap / (page_size or PAGE_SIZES[provider]))))
+
+    def _api_key(self, provider: str) -> str:
+        return {"NewsAPI": self.newsapi_key, "GNews": self.gnews_key, "NewsData": self.newsdata_key}[provider]
+
+    async def _get_json(self, provider: str, params: Dict) -> Optional[Dict]:
+        """One page request. Returns the JSON body, or None on any error or when out of quota."""
+        cached = self.cache.get(provider, params)
+        if cached is not None:
+            return cached
+        if not self.ledger.try_consume(provider, self._api_key(provider)):
+            print(f"{provider} daily quota used up, skipping...")
+            return None
+        if not self.hedge:
+            return await self._request_json(provider, params)
+        # A hedge is a real request too, so it needs its own quota
+        return await hedged(lambda: self._request_json(provider, params), provider, self.latency,
+                            may_hedge=lambda: self.ledger.try_consume(provider, self._api_key(provider)))
+
+    async def _cached_json(self, provider: str, params: Dict) -> Optional[Dict]:
+        """A page from the response cache only (no request, no quota)."""
+        return self.cache.get(provider, params)
+
+    async def _request_json(self, provider: str, params: Dict) -> Optional[Dict]:
+        session = await self._get_session()
+        limiter = self.limiters.get(provider)
+        try:
+            if limiter is not None:
+                await limiter.wait()
+            async with self._page_slots:
+                async with session.get(self.endpoints[provider], params=params) as response:
+                    if response.status == 200:
+                        data = await response.json()
+                        self.cache.put(provider, params, data)
+                        return data
+                    print(f"{provider} error: {response.status}")
+                    return None
+        except Exception as e:
+            print(f"{provider} fetch error: {e}")
+            return None
+
+    # --- PARSERS (one per provider, all return the same article shape) ---
+    @staticmethod
+    def _parse_newsapi(data: Dict) -> List[Dict]:
+        return [{
+            "headline": article.get("title", ""),
+            "description": article.get("description", ""),
+            "source": article.get("source", {}).get("name", "Unknown"),
+            "url": article.get("url", ""),
+            "published": article.get("publishedAt", ""),
+            "published_ts": parse_published(article.get("publishedAt")),
+            "api_source": "NewsAPI"
+        } for article in data.get("articles", [])]
+
+    @staticmethod
+    def _parse_gnews(data: Dict) -> List[Dict]:
+        return [{
+            "headline": article.get("title", ""),
+            "description": article.get("description", ""),
+            "source": article.get("source", {}).get("name", "Unknown"),
+            "url": article.get("url", ""),
+            "published": article.get("publishedAt", ""),
+            "published_ts": parse_published(article.get("publishedAt")),
+            "api_source": "GNews"
+        } for article in data.get("articles", [])]
+
+    @staticmethod
+    def _parse_newsdata(data: Dict) -> List[Dict]:
+        return [{
+            "headline": article.get("title", ""),
+            "description": article.get("description", ""),
+            "source": article.get("source_id", "Unknown"),
+            "url": article.get("link", ""),
+            "published": article.get("pubDate", ""),
+            "published_ts": parse_published(article.get("pubDate")),
+            "api_source": "NewsData"
+        } for article in data.get("results", [])]
+
+    # --- PAGE STREAMS ---
+    # Each stream yields one page (a list of articles) as soon as it arrives.
+    async def _numbered_pages(self, provider: str, params: Dict, page_size: int, max_articles: int,
+                              max_pages: int, total_key: str, parse) -> AsyncIterator[List[Dict]]:
+        """
+        Providers with a `page` number: fetch page 1, then the rest concurrently.
+        With no pages to spend (`max_pages` < 1) only cached pages are served.
+        """
+        cache_only = max_pages < 1
+        get = self._cached_json if cache_only else self._get_json
+        wanted_pages = min(self.max_pages if cache_only else max_pages, self.page_limit(provider, page_size),
+                           max(1, math.ceil(max_articles / page_size)))
+        first = await get(provider, {**params, "page": 1})
+        if not first:
+            return
+        yield parse(first)
+
+        total = first.get(total_key) or 0
+        last_page = min(wanted_pages, math.ceil(total / page_size)) if total else 1
+        tasks = [asyncio.ensure_future(get(provider, {**params, "page": page}))
+                 for page in range(2, last_page + 1)]
+        try:
+            for next_page in asyncio.as_completed(tasks):
+                data = await next_page
+                if data:
+                    yield parse(data)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def iter_newsapi(self, query: str, max_articles: int = 100, max_pages: Optional[int] = None,
+                           days: Optional[int] = None) -> AsyncIterator[List[Dict]]:
+        """NewsAPI.org pages - PRIMARY SOURCE"""
         if not self.newsapi_key or self.newsapi_key == "YOUR_NEWSAPI_KEY_HERE":
             print("NewsAPI key not configured, skipping...")
-            return []
-        
-        url = "https://newsapi.org/v2/everything"
+            return
         params = {
             "q": query,
             "apiKey": self.newsapi_key,
-            "pageSize": min(max_articles, 100),
+            "pageSize": min(max_articles, PAGE_SIZES["NewsAPI"]),
             "language": "en",
             "sortBy": "publishedAt"
         }
-        
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        articles = []
-                        for article in data.get("articles", []):
-                            articles.append({
-                                "headline": article.get("title", ""),
-                                "description": article.get("description", ""),
-                                "source": article.get("source", {}).get("name", "Unknown"),
-                                "url": article.get("url", ""),
-                                "published": article.get("publishedAt", ""),
-                                "api_source": "NewsAPI"
-                            })
-                        print(f"NewsAPI: Fetched {len(articles)} articles")
-                        return articles
-                    else:
-                        print(f"NewsAPI error: {response.status}")
-                        return []
-        except Exception as e:
-            print(f"NewsAPI fetch error: {e}")
-            return []
-    
-    async def fetch_gnews(self, query: str, max_articles: int = 10) -> List[Dict]:
-        """Fetch from GNews API - SECONDARY SOURCE"""
+        if days:
+            params["from"] = since(days)
+        pages = self.max_pages if max_pages is None else max_pages
+        async for page in self._numbered_pages("NewsAPI", params, params["pageSize"], max_articles,
+                                               pages, "totalResults", self._parse_newsapi):
+            yield page
+
+    async def iter_gnews(self, query: str, max_articles: int = 10, max_pages: Optional[int] = None,
+                         days: Optional[int] = None) -> AsyncIterator[List[Dict]]:
+        """GNews API pages - SECONDARY SOURCE"""
         if not self.gnews_key or self.gnews_key == "YOUR_GNEWS_KEY_HERE":
             print("GNews key not configured, skipping...")
-            return []
-        
-        url = "https://gnews.io/api/v4/search"
+            return
         params = {
             "q": query,
             "token": self.gnews_key,
-            "max": min(max_articles, 10),
+            "max": min(max_articles, PAGE_SIZES["GNews"]),
             "lang": "en"
         }
-        
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        articles = []
-                        for article in data.get("articles", []):
-                            articles.append({
-                                "headline": article.get("title", ""),
-                                "description": article.get("description", ""),
-                                "source": article.get("source", {}).get("name", "Unknown"),
-                                "url": article.get("url", ""),
-                                "published": article.get("publishedAt", ""),
-                                "api_source": "GNews"
-                            })
-                        print(f"GNews: Fetched {len(articles)} articles")
-                        return articles
-                    else:
-                        print(f"GNews error: {response.status}")
-                        return []
-        except Exception as e:
-            print(f"GNews fetch error: {e}")
-            return []
-    
-    async def fetch_newsdata(self, query: str, max_articles: int = 10) -> List[Dict]:
-        """Fetch from NewsData.io - TERTIARY SOURCE"""
+        if days:
+            params["from"] = since(days)
+        pages = self.max_pages if max_pages is None else max_pages
+        async for page in self._numbered_pages("GNews", params, params["max"], max_articles,
+                                               pages, "totalArticles", self._parse_gnews):
+            yield page
+
+    async def iter_newsdata(self, query: str, max_articles: int = 10,
+                            max_pages: Optional[int] = None) -> AsyncIterator[List[Dict]]:
+        """NewsData.io pages - TERTIARY SOURCE (cursor paging, so pages come one after another)"""
         if not self.newsdata_key or self.newsdata_key == "YOUR_NEWSDATA_KEY_HERE":
             print("NewsData key not configured, skipping...")
-            return []
-        
-        url = "https://newsdata.io/api/1/news"
+            return
         params = {
             "q": query,
             "apikey": self.newsdata_key,
             "language": "en"
         }
-        
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        articles = []
-                        for article in data.get("results", []):
-                            articles.append({
-                                "headline": article.get("title", ""),
-                                "description": article.get("description", ""),
-                                "source": article.get("source_id", "Unknown"),
-                                "url": article.get("link", ""),
-                                "published": article.get("pubDate", ""),
-                                "api_source": "NewsData"
-                            })
-                        print(f"NewsData: Fetched {len(articles)} articles")
-                        return articles
-                    else:
-                        print(f"NewsData error: {response.status}")
-                        return []
-        except Exception as e:
-            print(f"NewsData fetch error: {e}")
-            return []
-    
+        pages = self.max_pages if max_pages is None else max_pages
+        # No pages to spend: only cached pages are served
+        get = self._cached_json if pages < 1 else self._get_json
+        fetched = 0
+        for _ in range(pages if pages >= 1 else self.max_pages):
+            data = await get("NewsData", params)
+            if not data:
+                return
+            page = self._parse_newsdata(data)
+            fetched += len(page)
+            yield page
+            cursor = data.get("nextPage")
+            if not cursor or not page or fetched >= max_articles:
+                return
+            params = {**params, "page": cursor}
+
+    # --- ONE-SHOT FETCHES (collect every page) ---
+    async def _collect(self, pages: AsyncIterator[List[Dict]], name: str, max_articles: int) -> List[Dict]:
+        articles = []
+        async for page in pages:
+            articles.extend(page)
+        articles = articles[:max_articles]
+        print(f"{name}: Fetched {len(articles)} articles")
+        return articles
+
+    async def fetch_newsapi(self, query: str, max_articles: int = 100) -> List[Dict]:
+        """Fetch from NewsAPI.org - PRIMARY SOURCE"""
+        return await self._collect(self.iter_newsapi(query, max_articles), "NewsAPI", max_articles)
+
+    async def fetch_gnews(self, query: str, max_articles: int = 10) -> List[Dict]:
+        """Fetch from GNews API - SECONDARY SOURCE"""
+        return await self._collect(self.iter_gnews(query, max_articles), "GNews", max_articles)
+
+    async def fetch_newsdata(self, query: str, max_articles: int = 10) -> List[Dict]:
+        """Fetch from NewsData.io - TERTIARY SOURCE"""
+        return await self._collect(self.iter_newsdata(query, max_articles), "NewsData", max_articles)
+
     def deduplicate_articles(self, articles: List[Dict], similarity_threshold: int = 85) -> List[Dict]:
-        """Remove duplicate articles using fuzzy matching"""
+        """Remove duplicate articles using fuzzy matching (MinHash/LSH picks who to compare)"""
         if not articles:
             return []
-        
-        unique_articles = []
-        seen_hashes = set()
-        
+
+        # Same rules as the old compare-with-everything loop (fuzz.ratio threshold,
+        # NewsAPI version wins), but each headline is only compared with the few
+        # kept headlines that share LSH buckets with it.
+        deduper = HeadlineDeduper(similarity_threshold, preferred_source="NewsAPI")
         for article in articles:
-            headline = article.get("headline", "").lower().strip()
-            if not headline:
-                continue
-            
-            # Check against existing articles
-            is_duplicate = False
-            for unique in unique_articles:
-                unique_headline = unique.get("headline", "").lower().strip()
-                similarity = fuzz.ratio(headline, unique_headline)
-                
-                if similarity >= similarity_threshold:
-                    is_duplicate = True
-                    # Keep the one from the more reliable source
-                    if article.get("api_source") == "NewsAPI" and unique.get("api_source") != "NewsAPI":
-                        # Replace with NewsAPI version (higher quality)
-                        unique_articles.remove(unique)
-                        unique_articles.append(article)
-                    break
-            
-            if not is_duplicate:
-                unique_articles.append(article)
-        
+            deduper.add(article)
+        unique_articles = deduper.results()
+
         print(f"Deduplication: {len(articles)} -> {len(unique_articles)} articles (removed {len(articles) - len(unique_articles)} duplicates)")
         return unique_articles
-    
-    async def fetch_all_sources(self, query: str) -> List[Dict]:
-        """Fetch from all sources in parallel and deduplicate"""
+
+    async def fetch_all_sources(self, query: str, max_newsapi: Optional[int] = None,
+                                max_gnews: Optional[int] = None, max_newsdata: Optional[int] = None,
+                                page_limits: Optional[Dict[str, int]] = None,
+                                deadline: Optional[float] = None, target: Optional[int] = None) -> FetchResult:
+        """
+        Fetch from all sources in parallel; pages are deduplicated as they arrive.
+        Fast mode: stop after `deadline` seconds or once `target` unique articles
+        are in, cancel whatever is still running and mark the result partial.
+        """
         print(f"\n=== Fetching news for: {query} ===")
-        
-        # Fetch from all sources in parallel
-        tasks = [
-            self.fetch_newsapi(query, max_articles=100),
-            self.fetch_gnews(query, max_articles=10),
-            self.fetch_newsdata(query, max_articles=10)
+        clock = Deadline(deadline)
+
+        # Pages per provider: what the scheduler allows for this query right now
+        if page_limits is None:
+            page_limits = {provider: plan[query] for provider, plan in
+                           ((p, self.scheduler.allocate(p, self._api_key(p), [(query, 1)], self.page_limit(p)))
+                            for p in DEFAULT_ENDPOINTS)}
+
+        # By default, take as many articles as the allowed full pages give us
+        streams = [
+            self.iter_newsapi(query, max_articles=max_newsapi or 100 * self.page_limit("NewsAPI"),
+                              max_pages=page_limits.get("NewsAPI", 0)),
+            self.iter_gnews(query, max_articles=max_gnews or 10 * self.max_pages,
+                            max_pages=page_limits.get("GNews", 0)),
+            self.iter_newsdata(query, max_articles=max_newsdata or 10 * self.max_pages,
+                               max_pages=page_limits.get("NewsData", 0))
         ]
-        
-        results = await asyncio.gather(*tasks)
-        
-        # Combine all articles
-        all_articles = []
-        for article_list in results:
-            all_articles.extend(article_list)
-        
-        print(f"Total articles before deduplication: {len(all_articles)}")
-        
-        # Deduplicate
-        unique_articles = self.deduplicate_articles(all_articles)
-        
+
+        # Every provider pushes its pages into one queue; we dedupe whatever
+        # comes first instead of waiting for the slowest provider.
+        queue = asyncio.Queue()
+
+        async def pump(stream):
+            try:
+                async for page in stream:
+                    await queue.put(page)
+            finally:
+                await queue.put(None)
+
+        deduper = HeadlineDeduper(85, preferred_source="NewsAPI")
+        total = 0
+        reason = "complete"
+        pumps = [asyncio.ensure_future(pump(stream)) for stream in streams]
+        try:
+            finished = 0
+            while finished < len(pumps):
+                if target and len(deduper) >= target:
+                    reason = "target"
+                    break
+                try:
+                    page = await asyncio.wait_for(queue.get(), clock.remaining())
+                except asyncio.TimeoutError:
+                    reason = "deadline"
+                    break
+                if page is None:
+                    finished += 1
+                    continue
+                total += len(page)
+                for article in page:
+                    deduper.add(article)
+        finally:
+            for task in pumps:
+                task.cancel()
+            await asyncio.gather(*pumps, return_exceptions=True)
+
+        unique_articles = FetchResult(deduper.results(), partial=reason != "complete",
+                                      reason=reason, elapsed=clock.elapsed())
+        print(f"Deduplication: {total} -> {len(unique_articles)} articles (removed {total - len(unique_articles)} duplicates)")
+        if unique_articles.partial:
+            print(f"Stopped early ({reason}) after {unique_articles.elapsed:.1f}s, slow requests were cancelled")
+
         # Calculate source diversity for each article
         source_counts = Counter([a.get("api_source") for a in unique_articles])
         for article in unique_articles:
             article["source_diversity"] = len(source_counts)
-        
+
         return unique_articles
 
+    async def fetch_queue(self, queued: List[Tuple[str, float]]) -> Dict[str, List[Dict]]:
+        """
+        Fetch several queries [(query, priority), ...] within today's quota.
+        The scheduler splits the spendable pages by priority; queries that get
+        no pages for a provider simply skip it (cached responses are still used).
+        """
+        plans = {p: self.scheduler.allocate(p, self._api_key(p), queued, self.page_limit(p)) for p in DEFAULT_ENDPOINTS}
+        results = {}
+        for query, _ in sorted(queued, key=lambda qp: -qp[1]):
+            limits = {p: plans[p].get(query, 0) for p in DEFAULT_ENDPOINTS}
+            results[query] = await self.fetch_all_sources(query, page_limits=limits)
+        return results
 
-def fetch_hybrid_news(query: str, duration: int = 1) -> List[Dict]:
-    """Main function to fetch news from hybrid sources"""
-    fetcher = HybridNewsFetcher()
-    articles = asyncio.run(fetcher.fetch_all_sources(query))
+
+async def _fetch_with(fetcher: HybridNewsFetcher, work):
+    async with fetcher:
+        return await work(fetcher)
+
+
+def fetch_hybrid_news(query: str, duration: int = 1, max_pages: int = 3,
+                      deadline: Optional[float] = None, target: Optional[int] = None) -> List[Dict]:
+    """Main function to fetch news from hybrid sources (pass `deadline`/`target` for fast mode)"""
+    fetcher = HybridNewsFetcher(max_pages=max_pages, hedge=deadline is not None)
+    articles = run_async(_fetch_with(
+        fetcher, lambda f: f.fetch_all_sources(query, deadline=deadline, target=target)))
     return articles
+
+
+def fetch_hybrid_queue(queued: List[Tuple[str, float]], max_pages: int = 3) -> Dict[str, List[Dict]]:
+    """Fetch a queue of (query, priority) pairs while respecting the daily quotas"""
+    fetcher = HybridNewsFetcher(max_pages=max_pages)
+    return run_async(_fetch_with(fetcher, lambda f: f.fetch_queue(queued)))
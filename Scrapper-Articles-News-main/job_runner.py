@@ -0,0 +1,259 @@
+"""
+Background Jobs (searches keep running when the page reruns)
+app2.py used to fetch and scrape inside the button handler. The Streamlit
+script thread was stuck for the whole search, any click or page change
+stopped it halfway, and two people searching at once each blocked their
+own thread instead of sharing the server.
+
+A `JobRunner` is shared by the whole server (one per process):
+- `submit(fn, ...)` starts `fn(job, ...)` on a small pool of worker threads
+  and returns a job id right away.
+- Jobs run async code with `job.run_async(coro)`, on the process-wide event
+  loop (loop_service.py), so they share its warm HTTP connections.
+- The job reports `progress(...)`, `note(...)` and partial `results`; the
+  page only polls `status(job_id)` / `results(job_id)` and reruns itself.
+- Every state change is written to NEWS_DATA_DIR/jobs/<job id>.json, and a
+  finished job's results are saved to the run history (run_history.py), so
+  they can still be loaded by job id after the server restarts.
+- A job can ask for cleanup with `job.on_forget(fn)`: it runs once the
+  runner drops the job from memory (e.g. to delete its temporary text file).
+- Jobs submitted with a `key` are shared: while one is running, the same
+  search from anyone else joins it instead of starting again (single
+  flight), and for `ttl` seconds after it finished its results are handed
+  out as they are (a result cache shared by all sessions).
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from loop_service import run_async
+
+DEFAULT_DIR = os.path.join(os.environ.get("NEWS_DATA_DIR", ".news_data"), "jobs")
+FINISHED = ("done", "failed", "cancelled")
+
+
+class JobCancelled(Exception):
+    """Raised inside a job (by `job.check()`) once someone asked it to stop."""
+
+
+class Job:
+    """One submitted piece of work, as seen by the job itself and by the pollers."""
+
+    def __init__(self, label: str = "", save_as: Optional[Dict] = None):
+        self.id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.label = label
+        self.status = "queued"
+        self.done = 0
+        self.total = 0
+        self.message = ""
+        self.notes: List[str] = []
+        self.results: List = []
+        self.error: Optional[str] = None
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        # history.save(...) arguments for the finished results (query, app, meta)
+        self.save_as = save_as
+        self.saved: Optional[Dict] = None
+        self._cancel = threading.Event()
+        self._on_change: Optional[Callable] = None
+        # Sharing: the job's key and who is waiting on it (one entry per session)
+        self.key = None
+        self.subscribers = set()
+        self._forget: List[Callable] = []
+
+    # --- CALLED BY THE JOB ---
+    def progress(self, done: int, total: int, message: Optional[str] = None):
+        self.done, self.total = done, total
+        if message is not None:
+            self.message = message
+
+    def note(self, text: str):
+        """A status line for the page (like `status.write` used to be)."""
+        self.notes.append(text)
+        if self._on_change:
+            self._on_change(self)
+
+    def on_forget(self, fn: Callable[[], None]):
+        """Run `fn` once the runner drops this job from memory (its results are gone then)."""
+        self._forget.append(fn)
+
+    def check(self):
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    @property
+    def stop_event(self) -> threading.Event:
+        """Set once the job should stop (hand it to long steps so they can quit early)."""
+        return self._cancel
+
+    def run_async(self, coro):
+        """Run a coroutine on the shared event loop and return its result."""
+        return run_async(coro)
+
+    # --- CALLED BY POLLERS ---
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def snapshot(self) -> Dict:
+        """Everything but the results (cheap to poll and to write to disk)."""
+        return {"job_id": self.id, "label": self.label, "status": self.status, "done": self.done,
+                "total": self.total, "message": self.message, "notes": list(self.notes),
+                "partial": len(self.results), "error": self.error, "created": self.created,
+                "started": self.started, "finished": self.finished, "saved": self.saved,
+                "subscribers": len(self.subscribers)}
+
+
+class JobRunner:
+    """Runs jobs on `workers` threads; keeps the last `keep` jobs (with results) in memory."""
+
+    def __init__(self, workers: int = 2, root: str = DEFAULT_DIR, history=None, keep: int = 50):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.history = history
+        self.keep = keep
+        self._jobs: Dict[str, Job] = {}
+        self._by_key: Dict[object, str] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="news-job")
+
+    def submit(self, fn: Callable, *args, label: str = "", save_as: Optional[Dict] = None,
+               key=None, ttl: float = 0, subscriber=None, **kwargs) -> str:
+        """
+        Start `fn(job, *args, **kwargs)` in the background; returns the job id.
+        With a `key`, a job with the same key that is still running, or that
+        finished with results less than `ttl` seconds ago, is returned instead.
+        `subscriber` (e.g. a session id) is who waits on a running job; the
+        same subscriber submitting twice still counts once.
+        """
+        with self._lock:
+            if key is not None:
+                shared = self._shared(key, ttl)
+                if shared is not None:
+                    # Finished jobs have nothing left to cancel, so only running ones count waiters
+                    if shared.status not in FINISHED:
+                        shared.subscribers.add(subscriber)
+                    return shared.id
+            job = Job(label, save_as)
+            job._on_change = self._persist
+            job.key = key
+            job.subscribers.add(subscriber)
+            self._jobs[job.id] = job
+            if key is not None:
+                self._by_key[key] = job.id
+            # Forget the oldest finished jobs (they stay on disk)
+            finished = [j for j in self._jobs.values() if j.status in FINISHED]
+            forgotten = finished[:max(0, len(self._jobs) - self.keep)]
+            for old in forgotten:
+                del self._jobs[old.id]
+                if self._by_key.get(old.key) == old.id:
+                    del self._by_key[old.key]
+        for old in forgotten:
+            for cleanup in old._forget:
+                try:
+                    cleanup()
+                except Exception as e:
+                    print(f"Cleanup of job {old.id} failed: {e}")
+        self._persist(job)
+        self._pool.submit(self._run, job, fn, args, kwargs)
+        return job.id
+
+    def _shared(self, key, ttl: float) -> Optional[Job]:
+        """The job to join for `key` (call with the lock held), if any."""
+        job = self._jobs.get(self._by_key.get(key))
+        if job is None or job.cancelled:
+            return None
+        if job.status not in FINISHED:
+            return job
+        if job.status == "done" and job.results and time.time() - job.finished < ttl:
+            return job
+        return None
+
+    def _run(self, job: Job, fn: Callable, args, kwargs):
+        job.status, job.started = "running", time.time()
+        self._persist(job)
+        try:
+            if job.cancelled:
+                raise JobCancelled()
+            result = fn(job, *args, **kwargs)
+            if result is not None:
+                job.results = result
+            job.check()
+            if self.history is not None and job.save_as is not None and job.results:
+                try:
+                    info = self.history.save(job.results, **job.save_as)
+                    job.saved = {"run_id": info["run_id"], "path": info["path"]}
+                except Exception as e:
+                    job.note(f"Could not save this search to history: {e}")
+            job.status = "done"
+        except JobCancelled:
+            job.status = "cancelled"
+        except Exception as e:
+            print(f"Job {job.id} failed: {e}")
+            job.status, job.error = "failed", str(e)
+        finally:
+            job.finished = time.time()
+            self._persist(job)
+
+    def _persist(self, job: Job):
+        path = os.path.join(self.root, f"{job.id}.json")
+        try:
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(job.snapshot(), f, default=str)
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            print(f"Could not write job {job.id}: {e}")
+
+    # --- POLLING ---
+    def status(self, job_id: str) -> Optional[Dict]:
+        """The job's state (from memory, or from disk after a restart); None if unknown."""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.snapshot()
+        try:
+            with open(os.path.join(self.root, f"{os.path.basename(job_id)}.json"), encoding="utf-8") as f:
+                info = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if info.get("status") not in FINISHED:
+            # Its server went away before it finished
+            info.update(status="failed", error="The server restarted before this job finished.")
+        return info
+
+    def results(self, job_id: str, start: int = 0) -> List:
+        """Results so far (all of them once done). After a restart, read back from the run history."""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.results[start:]
+        info = self.status(job_id)
+        if info and info.get("saved") and self.history is not None:
+            try:
+                return self.history.load(info["saved"])[start:]
+            except (OSError, KeyError):
+                return []
+        return []
+
+    def cancel(self, job_id: str, subscriber=None):
+        """
+        `subscriber` stops waiting on the job; the job itself stops once nobody
+        is waiting any more (other sessions sharing it keep it running).
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        with self._lock:
+            job.subscribers.discard(subscriber)
+            if not job.subscribers:
+                job._cancel.set()
+
+    def jobs(self) -> List[Dict]:
+        """Jobs in memory, newest first."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [j.snapshot() for j in sorted(jobs, key=lambda j: j.created, reverse=True)]
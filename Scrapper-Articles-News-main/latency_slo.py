@@ -0,0 +1,127 @@
+"""
+Latency SLO helpers (deadlines, hedged requests, partial results)
+A search used to wait for the slowest feed or API page. One stuck request
+could hold 300 finished articles back for 30+ seconds.
+
+"Fast mode" works like this:
+- The caller gives a time budget (`deadline`, seconds) and/or a `target`
+  number of articles. We return as soon as either one is reached.
+- Each request that is slower than usual (slower than the 90th percentile of
+  recent requests to the same provider) gets a second, identical request
+  (a "hedge"). Whichever answers first wins, the other is cancelled.
+- Anything still running when we return is cancelled, and the result says
+  it is `partial` so the UI can tell the user.
+"""
+
+import asyncio
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Awaitable, Callable, Optional
+
+import numpy as np
+
+
+class FetchResult(list):
+    """A normal list of articles, plus how the fetch ended."""
+
+    def __init__(self, items=(), partial: bool = False, reason: str = "complete", elapsed: float = 0.0):
+        super().__init__(items)
+        self.partial = partial
+        self.reason = reason      # 'complete', 'target' or 'deadline'
+        self.elapsed = elapsed
+
+
+class LatencyTracker:
+    """Recent request times per provider, used to decide when to hedge."""
+
+    def __init__(self, window: int = 200, percentile: float = 90, min_samples: int = 5,
+                 default_delay: float = 2.0, min_delay: float = 0.05):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+        self._lock = threading.Lock()
+        self.hedges = defaultdict(int)     # hedges sent per provider
+        self.hedge_wins = defaultdict(int)  # hedges that answered first
+
+    def record(self, key: str, seconds: float):
+        with self._lock:
+            self._samples[key].append(seconds)
+
+    def hedge_delay(self, key: str) -> float:
+        """How long to wait before sending a hedge for `key`."""
+        with self._lock:
+            samples = list(self._samples[key])
+        if len(samples) < self.min_samples:
+            return self.default_delay
+        return max(self.min_delay, float(np.percentile(samples, self.percentile)))
+
+
+_default_tracker = LatencyTracker()
+
+
+def default_tracker() -> LatencyTracker:
+    """One tracker for the whole process, so it keeps learning between searches."""
+    return _default_tracker
+
+
+def _usable(result) -> bool:
+    return result is not None and result != []
+
+
+async def hedged(make_call: Callable[[], Awaitable], key: str,
+                 tracker: Optional[LatencyTracker] = None,
+                 may_hedge: Optional[Callable[[], bool]] = None):
+    """
+    Run `make_call()`; if it is slower than usual, run it a second time and
+    keep whichever usable answer (not None / not empty) comes first.
+    `may_hedge()` is asked before sending the copy (e.g. to book API quota).
+    """
+    tracker = tracker or default_tracker()
+    started = time.perf_counter()
+    primary = asyncio.ensure_future(make_call())
+    running = {primary}
+    try:
+        done, _ = await asyncio.wait(running, timeout=tracker.hedge_delay(key))
+        if not done and (may_hedge is None or may_hedge()):
+            tracker.hedges[key] += 1
+            running.add(asyncio.ensure_future(make_call()))
+
+        result = None
+        while running:
+            done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    continue
+                result = task.result()
+                if _usable(result):
+                    if task is not primary:
+                        tracker.hedge_wins[key] += 1
+                    tracker.record(key, time.perf_counter() - started)
+                    return result
+        return result
+    finally:
+        for task in running:
+            task.cancel()
+
+
+class Deadline:
+    """A point in time `seconds` from now (None = no deadline)."""
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.seconds = seconds
+        self.started = time.perf_counter()
+        self.at = self.started + seconds if seconds else None
+
+    def remaining(self) -> Optional[float]:
+        if self.at is None:
+            return None
+        return max(0.0, self.at - time.perf_counter())
+
+    def expired(self) -> bool:
+        return self.at is not None and time.perf_counter() >= self.at
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
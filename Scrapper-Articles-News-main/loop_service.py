@@ -0,0 +1,137 @@
+"""
+Event Loop Service (one async engine for the whole server)
+Every search used to build its own asyncio event loop and throw it away:
+`fetch_gdelt_simple` / `fetch_news` called `asyncio.run`, app2.py called
+`asyncio.run(enhance_articles_async(...))` again, the hybrid fetcher did the
+same. Each new loop meant new HTTP connection pools, new DNS lookups and new
+TLS handshakes to the same few hosts (news.google.com, the news APIs).
+
+Now one event loop runs for the life of the process in its own thread:
+- `run_async(coro)` runs a coroutine on it from any normal thread (Streamlit
+  script, job workers) and waits for the result; `submit(coro)` returns a
+  Future instead of waiting.
+- `pooled_session(...)` gives an aiohttp session that rides the service's
+  shared connection pool (with a DNS cache). Closing the session keeps the
+  pool, so the next search reuses warm connections. Called outside the
+  service loop it is just a normal `aiohttp.ClientSession`.
+- uvloop (a faster event loop) is used when installed and NEWS_UVLOOP=1.
+
+Only waiting (network I/O) belongs on this loop. CPU work such as HTML and
+RSS parsing or summarizing goes to worker threads (`asyncio.to_thread`), or
+one search's parsing would stall every other search's downloads.
+"""
+
+import asyncio
+import atexit
+import os
+import threading
+from concurrent.futures import Future
+from typing import Optional
+
+import aiohttp
+
+try:
+    import uvloop as _uvloop
+except ImportError:  # uvloop is optional (and not available on Windows)
+    _uvloop = None
+
+POOL_LIMIT = 100
+DNS_CACHE_SECONDS = 300
+
+
+class LoopService:
+    """An event loop running forever in a daemon thread, plus its shared connection pool."""
+
+    def __init__(self, use_uvloop: Optional[bool] = None, pool_limit: int = POOL_LIMIT):
+        if use_uvloop is None:
+            use_uvloop = os.environ.get("NEWS_UVLOOP", "") == "1"
+        self.uvloop = bool(use_uvloop and _uvloop is not None)
+        self.loop = _uvloop.new_event_loop() if self.uvloop else asyncio.new_event_loop()
+        self.pool_limit = pool_limit
+        self._connector: Optional[aiohttp.TCPConnector] = None
+        self._started = threading.Event()
+        self._thread = threading.Thread(target=self._serve, name="news-event-loop", daemon=True)
+        self._thread.start()
+        self._started.wait()
+
+    def _serve(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(self._started.set)
+        self.loop.run_forever()
+
+    # --- RUNNING COROUTINES ---
+    def submit(self, coro) -> Future:
+        """Schedule `coro` on the service loop; returns a concurrent.futures.Future."""
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("Already on the service loop: await the coroutine instead")
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """Run `coro` on the service loop and wait for its result (like `asyncio.run`)."""
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            # Timed out or interrupted: don't leave the work running
+            future.cancel()
+            raise
+
+    def on_loop(self) -> bool:
+        """True when called from code running on the service loop."""
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    # --- SHARED CONNECTIONS ---
+    def connector(self) -> aiohttp.TCPConnector:
+        """The shared connection pool (only usable on the service loop)."""
+        if self._connector is None or self._connector.closed:
+            self._connector = aiohttp.TCPConnector(limit=self.pool_limit, ttl_dns_cache=DNS_CACHE_SECONDS)
+        return self._connector
+
+    def stop(self):
+        if self.loop.is_closed():
+            return
+        if self._connector is not None and not self._connector.closed:
+            try:
+                self.run(self._connector.close(), timeout=5)
+            except Exception:
+                pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+        if not self.loop.is_running():
+            self.loop.close()
+
+
+_service: Optional[LoopService] = None
+_service_lock = threading.Lock()
+
+
+def get_loop_service() -> LoopService:
+    """The process-wide service (started on first use)."""
+    global _service
+    with _service_lock:
+        if _service is None or _service.loop.is_closed():
+            _service = LoopService()
+            atexit.register(_service.stop)
+        return _service
+
+
+def run_async(coro, timeout: Optional[float] = None):
+    """Run `coro` on the shared event loop and return its result."""
+    return get_loop_service().run(coro, timeout)
+
+
+def pooled_session(limit: int = POOL_LIMIT, **kwargs) -> aiohttp.ClientSession:
+    """
+    An aiohttp session for the current loop (call it inside a coroutine).
+    On the service loop it uses the shared pool, and closing it leaves the
+    pool open; callers keep their own semaphores for per-source limits.
+    Anywhere else it gets its own pool of `limit` connections.
+    """
+    service = _service
+    if service is not None and service.on_loop():
+        return aiohttp.ClientSession(connector=service.connector(), connector_owner=False, **kwargs)
+    return aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=limit, ttl_dns_cache=DNS_CACHE_SECONDS), **kwargs)
@@ -0,0 +1,333 @@
+"""
+News Sources (plug-in style)
+Google News RSS lived in gdelt_fetcher.py and the three paid APIs lived in
+HybridNewsFetcher, each with its own article shape, so one search could not
+use both.
+
+Here every provider is a "source" with the same small interface:
+- `stream(query, days)` is an async generator that yields batches of
+  `Article` records (see article_record.py) as soon as they arrive.
+- Each source has its own rate limit (requests per second) and its own
+  time budget (`timeout`, in seconds, for the whole search).
+
+`SourceCoordinator` runs any set of sources at the same time and sends every
+batch through one dedupe stage. When the same story comes from several
+sources, the NewsAPI copy wins (like in HybridNewsFetcher), whichever came
+first. Adding a new source = one small class plus one line in
+`SOURCE_FACTORIES`.
+"""
+
+import abc
+import asyncio
+import time
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+
+from article_record import Article
+from dedupe import TitleDeduper
+from gdelt_fetcher import build_rss_urls, entry_to_article, fetch_rss_async
+from hybrid_news_fetcher import HybridNewsFetcher
+from latency_slo import Deadline, FetchResult, hedged
+from loop_service import pooled_session, run_async
+
+
+class RateLimiter:
+    """Spaces requests out so there are at most `rate` per second (None = no limit)."""
+
+    def __init__(self, rate: Optional[float] = None):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot = 0.0
+
+    async def wait(self):
+        if not self.interval:
+            return
+        # No await between reading and booking the slot, so this is safe
+        # for many tasks on the same event loop without a lock.
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class NewsSource(abc.ABC):
+    """Base class for a source. Subclasses implement `stream`."""
+
+    name = "source"
+
+    def __init__(self, rate_limit: Optional[float] = None, timeout: float = 60):
+        self.limiter = RateLimiter(rate_limit)
+        self.timeout = timeout
+        # Fast mode: resend requests that are slower than usual (see latency_slo.py)
+        self.hedge = False
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    @abc.abstractmethod
+    def stream(self, query: str, days: int) -> AsyncIterator[List[Article]]:
+        """Yield batches of articles from the last `days` days."""
+
+
+# ==============================
+# GOOGLE NEWS RSS
+# ==============================
+class GoogleNewsRSSSource(NewsSource):
+    """The 24 Google News RSS searches from gdelt_fetcher, one batch per feed."""
+
+    name = "Google News RSS"
+
+    def __init__(self, rate_limit: Optional[float] = 20, timeout: float = 90,
+                 concurrency: int = 10, request_timeout: float = 30):
+        super().__init__(rate_limit, timeout)
+        self.concurrency = concurrency
+        self.request_timeout = request_timeout
+        self._session = None
+
+    async def open(self):
+        if self._session is None or self._session.closed:
+            self._session = pooled_session(limit=self.concurrency)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def stream(self, query: str, days: int) -> AsyncIterator[List[Article]]:
+        await self.open()
+        slots = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(url):
+            await self.limiter.wait()
+            return await fetch_rss_async(url, self._session, self.request_timeout)
+
+        async def one_feed(url):
+            async with slots:
+                if self.hedge:
+                    return await hedged(lambda: fetch(url), self.name)
+                return await fetch(url)
+
+        tasks = [asyncio.ensure_future(one_feed(url)) for url in build_rss_urls(query, days)]
+        try:
+            for done in asyncio.as_completed(tasks):
+                entries = await done
+                batch = []
+                for entry in entries:
+                    article = entry_to_article(entry)
+                    if article is not None:
+                        batch.append(Article.from_gdelt(article))
+                if batch:
+                    yield batch
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+# ==============================
+# PAID APIS (NewsAPI / GNews / NewsData)
+# ==============================
+class HybridProviderSource(NewsSource):
+    """
+    One provider of HybridNewsFetcher, one batch per result page.
+    Several providers can share a fetcher (and so its connection pool,
+    quota ledger and response cache).
+    """
+
+    # Default per-provider settings: (requests per second, time budget)
+    DEFAULTS = {"NewsAPI": (2, 20), "GNews": (1, 20), "NewsData": (1, 30)}
+
+    def __init__(self, provider: str, fetcher: Optional[HybridNewsFetcher] = None,
+                 rate_limit: Optional[float] = None, timeout: Optional[float] = None,
+                 max_articles: Optional[int] = None, page_limit: Optional[int] = None):
+        default_rate, default_timeout = self.DEFAULTS[provider]
+        super().__init__(rate_limit or default_rate, timeout or default_timeout)
+        self.name = provider
+        self.provider = provider
+        self.fetcher = fetcher or HybridNewsFetcher()
+        self.fetcher.limiters[provider] = self.limiter
+        self.max_articles = max_articles
+        # Most pages one query may spend (None: the fetcher's own limit)
+        self.page_limit = page_limit
+
+    async def close(self):
+        await self.fetcher.close()
+
+    async def stream(self, query: str, days: int) -> AsyncIterator[List[Article]]:
+        fetcher = self.fetcher
+        fetcher.hedge = self.hedge
+        # The budget scheduler decides how many pages this query may spend today,
+        # never more than the provider's page limit or ours
+        cap = fetcher.page_limit(self.provider)
+        if self.page_limit is not None:
+            cap = min(cap, self.page_limit)
+        pages = fetcher.scheduler.allocate(self.provider, fetcher._api_key(self.provider), [(query, 1)],
+                                           max_pages=cap)[query]
+        if self.provider == "NewsAPI":
+            pages_iter = fetcher.iter_newsapi(query, self.max_articles or 100 * fetcher.max_pages, pages, days)
+        elif self.provider == "GNews":
+            pages_iter = fetcher.iter_gnews(query, self.max_articles or 10 * fetcher.max_pages, pages, days)
+        else:
+            pages_iter = fetcher.iter_newsdata(query, self.max_articles or 10 * fetcher.max_pages, pages)
+        # NewsAPI/GNews get the window as a day-rounded `from`; NewsData can't
+        # take one, so anything older than `days` is dropped here.
+        cutoff = time.time() - days * 86400
+        async for page in pages_iter:
+            batch = [Article.from_hybrid(a) for a in page]
+            batch = [a for a in batch if a.published_ts is None or a.published_ts >= cutoff]
+            if batch:
+                yield batch
+
+
+# ==============================
+# COORDINATOR
+# ==============================
+class SourceCoordinator:
+    """Runs sources concurrently and dedupes everything in one place."""
+
+    def __init__(self, sources: List[NewsSource], preferred_source: Optional[str] = "NewsAPI"):
+        self.sources = sources
+        self.preferred_source = preferred_source
+        self.stats = {}
+        self.reason = "complete"
+
+    async def __aenter__(self):
+        for source in self.sources:
+            await source.open()
+        return self
+
+    async def __aexit__(self, *exc):
+        for source in self.sources:
+            await source.close()
+
+    async def _pump(self, source: NewsSource, query: str, days: int, queue: asyncio.Queue):
+        """Move one source's batches into the queue until it ends, fails or runs out of time."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + source.timeout
+        batches = source.stream(query, days)
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                try:
+                    batch = await asyncio.wait_for(batches.__anext__(), remaining)
+                except StopAsyncIteration:
+                    break
+                await queue.put((source, batch))
+        except asyncio.TimeoutError:
+            print(f"{source.name}: time budget of {source.timeout}s used up, keeping what arrived")
+        except Exception as e:
+            print(f"{source.name} error: {e}")
+        finally:
+            await batches.aclose()
+            await queue.put((source, None))
+
+    async def stream(self, query: str, days: int = 7, max_articles: Optional[int] = None,
+                     deadline: Optional[float] = None) -> AsyncIterator[Article]:
+        """
+        Yield unique articles from all sources as they arrive.
+        Stops after `deadline` seconds (self.reason becomes 'deadline').
+        """
+        clock = Deadline(deadline)
+        self.reason = "complete"
+        queue = asyncio.Queue()
+        deduper = TitleDeduper()
+        self.stats = {s.name: {"fetched": 0, "kept": 0} for s in self.sources}
+        pumps = [asyncio.ensure_future(self._pump(s, query, days, queue)) for s in self.sources]
+        kept = 0
+        try:
+            finished = 0
+            while finished < len(pumps):
+                try:
+                    source, batch = await asyncio.wait_for(queue.get(), clock.remaining())
+                except asyncio.TimeoutError:
+                    self.reason = "deadline"
+                    return
+                if batch is None:
+                    finished += 1
+                    continue
+                stats = self.stats[source.name]
+                stats["fetched"] += len(batch)
+                for article in batch:
+                    if not article.api_source:
+                        article.api_source = source.name
+                    # 'No description' is a filler, not something to compare on
+                    description = "" if article.description == "No description" else article.description
+                    duplicate, kept_article = deduper.check(article.title, description, article.source, article)
+                    if duplicate:
+                        if (kept_article is not None and article.api_source == self.preferred_source
+                                and kept_article.api_source != self.preferred_source):
+                            # The preferred copy replaces the one already handed out
+                            if kept_article.api_source in self.stats:
+                                self.stats[kept_article.api_source]["kept"] -= 1
+                            stats["kept"] += 1
+                            kept_article.replace_with(article)
+                        continue
+                    stats["kept"] += 1
+                    kept += 1
+                    yield article
+                    if max_articles and kept >= max_articles:
+                        self.reason = "target"
+                        return
+        finally:
+            for task in pumps:
+                task.cancel()
+            # Let the cancelled sources clean up before anyone closes their sessions
+            await asyncio.gather(*pumps, return_exceptions=True)
+
+    async def run(self, query: str, days: int = 7, max_articles: Optional[int] = None,
+                  deadline: Optional[float] = None, target: Optional[int] = None) -> FetchResult:
+        """
+        Collect unique articles. With a `deadline` and/or `target` this is fast
+        mode: slow requests are hedged, and whatever is still running at the
+        deadline (or once `target` articles are in) is cancelled.
+        """
+        clock = Deadline(deadline)
+        for source in self.sources:
+            source.hedge = deadline is not None
+        limit = min(filter(None, (max_articles, target)), default=None)
+        articles = [a async for a in self.stream(query, days, limit, deadline)]
+        for name, s in self.stats.items():
+            print(f"{name}: {s['fetched']} fetched, {s['kept']} kept after dedupe")
+        # Reaching the normal max_articles cap is not "partial", only a real target is
+        reason = self.reason
+        if reason == "target" and not (target and len(articles) >= target):
+            reason = "complete"
+        return FetchResult(articles, partial=reason != "complete", reason=reason, elapsed=clock.elapsed())
+
+
+# ==============================
+# REGISTRY + ONE-CALL HELPER
+# ==============================
+SOURCE_FACTORIES = {
+    "Google News RSS": lambda fetcher: GoogleNewsRSSSource(),
+    "NewsAPI": lambda fetcher: HybridProviderSource("NewsAPI", fetcher),
+    "GNews": lambda fetcher: HybridProviderSource("GNews", fetcher),
+    "NewsData": lambda fetcher: HybridProviderSource("NewsData", fetcher),
+}
+SOURCE_NAMES = list(SOURCE_FACTORIES)
+
+
+def make_sources(names: Iterable[str]) -> List[NewsSource]:
+    """Build sources by name; the API providers share one HybridNewsFetcher."""
+    fetcher = HybridNewsFetcher()
+    return [SOURCE_FACTORIES[name](fetcher) for name in names]
+
+
+async def fetch_news_async(query: str, days: int = 7, sources: Iterable[str] = ("Google News RSS",),
+                           max_articles: int = 5000, deadline: Optional[float] = None,
+                           target: Optional[int] = None) -> FetchResult:
+    async with SourceCoordinator(make_sources(sources)) as coordinator:
+        return await coordinator.run(query, days, max_articles, deadline, target)
+
+
+def fetch_news(query: str, days: int = 7, sources: Iterable[str] = ("Google News RSS",),
+               max_articles: int = 5000, deadline: Optional[float] = None,
+               target: Optional[int] = None) -> FetchResult:
+    """
+    Search the chosen sources at once and return unique Article records.
+    Fast mode: pass `deadline` (seconds) and/or `target` (article count).
+    """
+    return run_async(fetch_news_async(query, days, sources, max_articles, deadline, target))
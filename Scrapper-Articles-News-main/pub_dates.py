@@ -0,0 +1,107 @@
+"""
+Publication Dates (parsed once, when the article arrives)
+Feeds give dates as text: RSS uses "Mon, 09 Jun 2025 10:00:00 GMT", the news
+APIs use "2025-06-09T10:00:00Z". app2.py turned that text into a date with
+`pd.to_datetime` for every article on every rerun just to sort the list
+(hundreds of ms for 5,000 articles, on every click), and the Word report
+sorted the raw text, which puts "Tue, 01 Jul" before "Mon, 30 Jun".
+
+Now each date is parsed ONCE, when the article is created, into a plain
+number: seconds since 1970 in UTC (`published_ts` on `Article`).
+- RSS entries from feedparser are already parsed (`published_parsed`), so
+  that is just read; text dates go through a small RFC-822 / ISO-8601 parser.
+- `newest_first` gives the sorted order once per result set; "oldest first"
+  is the same list read backwards.
+"""
+
+import calendar
+import re
+from datetime import datetime, timezone
+from email.utils import parsedate_tz
+from typing import List, Optional, Sequence
+
+_MONTHS = {m: i for i, m in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), start=1)}
+# RFC-822 zone names (anything else counts as UTC, like email.utils does)
+_ZONES = {"UT": 0, "UTC": 0, "GMT": 0, "Z": 0, "EST": -5, "EDT": -4, "CST": -6, "CDT": -5,
+          "MST": -7, "MDT": -6, "PST": -8, "PDT": -7}
+_RFC822 = re.compile(
+    r"\s*(?:[A-Za-z]+,?\s*)?(\d{1,2})\s+([A-Za-z]{3})[A-Za-z]*\.?\s+(\d{2,4})"
+    r"\s+(\d{1,2}):(\d{2})(?::(\d{2}))?\s*([+-]\d{4}|[A-Za-z]+)?\s*$")
+
+
+def _rfc822(text: str) -> Optional[int]:
+    m = _RFC822.match(text)
+    if not m:
+        return None
+    day, mon, year, hour, minute, second, zone = m.groups()
+    month = _MONTHS.get(mon.lower())
+    if month is None:
+        return None
+    year = int(year)
+    if year < 100:
+        year += 2000 if year < 70 else 1900
+    if zone and zone[0] in "+-":
+        offset = (int(zone[1:3]) * 3600 + int(zone[3:5]) * 60) * (-1 if zone[0] == "-" else 1)
+    else:
+        offset = _ZONES.get((zone or "GMT").upper(), 0) * 3600
+    try:
+        return calendar.timegm((year, month, int(day), int(hour), int(minute), int(second or 0))) - offset
+    except (ValueError, OverflowError):
+        return None
+
+
+def _iso(text: str) -> Optional[int]:
+    if text.endswith(("Z", "z")):
+        text = text[:-1] + "+00:00"
+    try:
+        dt = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def parse_published(value) -> Optional[int]:
+    """UTC epoch seconds of a published date (RFC-822 or ISO text, or a struct_time), None if unknown."""
+    if not value:
+        return None
+    if not isinstance(value, str):
+        try:
+            return calendar.timegm(value)  # feedparser's *_parsed (a UTC struct_time)
+        except (TypeError, ValueError, OverflowError):
+            return None
+    text = value.strip()
+    if text[:1].isdigit() and "-" in text[:5]:
+        return _iso(text)
+    found = _rfc822(text)
+    if found is not None:
+        return found
+    # Anything unusual: the standard library's (slower, looser) parser
+    parts = parsedate_tz(text)
+    if parts is None:
+        return None
+    try:
+        return calendar.timegm(parts[:6]) - (parts[9] or 0)
+    except (ValueError, OverflowError):
+        return None
+
+
+def entry_timestamp(entry) -> Optional[int]:
+    """Epoch of a feedparser entry: its already parsed date, else its date text."""
+    for key in ("published_parsed", "updated_parsed"):
+        parsed = entry.get(key)
+        if parsed:
+            return parse_published(parsed)
+    return parse_published(entry.get("published") or entry.get("updated") or "")
+
+
+def newest_first(articles: Sequence, key: str = "published_ts") -> List[int]:
+    """
+    Positions of `articles`, newest first; undated ones go last in their
+    original order. Reverse the list for oldest first.
+    """
+    stamps = [a.get(key) for a in articles]
+    dated = sorted((i for i, ts in enumerate(stamps) if ts is not None), key=lambda i: -stamps[i])
+    return dated + [i for i, ts in enumerate(stamps) if ts is None]
@@ -0,0 +1,65 @@
+"""
+Result Pages (show one page of articles, not all 5,000)
+app2.py drew every article on every rerun: a header, a caption and an
+expander each, with the full text written inside every expander even while
+it was closed. Any click (even the sort radio) sent all of it to the browser
+again, so a big search meant megabytes per interaction.
+
+Now the results are shown a page at a time:
+- `matching_indices` applies the search box and the filters (sources,
+  syndicated copies, paywall) and returns the positions that match.
+- `page_bounds` turns a page number into the slice to draw.
+- Only that slice is rendered, and a full text is only read from the text
+  store and sent when its "Read full article" switch is turned on.
+So the work per rerun grows with the page size, not with the result count.
+"""
+
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+PAGE_SIZES = (10, 25, 50, 100)
+PAYWALL_FILTERS = ("All", "Free to read", "Paywalled")
+# Fields the search box looks at (the full text stays on disk)
+SEARCH_FIELDS = ("title", "source", "summary", "description")
+
+
+def _haystack(article) -> str:
+    return " ".join(str(article.get(f) or "") for f in SEARCH_FIELDS).casefold()
+
+
+def matching_indices(articles: Sequence, search: str = "", sources: Optional[Iterable[str]] = None,
+                     hide_syndicated: bool = False, paywall: str = "All",
+                     order: Optional[Sequence[int]] = None) -> List[int]:
+    """
+    Positions of the articles that pass every filter, in `order` (a list of
+    positions, e.g. newest first) or as they are. `search` matches when every
+    word in it appears in the title, source, summary or description
+    (case-insensitive); an empty `sources` means any source.
+    """
+    words = search.casefold().split()
+    sources = set(sources or ())
+    keep = []
+    for i in (range(len(articles)) if order is None else order):
+        article = articles[i]
+        if sources and article.get("source") not in sources:
+            continue
+        if hide_syndicated and not article.get("is_canonical", True):
+            continue
+        if paywall != "All" and bool(article.get("is_paywall")) != (paywall == "Paywalled"):
+            continue
+        if words:
+            text = _haystack(article)
+            if not all(w in text for w in words):
+                continue
+        keep.append(i)
+    return keep
+
+
+def page_count(total: int, page_size: int) -> int:
+    return max(1, -(-total // page_size))
+
+
+def page_bounds(total: int, page: int, page_size: int) -> Tuple[int, int]:
+    """(start, end) of 1-based `page`; out-of-range pages are clamped."""
+    page = min(max(page, 1), page_count(total, page_size))
+    start = (page - 1) * page_size
+    return start, min(start + page_size, total)
@@ -0,0 +1,379 @@
+"""
+Run History (every finished search saved to disk, reloadable in a second)
+Results used to live only in `st.session_state`: a browser refresh or a
+container restart threw away a 20-minute scrape, and the only way back to
+yesterday's report was to scrape it all again.
+
+Each finished run is now saved as one Parquet file (columnar, zstd):
+    NEWS_DATA_DIR/runs/query=<query>/date=<YYYY-MM-DD>/<run id>.parquet
+- Rows hold the article metadata and cluster scores. The article bodies go
+  into one compressed `FullTextStore` next to it (runs/texts.blob) and the
+  table only keeps their `text_ref`.
+- Run details (query, app, mode, cluster config, row count) are stored in
+  the Parquet footer, so listing runs never reads any rows.
+- `load(run, columns=[...])` reads only the columns asked for, so a list
+  view never touches the bodies. Bodies are read one by one with
+  `full_text(ref)` (or all at once with `with_text=True`).
+- The text file only grows (app2 scrapes straight into it, and deleted runs
+  leave their bodies behind). `compact()` copies the texts that saved runs
+  still use into a fresh file and points the runs at it; the old file is
+  deleted by a later `compact()`, once nothing points into it any more.
+- Both apps share this folder, so `save` and `compact` take turns through a
+  lock file (`.compact.lock`), and every process keeps a shared lock on the
+  text file it writes to: compaction never deletes a file someone still uses.
+
+Needs pyarrow.
+"""
+
+import glob
+import json
+import os
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows: msvcrt locks instead (and open files can't be deleted there)
+    fcntl = None
+    import msvcrt
+
+from text_store import FullTextStore, open_store, store_id_for
+
+DEFAULT_DIR = os.path.join(os.environ.get("NEWS_DATA_DIR", ".news_data"), "runs")
+META_KEY = b"news_run"
+# Name of the text file new bodies go to (changes when the texts are compacted)
+TEXTS_POINTER = "texts.current"
+# Enough for a result list (no bodies)
+LIST_COLUMNS = ["title", "source", "link", "published", "summary", "text_ref",
+                "Headline", "Source", "Link", "Published", "Summary",
+                "PrimaryCluster", "RelevanceScore", "MatchedClusters"]
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", text or "").strip("_").lower()[:60] or "untitled"
+
+
+def _plain(value):
+    """Arrow-friendly value (errors and other objects become text)."""
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, (list, tuple, set)):
+        return [str(v) for v in value]
+    return str(value)
+
+
+class RunHistory:
+    """Save, list and reload finished runs."""
+
+    def __init__(self, root: str = DEFAULT_DIR):
+        import pyarrow  # noqa: F401  (fail early with a clear ImportError)
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        # Shared locks on the text files this object writes to (see _in_use)
+        self._holds = {}
+        self._use_store(open_store(self._current_text_path()))
+        # Every text file opened here, by store id (older files stay readable)
+        self._stores = {self.texts.store_id: self.texts}
+
+    def _use_store(self, store: FullTextStore):
+        """Write new bodies to `store`, and tell other processes its file is in use."""
+        self.texts = store
+        if fcntl is not None and store.path not in self._holds:
+            hold = open(store.path, "rb")
+            fcntl.flock(hold, fcntl.LOCK_SH)
+            self._holds[store.path] = hold
+
+    @staticmethod
+    def _in_use(path: str) -> bool:
+        """True if some RunHistory (in any process) still writes to this text file."""
+        if fcntl is None:
+            return False
+        with open(path, "rb") as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return True
+        return False
+
+    @contextmanager
+    def _locked(self):
+        """One `save` or `compact` at a time on this folder, across threads and processes."""
+        with open(os.path.join(self.root, ".compact.lock"), "a+b") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            else:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def close(self):
+        """Stop holding the text files (a later `compact()` may then delete old ones)."""
+        for hold in self._holds.values():
+            hold.close()
+        self._holds.clear()
+
+    def _current_text_path(self) -> str:
+        try:
+            with open(os.path.join(self.root, TEXTS_POINTER), encoding="utf-8") as f:
+                name = f.read().strip()
+        except OSError:
+            name = ""
+        return os.path.join(self.root, name or "texts.blob")
+
+    def _text_files(self) -> Dict[str, str]:
+        """Store id -> path of every text file in the history folder."""
+        return {store_id_for(path): path for path in glob.glob(os.path.join(self.root, "texts*.blob"))}
+
+    def _store_for(self, ref: str) -> Optional[FullTextStore]:
+        store_id = ref.split(":", 1)[0]
+        store = self._stores.get(store_id)
+        if store is None:
+            path = self._text_files().get(store_id)
+            if path is None:
+                return None
+            store = self._stores[store_id] = open_store(path)
+        return store
+
+    # --- SAVE ---
+    def save(self, rows: Iterable, query: str, app: str, text_field: Optional[str] = None,
+             meta: Optional[Dict] = None) -> Dict:
+        """
+        Save one run. `rows` are dicts (or Article records). The body in
+        `text_field` (e.g. "Article" in app.py) is moved to the text store and
+        replaced by a `text_ref` column. Records with a `text_ref` into another
+        store have their text copied over; refs into `self.texts` are kept as they are.
+        Returns the run's info (same shape as `list_runs`).
+        """
+        with self._locked():
+            return self._save(rows, query, app, text_field, meta)
+
+    def _save(self, rows, query, app, text_field, meta) -> Dict:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        from text_store import get_full_text
+
+        # Another process may have compacted the texts into a new file since we opened ours
+        current = os.path.abspath(self._current_text_path())
+        if current != self.texts.path:
+            self._use_store(open_store(current))
+            self._stores[self.texts.store_id] = self.texts
+        rows = list(rows)
+        records = []
+        for row in rows:
+            # (Article records: skip full_text here, it would be decompressed for nothing)
+            item = dict(row) if isinstance(row, dict) else {k: row[k] for k in row.keys() if k != "full_text"}
+            if text_field is not None:
+                text = item.pop(text_field, None)
+                item["text_ref"] = self.texts.put(text) if text else None
+            elif str(row.get("text_ref") or "").startswith(f"{self.texts.store_id}:"):
+                # Already in this history's text file (app2 jobs scrape straight into it)
+                item.pop("full_text", None)
+                item["text_ref"] = row.get("text_ref")
+            else:
+                text = get_full_text(row)
+                item.pop("full_text", None)
+                item["text_ref"] = self.texts.put(text) if text else None
+            records.append({k: _plain(v) for k, v in item.items()})
+
+        created = time.time()
+        run_id = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(created))}-{uuid.uuid4().hex[:6]}"
+        order = list(dict(rows[0]) if rows and isinstance(rows[0], dict) else [])
+        info = {"run_id": run_id, "query": query, "app": app, "created": created,
+                "rows": len(records), "columns": order, **(meta or {})}
+        folder = os.path.join(self.root, f"query={_slug(query)}",
+                              f"date={time.strftime('%Y-%m-%d', time.localtime(created))}")
+        os.makedirs(folder, exist_ok=True)
+
+        columns = []
+        for record in records:
+            for key in record:
+                if key not in columns:
+                    columns.append(key)
+        table = pa.Table.from_pylist(records, schema=self._schema(records, columns))
+        table = table.replace_schema_metadata({META_KEY: json.dumps(info, default=str).encode("utf-8")})
+        path = os.path.join(folder, f"{run_id}.parquet")
+        pq.write_table(table, path + ".tmp", compression="zstd")
+        os.replace(path + ".tmp", path)
+        return {**info, "path": path}
+
+    @staticmethod
+    def _schema(records: List[Dict], columns: List[str]):
+        """Column types from the values: lists of text, numbers, flags, otherwise text."""
+        import pyarrow as pa
+        fields = []
+        for name in columns:
+            values = [r.get(name) for r in records if r.get(name) is not None]
+            if values and all(isinstance(v, list) for v in values):
+                kind = pa.list_(pa.string())
+            elif values and all(isinstance(v, bool) for v in values):
+                kind = pa.bool_()
+            elif values and all(isinstance(v, int) and not isinstance(v, bool) for v in values):
+                kind = pa.int64()
+            elif values and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+                kind = pa.float64()
+            else:
+                kind = pa.string()
+                for r in records:
+                    if r.get(name) is not None and not isinstance(r[name], str):
+                        r[name] = str(r[name])
+            fields.append(pa.field(name, kind))
+        return pa.schema(fields)
+
+    # --- LIST ---
+    def _run_paths(self, query: Optional[str] = None) -> List[str]:
+        pattern = os.path.join(self.root, f"query={_slug(query)}" if query else "query=*", "date=*", "*.parquet")
+        # Run ids start with the timestamp, so the file name sorts by age
+        return sorted(glob.glob(pattern), key=os.path.basename, reverse=True)
+
+    def list_runs(self, query: Optional[str] = None, limit: Optional[int] = 50,
+                  app: Optional[str] = None) -> List[Dict]:
+        """Saved runs, newest first (reads only the Parquet footers). `app` keeps one app's runs."""
+        import pyarrow.parquet as pq
+        runs = []
+        for path in self._run_paths(query):
+            if limit is not None and len(runs) >= limit:
+                break
+            try:
+                meta = pq.read_metadata(path).metadata or {}
+                info = json.loads(meta.get(META_KEY, b"{}"))
+            except Exception:
+                continue
+            if app is not None and info.get("app") != app:
+                continue
+            runs.append({**info, "path": path})
+        return runs
+
+    def _path(self, run: Union[str, Dict]) -> str:
+        if isinstance(run, dict):
+            return run["path"]
+        found = glob.glob(os.path.join(self.root, "query=*", "date=*", f"{run}.parquet"))
+        if not found:
+            raise KeyError(f"No saved run {run!r}")
+        return found[0]
+
+    # --- LOAD ---
+    def load_table(self, run: Union[str, Dict], columns: Optional[Sequence[str]] = None):
+        """The run as an Arrow table; `columns` limits what is read (missing names are skipped)."""
+        import pyarrow.parquet as pq
+        path = self._path(run)
+        if columns is not None:
+            present = set(pq.read_schema(path).names)
+            columns = [c for c in columns if c in present]
+        return pq.read_table(path, columns=columns)
+
+    def load(self, run: Union[str, Dict], columns: Optional[Sequence[str]] = None,
+             with_text: Optional[str] = None) -> List[Dict]:
+        """
+        The run's rows as dicts. With `with_text="Article"` the bodies are read
+        back from the text store into that key, in place of `text_ref` (for exports).
+        """
+        table = self.load_table(run, columns)
+        rows = table.to_pylist()
+        if with_text:
+            info = json.loads((table.schema.metadata or {}).get(META_KEY, b"{}"))
+            order = info.get("columns") or []
+            for i, row in enumerate(rows):
+                row[with_text] = self.full_text(row.pop("text_ref", None))
+                if order:
+                    # Same column order as when the run was saved
+                    rows[i] = {k: row[k] for k in order if k in row}
+                    rows[i].update({k: v for k, v in row.items() if k not in rows[i]})
+        return rows
+
+    def full_text(self, ref: Optional[str]) -> str:
+        store = self._store_for(ref) if ref else None
+        return store.get(ref) if store is not None else ""
+
+    def delete(self, run: Union[str, Dict]):
+        """Forget a run (`compact()` frees its bodies)."""
+        os.remove(self._path(run))
+
+    def expire(self, max_age_days: float) -> int:
+        """Delete runs older than `max_age_days`; returns how many went."""
+        cutoff = time.time() - max_age_days * 86400
+        old = [run for run in self.list_runs(limit=None) if run.get("created", 0) < cutoff]
+        for run in old:
+            self.delete(run)
+        return len(old)
+
+    # --- HOUSEKEEPING ---
+    def compact(self, max_age_days: Optional[float] = None, min_waste: float = 0.0) -> Dict:
+        """
+        Free the space of texts no saved run uses (deleted or expired runs,
+        searches that were never saved). Only runs when at least `min_waste`
+        of the text files is unused. Texts already handed out keep working:
+        the old file is only deleted by a later compaction, once no saved run
+        points into it and no RunHistory (here or in another process) still
+        writes to it.
+        """
+        with self._locked():
+            return self._compact(max_age_days, min_waste)
+
+    def _compact(self, max_age_days, min_waste) -> Dict:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if max_age_days is not None:
+            self.expire(max_age_days)
+        run_refs = {}
+        for path in self._run_paths():
+            try:
+                if "text_ref" in pq.read_schema(path).names:
+                    run_refs[path] = pq.read_table(path, columns=["text_ref"]).column(0).to_pylist()
+            except Exception:
+                continue
+        live = {ref for refs in run_refs.values() for ref in refs if ref}
+
+        # Old text files that nothing here or in a saved run points at
+        used = {ref.split(":", 1)[0] for ref in live} | set(self._stores)
+        for store_id, path in self._text_files().items():
+            if store_id not in used and not self._in_use(path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+        before = sum(os.path.getsize(p) for p in self._text_files().values())
+        live_bytes = sum(int(ref.rsplit(":", 1)[1]) for ref in live)
+        waste = 1 - live_bytes / before if before else 0.0
+        stats = {"runs": len(run_refs), "texts": len(live), "waste": waste,
+                 "bytes_before": before, "bytes_after": before}
+        if waste <= 0 or waste < min_waste:
+            return stats
+
+        stem = f"texts-{uuid.uuid4().hex[:8]}.blob"
+        fresh = FullTextStore(os.path.join(self.root, stem))
+        moved = {}
+        for ref in live:
+            source = self._store_for(ref)
+            moved[ref] = fresh.copy_from(source, ref) if source is not None else None
+        for path, refs in run_refs.items():
+            table = pq.read_table(path)
+            column = pa.array([moved.get(ref) for ref in refs], pa.string())
+            table = table.set_column(table.schema.get_field_index("text_ref"), "text_ref", column)
+            pq.write_table(table, path + ".tmp", compression="zstd")
+            os.replace(path + ".tmp", path)
+        with open(os.path.join(self.root, TEXTS_POINTER + ".tmp"), "w", encoding="utf-8") as f:
+            f.write(stem)
+        os.replace(os.path.join(self.root, TEXTS_POINTER + ".tmp"), os.path.join(self.root, TEXTS_POINTER))
+
+        self._stores[fresh.store_id] = fresh
+        self._use_store(fresh)
+        stats["bytes_after"] = fresh.size_on_disk()
+        return stats
+
+
+def run_label(info: Dict) -> str:
+    """Short line for a run picker: '2026-10-19 14:03 · chemical industry · 240 articles'."""
+    when = time.strftime("%Y-%m-%d %H:%M", time.localtime(info.get("created", 0)))
+    extra = f" · {info['mode']}" if info.get("mode") else ""
+    return f"{when} · {info.get('query', '?')} · {info.get('rows', 0)} articles{extra}"
@@ -0,0 +1,107 @@
+"""
+The app2.py Search, as a Background Job
+This is the work the "Find News Articles" button used to do inside the
+page: find links, reuse articles read before, visit the new ones, mark
+syndicated copies. It now runs on a `JobRunner` worker (job_runner.py), so it
+has no Streamlit calls: progress, status lines and the articles found so far
+go to the `job`, and the page polls them.
+
+`search_key` says when two searches are the same (same words, days, sources
+and settings), so the runner can share one job between everyone asking.
+"""
+
+from typing import Iterable, List, Optional, Tuple
+
+from article_record import Article
+from article_scraper import enhance_articles_async
+from dedupe import mark_syndicated
+from extractive_summarizer import LocalSummarizer
+from news_sources import fetch_news_async
+from seen_index import scope_key
+from text_store import FullTextStore, get_full_text
+
+
+def search_key(query: str, days: int, sources: Iterable[str], time_limit: Optional[float] = None,
+               target_links: Optional[int] = None, summary_style: str = "First paragraphs") -> Tuple:
+    """Identity of a search: "Tech  & AI" and "tech & ai" are the same; source order doesn't matter."""
+    return ("app2", " ".join(query.casefold().split()), int(days), tuple(sorted(sources)),
+            time_limit, target_links, summary_style)
+
+
+def run_search(job, query: str, days: int, sources: Iterable[str], time_limit: Optional[float] = None,
+               target_links: Optional[int] = None, summary_style: str = "First paragraphs",
+               seen=None, text_store=None) -> List[Article]:
+    """
+    Find, read and summarize the articles for `query`. `seen` (a SeenIndex)
+    turns on incremental mode; scraped texts go to `text_store` (if not
+    given, a temporary store of this job's own, deleted once the job runner
+    forgets the job). Returns the articles.
+    """
+    sources = list(sources)
+    if text_store is None:
+        text_store = FullTextStore()
+        job.on_forget(text_store.close)
+
+    # STEP 1: FIND LINKS
+    job.progress(10, 100, "Searching for links...")
+    job.note(f"🔍 Searching {', '.join(sources) or 'no sources'} for '{query}'...")
+    raw_articles = job.run_async(fetch_news_async(query, days, sources, 5000, time_limit, target_links)) if sources else []
+    if getattr(raw_articles, 'partial', False):
+        job.note(f"⚡ Fast results: stopped after {raw_articles.elapsed:.1f}s "
+                 f"({'enough links found' if raw_articles.reason == 'target' else 'time limit reached'}); slower feeds were skipped.")
+    job.progress(20, 100, f"Found {len(raw_articles)} links...")
+    if not raw_articles:
+        job.note("❌ No news found for this keyword. Please try another.")
+        return []
+    raw_articles = list(raw_articles)
+    # The page can already list the links while they are being read
+    job.results = raw_articles
+    job.note(f"✅ Found {len(raw_articles)} links from around the web.")
+    job.check()
+
+    # STEP 2: READ CONTENT
+    # INCREMENTAL: articles we already read for this topic come from the notebook
+    to_scrape = raw_articles
+    if seen is not None:
+        # Summaries differ per style, so "Key sentences" keeps its own notebook
+        scope = scope_key("app2", query) if summary_style == "First paragraphs" else scope_key("app2", query, summary_style)
+        to_scrape, cached = seen.partition(scope, raw_articles)
+        for article, payload in cached:
+            article['full_text'] = payload.get('full_text', '')
+            article['summary'] = payload.get('summary', '')
+            article['is_paywall'] = payload.get('is_paywall', False)
+            article.offload_text(text_store)
+        job.note(f"♻️ {len(cached)} articles were already read before; visiting {len(to_scrape)} new ones.")
+    job.note(f"📖 Visiting {len(to_scrape)} websites to extract content...")
+
+    def update_progress(current, total):
+        # Scraping (0-100%) fills the remaining 20-100% of the job
+        job.progress(int(20 + current / total * 80), 100, f"Reading article {current}/{total}")
+
+    # Only the new articles are visited (the list is updated in place)
+    job.run_async(enhance_articles_async(
+        to_scrape,
+        limit=None,
+        progress_callback=update_progress,
+        text_store=text_store,
+        summarize=LocalSummarizer("textrank") if summary_style == "Key sentences" else None,
+        stop=job.stop_event,
+    ))
+    job.check()
+
+    # Remember what we just read (skip failed scrapes so they are retried next time)
+    if seen is not None:
+        for article in to_scrape:
+            if article.get('text_ref'):
+                seen.record(scope, {
+                    'full_text': get_full_text(article),
+                    'summary': article.get('summary', ''),
+                    'is_paywall': article.get('is_paywall', False),
+                }, link=article['link'], title=article['title'], source=article['source'])
+
+    # Group wire-story copies (same body, different outlets)
+    job.check()
+    syndicated = mark_syndicated(raw_articles)
+    job.note(f"🧬 Found {sum(len(c) for c in syndicated.values())} syndicated copies of {len(syndicated)} stories.")
+    job.progress(100, 100, "Done!")
+    return raw_articles
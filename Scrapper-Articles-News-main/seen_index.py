@@ -0,0 +1,164 @@
+"""
+Seen-Article Index (remembers work between runs)
+The daily tracker searches the same topics every day, and most of the
+articles it finds were already decoded, scraped and summarized yesterday.
+
+This file keeps a small SQLite database of every article we processed:
+- Keyed by its canonical URL (tracking junk like ?utm_source removed) and
+  by a fingerprint of its normalized title.
+- Scoped per query (or per cluster config), so "Tech & AI" and "Finance"
+  keep separate memories.
+- It stores the finished result, so a rerun can reuse it and only
+  decode/scrape/summarize the articles that are actually new.
+- Entries older than `max_age` (2 days by default) are ignored and pruned:
+  stories get updated, and an old body is worse than a fresh scrape.
+- A title match only says "probably the same story". Its stored body may be
+  another outlet's text, so callers reuse a body only after a URL match.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+from dedupe import normalize_title
+
+DEFAULT_PATH = os.path.join(os.environ.get("NEWS_DATA_DIR", ".news_data"), "seen_index.sqlite")
+DEFAULT_MAX_AGE = 2 * 24 * 3600
+
+# Query parameters that only track clicks and never change the article.
+_TRACKING_PARAMS = {"utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content",
+                    "fbclid", "gclid", "ocid", "cmpid", "ref", "referrer", "ito"}
+
+
+def canonical_url(url: str) -> str:
+    """Lowercase host without 'www.', no fragment, no tracking parameters."""
+    if not url:
+        return ""
+    try:
+        p = urlparse(url.strip())
+    except Exception:
+        return url.strip()
+    host = p.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode([(k, v) for k, v in parse_qsl(p.query, keep_blank_values=True)
+                       if k.lower() not in _TRACKING_PARAMS])
+    path = p.path.rstrip("/") or "/"
+    return urlunparse((p.scheme.lower() or "https", host, path, "", query, ""))
+
+
+def title_fingerprint(title: str, source: str = "") -> str:
+    norm = normalize_title(title, source)
+    return hashlib.sha1(norm.encode("utf-8")).hexdigest() if norm else ""
+
+
+def scope_key(*parts) -> str:
+    """One scope string from a query and any settings that change the result."""
+    return "|".join(str(p).lower().strip() for p in parts)
+
+
+class SeenIndex:
+    """Persistent (scope, url/title) -> processed-article store."""
+
+    def __init__(self, path: str = DEFAULT_PATH, max_age: Optional[float] = DEFAULT_MAX_AGE):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS seen (
+                scope TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                PRIMARY KEY (scope, kind, key)
+            )
+        """)
+        self._conn.commit()
+        if max_age is not None:
+            self.prune(max_age)
+
+    @staticmethod
+    def _keys(link: str, title: str, source: str) -> List[Tuple[str, str]]:
+        keys = []
+        url = canonical_url(link)
+        if url:
+            keys.append(("url", url))
+        fp = title_fingerprint(title, source)
+        if fp:
+            keys.append(("title", fp))
+        return keys
+
+    def lookup(self, scope: str, link: str = "", title: str = "", source: str = "",
+               max_age: Optional[float] = None) -> Tuple[Optional[Dict], Optional[str]]:
+        """
+        Return (payload, matched_by) for a processed article, or (None, None).
+        matched_by is 'url' (this exact article) or 'title' (the same story,
+        possibly from another outlet: don't reuse its body without checking
+        the URL). Entries older than `max_age` seconds (default: the index's
+        `max_age`) are not returned.
+        """
+        max_age = self.max_age if max_age is None else max_age
+        newer_than = time.time() - max_age if max_age is not None else 0
+        with self._lock:
+            for kind, key in self._keys(link, title, source):
+                row = self._conn.execute(
+                    "SELECT payload FROM seen WHERE scope = ? AND kind = ? AND key = ? AND last_seen >= ?",
+                    (scope, kind, key, newer_than)).fetchone()
+                if row:
+                    return json.loads(zlib.decompress(row[0]).decode("utf-8")), kind
+        return None, None
+
+    def record(self, scope: str, payload: Dict, link: str = "", title: str = "", source: str = ""):
+        """Remember a processed article under its URL and title keys."""
+        blob = zlib.compress(json.dumps(payload, default=str).encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                """INSERT INTO seen (scope, kind, key, payload, first_seen, last_seen)
+                   VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(scope, kind, key)
+                   DO UPDATE SET payload = excluded.payload, last_seen = excluded.last_seen""",
+                [(scope, kind, key, blob, now, now) for kind, key in self._keys(link, title, source)])
+            self._conn.commit()
+
+    def partition(self, scope: str, articles: List,
+                  max_age: Optional[float] = None) -> Tuple[List, List[Tuple[object, Dict]]]:
+        """
+        Split fetched articles (dicts or Article records with a link) into
+        (new articles, [(article, cached payload), ...]). Only URL matches
+        count: the cached body is reused as this article's own text.
+        """
+        new, cached = [], []
+        for article in articles:
+            payload, _ = self.lookup(scope, article.get("link", ""), max_age=max_age)
+            if payload is None:
+                new.append(article)
+            else:
+                cached.append((article, payload))
+        return new, cached
+
+    def prune(self, older_than: float):
+        """Delete entries not written in the last `older_than` seconds."""
+        with self._lock:
+            self._conn.execute("DELETE FROM seen WHERE last_seen < ?", (time.time() - older_than,))
+            self._conn.commit()
+
+    def forget(self, scope: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM seen WHERE scope = ?", (scope,))
+            self._conn.commit()
+
+    def count(self, scope: str) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM seen WHERE scope = ? AND kind = 'url'",
+                                      (scope,)).fetchone()[0]
@@ -0,0 +1,218 @@
+"""
+Summarization Service
+app.py used to send one Hugging Face request per article, with the whole
+article text, one after another, and no memory: a rerun paid for every summary
+again, and when the call failed the error message was saved as the summary.
+
+`SummarizationService` fixes that:
+- Input is cut to the model's window (T5-small reads ~512 tokens), at a
+  sentence end when possible.
+- Results are cached on disk (SQLite under NEWS_DATA_DIR), keyed by a hash of
+  the model name + the (cut) text. Reruns and syndicated copies are free.
+- Identical texts that are being summarized right now share one request.
+- Many texts at once (`summarize_many`) go out as concurrent requests, never
+  more than `max_concurrency` at a time.
+- Failures are raised/returned as `SummarizationError` types, never as text.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+DEFAULT_MODEL = "Falconsai/text_summarization"
+DEFAULT_PATH = os.path.join(os.environ.get("NEWS_DATA_DIR", ".news_data"), "summaries.sqlite")
+
+# Roughly how many model tokens one word costs (English, T5 sentencepiece)
+TOKENS_PER_WORD = 1.3
+
+
+# ==============================
+# FAILURE TYPES
+# ==============================
+class SummarizationError(Exception):
+    """Base class: the summary could not be made."""
+
+
+class EmptyTextError(SummarizationError):
+    """There was no text to summarize."""
+
+
+class ModelCallError(SummarizationError):
+    """The model (remote endpoint) failed or answered with something unusable."""
+
+
+# ==============================
+# HELPERS
+# ==============================
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def truncate_to_window(text: str, max_tokens: int = 512) -> str:
+    """Keep about `max_tokens` tokens of `text`, cutting at a sentence end if one is close."""
+    words = text.split()
+    max_words = int(max_tokens / TOKENS_PER_WORD)
+    if len(words) <= max_words:
+        return " ".join(words)
+    cut = " ".join(words[:max_words])
+    ends = [m.start() for m in _SENTENCE_END.finditer(cut)]
+    # Only cut at a sentence end if we keep at least 3/4 of the allowed text
+    if ends and ends[-1] >= len(cut) * 0.75:
+        cut = cut[:ends[-1]]
+    return cut
+
+
+def summary_or_error(summarize: Callable[[str], str], text: str) -> Tuple[str, Optional[SummarizationError]]:
+    """(summary, None) or ("", error). Never raises, whatever goes wrong inside `summarize`."""
+    try:
+        return summarize(text), None
+    except SummarizationError as e:
+        return "", e
+    except Exception as e:
+        return "", ModelCallError(f"{type(e).__name__}: {e}")
+
+
+def content_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+def hf_backend(model: str = DEFAULT_MODEL, api_key: Optional[str] = None) -> Callable[[str], str]:
+    """Remote Hugging Face summarization (the endpoint app.py always used)."""
+    from huggingface_hub import InferenceClient
+    client = InferenceClient(provider="hf-inference",
+                             api_key=api_key if api_key is not None else os.environ.get("xdpooja", ""))
+
+    def summarize(text: str) -> str:
+        try:
+            result = client.summarization(text, model=model)
+        except Exception as e:
+            raise ModelCallError(str(e)) from e
+        if hasattr(result, "summary_text"):
+            return result.summary_text
+        if isinstance(result, list) and result:
+            first = result[0]
+            if isinstance(first, dict) and "summary_text" in first:
+                return first["summary_text"]
+        if isinstance(result, dict) and "summary_text" in result:
+            return result["summary_text"]
+        raise ModelCallError(f"Unexpected response: {str(result)[:200]}")
+
+    return summarize
+
+
+# ==============================
+# DISK CACHE
+# ==============================
+class SummaryCache:
+    """content key -> summary text, in SQLite."""
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS summaries (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                created REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT summary FROM summaries WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, model: str, summary: str):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO summaries (key, model, summary, created) VALUES (?, ?, ?, ?)",
+                               (key, model, summary, time.time()))
+            self._conn.commit()
+
+
+# ==============================
+# SERVICE
+# ==============================
+class SummarizationService:
+    """Cached, deduplicated, concurrency-capped summaries for one model."""
+
+    def __init__(self, backend: Optional[Callable[[str], str]] = None, model: str = DEFAULT_MODEL,
+                 max_concurrency: int = 4, max_input_tokens: int = 512,
+                 cache: Optional[SummaryCache] = None):
+        self.model = model
+        self.backend = backend or hf_backend(model)
+        self.max_input_tokens = max_input_tokens
+        self.cache = cache if cache is not None else SummaryCache()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._pool = ThreadPoolExecutor(max_concurrency, thread_name_prefix="summary")
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {"cached": 0, "called": 0, "shared": 0, "failed": 0}
+
+    def _count(self, name: str):
+        # Called from many pool threads at once
+        with self._lock:
+            self.stats[name] += 1
+
+    def summarize(self, text: str) -> str:
+        """Summary of `text`, or raise a SummarizationError."""
+        if not text or not text.strip():
+            raise EmptyTextError("No content to summarize.")
+        try:
+            text = truncate_to_window(text, self.max_input_tokens)
+            key = content_key(self.model, text)
+            cached = self.cache.get(key)
+        except Exception as e:
+            self._count("failed")
+            raise SummarizationError(f"Could not prepare the text: {e}") from e
+        if cached is not None:
+            self._count("cached")
+            return cached
+
+        # Single flight: if someone is already summarizing this text, wait for them.
+        with self._lock:
+            waiting = self._inflight.get(key)
+            if waiting is None:
+                mine = self._inflight[key] = Future()
+        if waiting is not None:
+            self._count("shared")
+            return waiting.result()
+
+        try:
+            with self._slots:
+                self._count("called")
+                summary = self.backend(text)
+            if not summary or not summary.strip():
+                raise ModelCallError("Empty summary returned")
+        except Exception as e:
+            self._count("failed")
+            error = e if isinstance(e, SummarizationError) else ModelCallError(str(e))
+            mine.set_exception(error)
+            raise error from None
+        else:
+            mine.set_result(summary)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+        # The cache is only a shortcut: a failed write must not cost us the summary
+        try:
+            self.cache.put(key, self.model, summary)
+        except Exception as e:
+            print(f"Summary cache write failed: {e}")
+        return summary
+
+    def summarize_many(self, texts: List[str]) -> List[Union[str, SummarizationError]]:
+        """Summaries in the same order; failed items are SummarizationError objects."""
+        def one(text):
+            try:
+                return self.summarize(text)
+            except SummarizationError as e:
+                return e
+        return list(self._pool.map(one, texts))
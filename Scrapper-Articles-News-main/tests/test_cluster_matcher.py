@@ -0,0 +1,138 @@
+"""
+ClusterMatcher (the literal prefilter) and classify_batch must score exactly
+like the reference per-term loop (`classify_article` with the plain dict of
+compiled patterns).
+"""
+
+import random
+import re
+
+import pytest
+
+import cluster_matcher
+from cluster_matcher import ClusterMatcher, classify_article, classify_batch, compile_patterns, fold
+
+CLUSTERS = {
+    "Aviation": ["airport", "air india", "ai", "udan", "a.i.", "jet"],
+    "Tobacco": ["e-cigarette", "heat-not-burn", "nicotine pouch", "smoke-free", "cigarette"],
+    "Cities": ["istanbul", "İstanbul", "iran", "ıran", "new delhi", "strasse", "ß", "kelvin"],
+    "Overlaps": ["aa", "aaa", "ai", "air", "c++", "u.s."],
+}
+
+
+@pytest.fixture(scope="module")
+def compiled():
+    return compile_patterns(CLUSTERS)
+
+
+@pytest.fixture(scope="module")
+def matcher(compiled):
+    return ClusterMatcher(compiled)
+
+
+def same(compiled, matcher, title="", source="", link="", body=""):
+    expected = classify_article(title, source, link, body, compiled)
+    assert classify_article(title, source, link, body, matcher) == expected
+    return expected
+
+
+@pytest.mark.parametrize("text", [
+    # \b at the offsets the prefilter jumps to: inside words, at the edges, next to punctuation
+    "ai", "xai", "aix", "said the AI", "AI-led", "(AI)", "_ai_", "ai.", "mail air jail",
+    "airport airports", "an airport,airport", "jetjet jet", "jet_set jet-set",
+    # case folding: dotted/dotless i, sharp s, long s, Kelvin sign
+    "İSTANBUL and istanbul", "Istanbul", "ISTANBUL", "İran IRAN ıran Iran",
+    "Straße strasse STRASSE", "ß ẞ ss", "ſtrasse", "Kelvin KELVIN kelvin",
+    "AİR İNDİA", "aır ındıa",
+    # overlapping and nested terms
+    "aaaa", "aaa aa a", "aaaaaaa", "air india airport", "c++ c+ c", "u.s. u.s u s",
+    # flexible spelling and multi-word terms
+    "e-cigarette e cigarette ecigarette E-CIGARETTES", "heat not burn heat-not-burn heatnotburn",
+    "Nicotine Pouches", "smoke free smoke-free", "New Delhi new  delhi NEW DELHI",
+    "", "   ",
+])
+def test_fields_score_like_the_reference(compiled, matcher, text):
+    same(compiled, matcher, title=text, source=text.upper(), link=text.replace(" ", "-"), body=text)
+
+
+def test_url_and_body_are_scored(compiled, matcher):
+    primary, score, scores = same(compiled, matcher, title="Budget news", link="https://x.com/udan-airport",
+                                  body="The new airport opened.")
+    assert primary == "Aviation" and scores["Aviation"] == 0.5 * 2 + 4.0 * 1
+
+
+def test_ties_go_to_the_first_cluster_by_name(compiled, matcher):
+    # "ai" is in two clusters: both score the same, "Aviation" < "Overlaps"
+    primary, _, scores = same(compiled, matcher, title="ai")
+    assert scores["Aviation"] == scores["Overlaps"] and primary == "Aviation"
+
+
+def test_fold_keeps_offsets():
+    # The prefilter maps folded offsets back onto the original text
+    text = "İstanbul ſtraße Kelvin ıran"
+    assert len(fold(text)) == len(text)
+
+
+def test_random_texts_match_the_reference(compiled, matcher):
+    pieces = ["ai", "AI", "aa", "a", "İ", "ı", "ß", "ss", "ſ", "K", "-", "_", " ", ".", "x", "air",
+              "india", "port", "jet", "e cigarette", "ecig", "arette", "İstanbul", "ISTANBUL", "Iran",
+              "ıran", "u.s.", "c++", "strasse", "kelvin", "new  delhi", "é", "1"]
+    rnd = random.Random(7)
+    for _ in range(3000):
+        text = "".join(rnd.choice(pieces) for _ in range(rnd.randint(0, 14)))
+        same(compiled, matcher, title=text, source=text[::-1], link=text, body=text * 2)
+
+
+def test_terms_without_a_literal_always_run():
+    compiled = {"Odd": [re.compile(r"\d{4}", re.IGNORECASE), re.compile(r"(foo|bar)s?", re.IGNORECASE)]}
+    matcher = ClusterMatcher(compiled)
+    for text in ("in 2024 and 1999", "FOOS and bars", "nothing"):
+        assert classify_article(text, "", "", text, matcher) == classify_article(text, "", "", text, compiled)
+
+
+# ---------- classify_batch ----------
+def expected_columns(compiled, articles):
+    """What app.py builds from classify_article, one article at a time."""
+    primary, relevance, matched = [], [], []
+    for title, source, link, body in articles:
+        p, s, scores = classify_article(title, source, link, body, compiled)
+        primary.append(p)
+        relevance.append(s)
+        matched.append([k for k, _ in sorted(scores.items(), key=lambda kv: kv[1], reverse=True)])
+    return {"PrimaryCluster": primary, "RelevanceScore": relevance, "MatchedClusters": matched}
+
+
+def random_articles(n, seed=3):
+    words = ["airport", "ai", "AI", "jet", "udan", "cigarette", "e-cigarette", "ISTANBUL", "İran", "strasse",
+             "aaa", "aa", "c++", "u.s.", "new delhi", "news", "the", "said", "market", "ſtrasse", "Kelvin"]
+    rnd = random.Random(seed)
+
+    def text(k):
+        return " ".join(rnd.choice(words) for _ in range(k))
+    return [(text(6), rnd.choice(["Reuters", "AI Daily", "Jet News", ""]),
+             "https://example.com/" + text(3).replace(" ", "-"), text(rnd.randint(0, 60))) for _ in range(n)]
+
+
+def test_batch_matches_one_by_one(compiled, matcher):
+    articles = random_articles(400)
+    assert classify_batch(*zip(*articles), matcher, workers=1) == expected_columns(compiled, articles)
+
+
+def test_batch_ties_and_empty_rows(compiled, matcher):
+    articles = [
+        ("ai", "", "", ""),                  # Aviation and Overlaps tie: first by name wins
+        ("", "", "", "jet aaa"),             # in the body: Aviation (jet) and Overlaps (aaa) tie at 4.0
+        ("aa", "", "", "istanbul"),          # different clusters, different scores
+        ("nothing here", "", "", "at all"),  # no match at all
+        ("", "", "", ""),
+    ]
+    got = classify_batch(*zip(*articles), matcher, workers=1)
+    assert got == expected_columns(compiled, articles)
+    assert got["PrimaryCluster"][:2] == ["Aviation", "Aviation"]
+    assert got["PrimaryCluster"][3:] == [None, None] and got["MatchedClusters"][3] == []
+
+
+def test_batch_in_worker_processes_matches(compiled, matcher, monkeypatch):
+    monkeypatch.setattr(cluster_matcher, "PARALLEL_MIN_TEXTS", 50)
+    articles = random_articles(120, seed=5)
+    assert classify_batch(*zip(*articles), matcher, workers=2) == expected_columns(compiled, articles)
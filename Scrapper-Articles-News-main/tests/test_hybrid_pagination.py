@@ -0,0 +1,139 @@
+"""
+Concurrent pagination in hybrid_news_fetcher.py, against a local stub of the
+provider APIs (aiohttp test server): page order, one shared session, the
+NewsAPI free-plan cap and cache-only serving.
+"""
+
+import asyncio
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from api_budget import ResponseCache, UsageLedger
+from hybrid_news_fetcher import HybridNewsFetcher
+
+TOTAL = 40     # GNews results the stub reports (4 pages of 10)
+
+
+class StubProviders:
+    """Fake NewsAPI/GNews endpoints that log every request."""
+
+    def __init__(self, delays=None, newsapi_total=500):
+        self.delays = delays or {}
+        self.newsapi_total = newsapi_total
+        self.requests = []   # (provider, page, client port)
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get("/gnews", self.gnews)
+        app.router.add_get("/newsapi", self.newsapi)
+        return app
+
+    def _log(self, provider, request):
+        page = int(request.query.get("page", 1))
+        self.requests.append((provider, page, request.transport.get_extra_info("peername")[1]))
+        return page
+
+    async def gnews(self, request):
+        page = self._log("GNews", request)
+        await asyncio.sleep(self.delays.get(page, 0))
+        articles = [{"title": f"GNews story {page}-{i}", "url": f"https://g.example/{page}/{i}",
+                     "source": {"name": f"Outlet {i}"}} for i in range(10)]
+        return web.json_response({"totalArticles": TOTAL, "articles": articles})
+
+    async def newsapi(self, request):
+        page = self._log("NewsAPI", request)
+        articles = [{"title": f"NewsAPI story {page}-{i}", "url": f"https://n.example/{page}/{i}",
+                     "source": {"name": "Wire"}} for i in range(int(request.query["pageSize"]))]
+        return web.json_response({"totalResults": self.newsapi_total, "articles": articles})
+
+
+def make_fetcher(tmp_path, server, **kwargs):
+    db = str(tmp_path / "budget.sqlite")
+    fetcher = HybridNewsFetcher(endpoints={"GNews": str(server.make_url("/gnews")),
+                                           "NewsAPI": str(server.make_url("/newsapi"))},
+                                ledger=UsageLedger(db), cache=ResponseCache(db), **kwargs)
+    fetcher.gnews_key = fetcher.newsapi_key = "test-key"
+    return fetcher
+
+
+def run_with_stub(stub, work):
+    async def main():
+        async with TestServer(stub.app()) as server:
+            return await work(server)
+    return asyncio.run(main())
+
+
+def test_first_page_first_then_pages_as_they_arrive(tmp_path):
+    # Page 2 is the slowest, so it should come out last
+    stub = StubProviders(delays={2: 0.3, 3: 0.1})
+
+    async def work(server):
+        async with make_fetcher(tmp_path, server, max_pages=4) as fetcher:
+            return [page async for page in fetcher.iter_gnews("ai", max_articles=40)]
+
+    pages = run_with_stub(stub, work)
+    order = [int(page[0]["headline"].split()[-1].split("-")[0]) for page in pages]
+    assert order[0] == 1
+    assert sorted(order) == [1, 2, 3, 4]
+    assert order[-1] == 2
+    # Pages 2-4 were requested together, not one after another
+    assert [p for _, p, _ in stub.requests][0] == 1 and len(stub.requests) == 4
+
+
+def test_pages_beyond_the_total_are_not_requested(tmp_path):
+    stub = StubProviders()
+
+    async def work(server):
+        async with make_fetcher(tmp_path, server, max_pages=10) as fetcher:
+            return [page async for page in fetcher.iter_gnews("ai", max_articles=1000)]
+
+    pages = run_with_stub(stub, work)
+    assert len(pages) == TOTAL // 10
+    assert sorted(p for _, p, _ in stub.requests) == [1, 2, 3, 4]
+
+
+def test_one_session_is_reused_across_pages_and_queries(tmp_path):
+    stub = StubProviders(delays={2: 0.05, 3: 0.05, 4: 0.05})
+
+    async def work(server):
+        async with make_fetcher(tmp_path, server, max_pages=4, page_concurrency=2) as fetcher:
+            session = fetcher._session
+            for query in ("ai", "chips", "space"):
+                await fetcher.fetch_all_sources(query, page_limits={"GNews": 4})
+            assert fetcher._session is session
+
+    run_with_stub(stub, work)
+    ports = {port for _, _, port in stub.requests}
+    assert len(stub.requests) == 12
+    # Keep-alive connections are reused: never more than the page slots allow
+    assert len(ports) <= 2
+
+
+def test_newsapi_free_plan_cap_stops_after_100_results(tmp_path):
+    stub = StubProviders(newsapi_total=500)
+
+    async def work(server):
+        async with make_fetcher(tmp_path, server, max_pages=3) as fetcher:
+            articles = [a async for page in fetcher.iter_newsapi("ai", max_articles=300) for a in page]
+            return articles, fetcher.page_limit("NewsAPI")
+
+    articles, limit = run_with_stub(stub, work)
+    assert limit == 1
+    assert len(articles) == 100
+    assert [(provider, page) for provider, page, _ in stub.requests] == [("NewsAPI", 1)]
+
+
+def test_no_pages_allotted_serves_cached_pages_only(tmp_path):
+    stub = StubProviders()
+
+    async def work(server):
+        async with make_fetcher(tmp_path, server, max_pages=2) as fetcher:
+            first = [a async for page in fetcher.iter_gnews("ai", max_articles=20) for a in page]
+            sent = len(stub.requests)
+            again = [a async for page in fetcher.iter_gnews("ai", max_articles=20, max_pages=0) for a in page]
+            return first, again, sent
+
+    first, again, sent = run_with_stub(stub, work)
+    assert len(stub.requests) == sent == 2
+    assert sorted(a["url"] for a in again) == sorted(a["url"] for a in first)
@@ -0,0 +1,40 @@
+"""
+JobRunner cleanup: a job's `on_forget` callbacks run once the runner drops
+it from memory, so a search's temporary text file doesn't outlive it.
+"""
+
+import os
+import time
+
+from job_runner import JobRunner
+from text_store import FullTextStore, load_text
+
+
+def wait_done(runner, job_id):
+    for _ in range(200):
+        if runner.status(job_id)["status"] in ("done", "failed", "cancelled"):
+            return
+        time.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+def test_forgotten_job_closes_its_temporary_store(tmp_path):
+    runner = JobRunner(workers=1, root=str(tmp_path), keep=1)
+    stores = []
+
+    def search(job):
+        store = FullTextStore()
+        job.on_forget(store.close)
+        stores.append(store)
+        return [store.put("body")]
+
+    first = runner.submit(search)
+    wait_done(runner, first)
+    ref = runner.results(first)[0]
+    assert load_text(ref) == "body"
+
+    second = runner.submit(search)
+    wait_done(runner, second)
+    # Only `keep=1` job stays in memory: the first one's text file is gone
+    assert not os.path.exists(stores[0].path) and load_text(ref) == ""
+    assert os.path.exists(stores[1].path)
@@ -0,0 +1,126 @@
+"""
+SourceCoordinator with fake sources: one dedupe stage for everything,
+the NewsAPI copy wins over other copies of the same story, and the API
+sources keep to the `days` window.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from article_record import Article
+from news_sources import HybridProviderSource, NewsSource, SourceCoordinator
+
+STORY = "Airline orders fifty new jets for regional routes"
+
+
+class FakeSource(NewsSource):
+    def __init__(self, name, batches, delay=0.0):
+        super().__init__()
+        self.name = name
+        self.batches = batches
+        self.delay = delay
+
+    async def stream(self, query, days):
+        for batch in self.batches:
+            await asyncio.sleep(self.delay)
+            yield [Article(title=t, source=s, link=f"https://{self.name}.example/{i}")
+                   for i, (t, s) in enumerate(batch)]
+
+
+def run(sources):
+    async def main():
+        async with SourceCoordinator(sources) as coordinator:
+            return await coordinator.run("jets"), coordinator.stats
+    return asyncio.run(main())
+
+
+def test_news_source_must_implement_stream():
+    with pytest.raises(TypeError):
+        NewsSource()
+
+
+def test_newsapi_copy_replaces_an_earlier_copy():
+    rss = FakeSource("Google News RSS", [[(f"{STORY} - Reuters", "Reuters"), ("Something else entirely today", "AP")]])
+    api = FakeSource("NewsAPI", [[(STORY, "Reuters")]], delay=0.05)
+    result, stats = run([rss, api])
+    assert len(result) == 2
+    first = result[0]
+    assert first.api_source == "NewsAPI" and first.link == "https://NewsAPI.example/0"
+    assert stats["NewsAPI"]["kept"] == 1 and stats["Google News RSS"]["kept"] == 1
+
+
+def test_earlier_newsapi_copy_is_kept():
+    api = FakeSource("NewsAPI", [[(STORY, "Reuters")]])
+    gnews = FakeSource("GNews", [[(STORY, "Reuters")]], delay=0.05)
+    result, stats = run([api, gnews])
+    assert [a.api_source for a in result] == ["NewsAPI"]
+    assert stats["GNews"] == {"fetched": 1, "kept": 0}
+
+
+class FakeScheduler:
+    """Grants whatever it is allowed to (10 pages), remembering each cap."""
+
+    def __init__(self):
+        self.caps = []
+
+    def allocate(self, provider, api_key, queued, max_pages=None):
+        self.caps.append(max_pages)
+        return {queued[0][0]: min(10, max_pages or 10)}
+
+
+class FakeFetcher:
+    """Just enough of HybridNewsFetcher for HybridProviderSource."""
+
+    max_pages = 5
+
+    def __init__(self):
+        self.limiters = {}
+        self.calls = []
+        self.pages = []
+        self.scheduler = FakeScheduler()
+
+    def _api_key(self, provider):
+        return "key"
+
+    def page_limit(self, provider):
+        return self.max_pages
+
+    async def iter_newsdata(self, query, max_articles, pages):
+        self.calls.append(("NewsData", None))
+        self.pages.append(pages)
+        now = time.time()
+        yield [{"headline": "fresh", "url": "https://a.example/1", "published_ts": now - 3600},
+               {"headline": "old", "url": "https://a.example/2", "published_ts": now - 10 * 86400},
+               {"headline": "undated", "url": "https://a.example/3"}]
+
+    async def iter_gnews(self, query, max_articles, pages, days):
+        self.calls.append(("GNews", days))
+        yield []
+
+
+def test_api_sources_keep_to_the_days_window():
+    fetcher = FakeFetcher()
+
+    async def collect(provider):
+        source = HybridProviderSource(provider, fetcher)
+        return [a.title async for batch in source.stream("jets", 2) for a in batch]
+
+    assert asyncio.run(collect("NewsData")) == ["fresh", "undated"]
+    assert asyncio.run(collect("GNews")) == []
+    assert ("GNews", 2) in fetcher.calls
+
+
+def test_page_limit_caps_what_the_scheduler_may_grant():
+    fetcher = FakeFetcher()
+
+    async def drain(source):
+        return [batch async for batch in source.stream("jets", 2)]
+
+    asyncio.run(drain(HybridProviderSource("NewsData", fetcher, page_limit=2)))
+    asyncio.run(drain(HybridProviderSource("NewsData", fetcher, page_limit=50)))
+    asyncio.run(drain(HybridProviderSource("NewsData", fetcher)))
+    # Our cap wins when lower; the fetcher's own limit (5) otherwise
+    assert fetcher.scheduler.caps == [2, 5, 5]
+    assert fetcher.pages == [2, 5, 5]
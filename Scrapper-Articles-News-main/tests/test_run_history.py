@@ -0,0 +1,115 @@
+"""
+RunHistory housekeeping: listing one app's runs, and compacting the text
+file so deleted runs and unsaved searches stop taking space.
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from run_history import RunHistory  # noqa: E402
+
+BODY = "The quick brown fox jumps over the lazy dog. " * 200
+
+
+def save(history, query, app, n=20):
+    rows = [{"Headline": f"{query} {i}", "Article": f"{BODY} {query} {i}"} for i in range(n)]
+    return history.save(rows, query, app, text_field="Article")
+
+
+def test_app_filter_applies_before_the_limit(tmp_path):
+    history = RunHistory(str(tmp_path))
+    save(history, "old app run", "app")
+    for i in range(3):
+        save(history, f"app2 run {i}", "app2")
+    assert [r["query"] for r in history.list_runs(limit=1, app="app")] == ["old app run"]
+    assert len(history.list_runs(limit=2, app="app2")) == 2
+
+
+def test_compact_keeps_saved_bodies_and_frees_the_rest(tmp_path):
+    history = RunHistory(str(tmp_path))
+    kept = save(history, "kept", "app")
+    gone = save(history, "gone", "app")
+    unsaved = history.texts.put(BODY + " never saved")   # e.g. a cancelled app2 search
+    expected = history.load(kept, with_text="Article")
+    history.delete(gone)
+
+    assert history.compact(min_waste=0.9)["bytes_after"] == history.compact(min_waste=0.9)["bytes_before"]
+    stats = history.compact()
+    assert stats["texts"] == 20 and stats["bytes_after"] < stats["bytes_before"] / 2
+    assert history.load(kept, with_text="Article") == expected
+    # Refs handed out before keep working in this process
+    assert history.full_text(unsaved).endswith("never saved")
+    # The old file stays while this process may still use it...
+    history.compact()
+    assert os.path.exists(tmp_path / "texts.blob")
+    # ...and after a restart the next compaction removes it
+    history.close()
+    restarted = RunHistory(str(tmp_path))
+    restarted.compact()
+    assert not os.path.exists(tmp_path / "texts.blob")
+    assert restarted.load(kept, with_text="Article") == expected
+
+
+def save_runs_in_another_process(root, n, started):
+    """Like app2: bodies go into the text file first, the run is saved afterwards."""
+    history = RunHistory(root)
+    started.set()
+    for i in range(n):
+        rows = [{"title": f"other {i} {j}", "text_ref": history.texts.put(f"{BODY} other {i} {j}")}
+                for j in range(10)]
+        history.save(rows, f"other {i}", "app2")
+    history.close()
+
+
+def test_compact_while_another_process_saves(tmp_path):
+    import multiprocessing
+
+    root = str(tmp_path)
+    history = RunHistory(root)
+    for i in range(5):
+        save(history, f"mine {i}", "app")
+    ctx = multiprocessing.get_context("spawn")
+    started = ctx.Event()
+    saver = ctx.Process(target=save_runs_in_another_process, args=(root, 40, started))
+    saver.start()
+    started.wait(30)
+    # Keep compacting (and "restarting") while the other process saves
+    while saver.is_alive():
+        for run in history.list_runs(app="app")[:1]:
+            history.delete(run)
+        save(history, "mine again", "app")
+        history.compact()
+        history.close()
+        history = RunHistory(root)
+    saver.join()
+    assert saver.exitcode == 0
+
+    history.compact()
+    others = history.list_runs(limit=None, app="app2")
+    assert len(others) == 40
+    for run in history.list_runs(limit=None):
+        rows = history.load(run, columns=["Headline", "title", "text_ref"])
+        for row in rows:
+            name = row.get("title") or row.get("Headline")
+            assert history.full_text(row["text_ref"]).endswith(name), run["query"]
+
+
+def test_text_file_still_written_elsewhere_is_not_deleted(tmp_path):
+    root = str(tmp_path)
+    other = RunHistory(root)              # e.g. app2, still scraping into texts.blob
+    unsaved = other.texts.put(BODY + " scraped, not saved yet")
+    history = RunHistory(root)
+    save(history, "mine", "app")
+    history.compact()                     # moves to a new file
+    history.close()
+    restarted = RunHistory(root)
+    restarted.compact()                   # texts.blob: no saved run uses it, but `other` does
+    assert os.path.exists(tmp_path / "texts.blob")
+    saved = other.save([{"title": "late", "text_ref": unsaved}], "late", "app2")
+    assert restarted.full_text(restarted.load(saved)[0]["text_ref"]).endswith("not saved yet")
+    other.close()
+    restarted.compact()
+    assert not os.path.exists(tmp_path / "texts.blob")
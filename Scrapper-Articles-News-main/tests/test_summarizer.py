@@ -0,0 +1,105 @@
+"""
+SummarizationService keeps its contract: every failure comes out as a
+SummarizationError (never a raw exception), and the cache is best-effort.
+"""
+
+import sqlite3
+import threading
+
+import pytest
+
+from summarizer import ModelCallError, SummarizationError, SummarizationService, SummaryCache
+
+TEXT = "The central bank kept rates unchanged on Thursday. Markets rose after the decision."
+
+
+class BrokenCache(SummaryCache):
+    def __init__(self, path, fail_get=False, fail_put=False):
+        super().__init__(path)
+        self.fail_get, self.fail_put = fail_get, fail_put
+
+    def get(self, key):
+        if self.fail_get:
+            raise sqlite3.OperationalError("database is locked")
+        return super().get(key)
+
+    def put(self, key, model, summary):
+        if self.fail_put:
+            raise sqlite3.OperationalError("disk I/O error")
+        super().put(key, model, summary)
+
+
+def service(tmp_path, backend, **cache_flags):
+    return SummarizationService(backend, model="test", cache=BrokenCache(str(tmp_path / "s.sqlite"), **cache_flags))
+
+
+def test_backend_crash_becomes_model_call_error(tmp_path):
+    def backend(text):
+        raise RuntimeError("worker died")
+    with pytest.raises(ModelCallError, match="worker died"):
+        service(tmp_path, backend).summarize(TEXT)
+
+
+def test_cache_read_failure_is_a_summarization_error(tmp_path):
+    with pytest.raises(SummarizationError, match="database is locked"):
+        service(tmp_path, lambda text: "summary", fail_get=True).summarize(TEXT)
+
+
+def test_failed_cache_write_still_returns_the_summary(tmp_path):
+    svc = service(tmp_path, lambda text: "Rates unchanged.", fail_put=True)
+    assert svc.summarize(TEXT) == "Rates unchanged."
+    assert svc.stats["failed"] == 0
+
+
+def test_stats_add_up_across_threads(tmp_path):
+    svc = service(tmp_path, lambda text: "summary")
+    svc.summarize(TEXT)
+    threads = [threading.Thread(target=lambda: [svc.summarize(TEXT) for _ in range(200)]) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert svc.stats["cached"] == 1600 and svc.stats["called"] == 1
+
+
+# ---------- app.py's summarize step ----------
+def test_summary_or_error_never_raises(tmp_path):
+    from summarizer import summary_or_error
+
+    def backend(text):
+        raise KeyError("summary_text")
+    summary, error = summary_or_error(service(tmp_path, backend).summarize, TEXT)
+    assert summary == "" and isinstance(error, ModelCallError)
+
+    def escapes(text):
+        raise sqlite3.OperationalError("database is locked")
+    summary, error = summary_or_error(escapes, TEXT)
+    assert summary == "" and isinstance(error, ModelCallError) and "OperationalError" in str(error)
+
+
+def test_pipeline_finishes_every_job_when_the_backend_crashes(tmp_path):
+    from concurrent.futures import Future
+
+    from article_pipeline import ArticlePipeline
+    from summarizer import summary_or_error
+
+    def backend(text):
+        if "crash" in text:
+            raise ValueError("tokenizer blew up")
+        return "fine"
+    svc = service(tmp_path, backend)
+
+    def summarize_step(job):   # as in app.py
+        job["summary"], job["summary_error"] = summary_or_error(svc.summarize, job["article"])
+        job["summary_done"].set_result((job["summary"], job["summary_error"]))
+
+    def gate(job):
+        job["summary_done"] = Future()
+        return "summarize"
+
+    jobs = [{"article": f"{TEXT} {word}"} for word in ("crash", "ok", "crash again", "ok again")]
+    pipeline = ArticlePipeline(lambda job: None, lambda job: None, summarize_step)
+    done = list(pipeline.run(jobs, gate))
+    assert len(done) == 4 and all("error" not in job for job in done)
+    assert sorted(job["summary"] for job in done) == ["", "", "fine", "fine"]
+    assert sum(isinstance(job["summary_error"], ModelCallError) for job in done) == 2
@@ -0,0 +1,202 @@
+"""
+Compressed Full-Text Store
+Scraped article bodies are by far the heaviest part of a search result.
+Keeping 5,000 of them inside `st.session_state` for every connected user
+quickly fills the container's memory.
+
+This file keeps them on disk instead:
+- Each text is compressed (zstd if installed, zlib otherwise) and appended
+  to one file per store.
+- The article only keeps a tiny "ticket" string (a text ref) that says where
+  its text lives.
+- When someone actually opens the article (or exports), we read the file
+  through mmap and decompress just that one text.
+
+A store made without a path is temporary: its file is deleted when it is
+closed (or when the program exits). app2 gives each search without a run
+history its own temporary store, closed when the job runner forgets the
+search (job_runner.py).
+"""
+
+import atexit
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+import uuid
+import zlib
+from collections import OrderedDict
+from typing import Optional
+
+try:
+    import zstandard as _zstd
+except ImportError:  # zstd is optional, zlib is always there
+    _zstd = None
+
+# Every open store, so a text ref can find its store again.
+_STORES = {}
+_STORES_LOCK = threading.Lock()
+
+
+def store_id_for(path: str) -> str:
+    # Stable id per file, so a store re-opened later (e.g. from run history)
+    # still understands the refs that were handed out before.
+    return hashlib.blake2b(os.path.abspath(path).encode("utf-8"), digest_size=6).hexdigest()
+
+
+class FullTextStore:
+    """Append-only compressed text blocks, read back lazily by ref."""
+
+    def __init__(self, path: Optional[str] = None, cache_size: int = 32):
+        self.temporary = path is None
+        self.codec = "z" if _zstd is not None else "d"
+        self._lock = threading.Lock()
+        self._reader = None
+        self._map = None
+        # A few recently opened texts stay decompressed (re-opening an expander is free).
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._open(path if path is not None else _temporary_path())
+
+    def _open(self, path: str):
+        """Start writing to `path` and register under its store id."""
+        self.path = os.path.abspath(path)
+        self.store_id = store_id_for(self.path)
+        # Unbuffered append: each block is one write() at the current end of file
+        self._writer = open(self.path, "ab", buffering=0)
+        with _STORES_LOCK:
+            _STORES[self.store_id] = self
+
+    def _release(self):
+        """Close the file handles and forget the store id (call with the lock held)."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+        self._writer.close()
+        self._cache.clear()
+        with _STORES_LOCK:
+            if _STORES.get(self.store_id) is self:
+                del _STORES[self.store_id]
+
+    # --- WRITING ---
+    def _compress(self, data: bytes) -> bytes:
+        if self.codec == "z":
+            return _zstd.ZstdCompressor(level=3).compress(data)
+        return zlib.compress(data, 6)
+
+    def _append(self, block: bytes) -> int:
+        # Another process may append to the same file (both apps share the run
+        # history), so the offset is taken from where our write ended, not
+        # from where the file ended before it.
+        with self._lock:
+            self._writer.write(block)
+            return self._writer.tell() - len(block)
+
+    def put(self, text: str) -> str:
+        """Store one text and return its ref ("store:codec:offset:length")."""
+        block = self._compress((text or "").encode("utf-8"))
+        return f"{self.store_id}:{self.codec}:{self._append(block)}:{len(block)}"
+
+    def copy_from(self, source: "FullTextStore", ref: str) -> str:
+        """Copy one text from `source` as it is (still compressed); returns its ref here."""
+        _, codec, offset, length = ref.split(":")
+        block = source._read_block(int(offset), int(length))
+        return f"{self.store_id}:{codec}:{self._append(block)}:{len(block)}"
+
+    # --- READING ---
+    def _read_block(self, offset: int, length: int) -> bytes:
+        with self._lock:
+            end = offset + length
+            if self._map is None or end > len(self._map):
+                # The file grew since we last mapped it: map it again.
+                if self._map is not None:
+                    self._map.close()
+                if self._reader is None:
+                    self._reader = open(self.path, "rb")
+                self._map = mmap.mmap(self._reader.fileno(), 0, access=mmap.ACCESS_READ)
+            return self._map[offset:end]
+
+    def get(self, ref: str) -> str:
+        # The store is shared by every session and job thread: cache work happens under the lock
+        with self._lock:
+            text = self._cache.get(ref)
+            if text is not None:
+                self._cache.move_to_end(ref)
+                return text
+        _, codec, offset, length = ref.split(":")
+        block = self._read_block(int(offset), int(length))
+        if codec == "z":
+            if _zstd is None:
+                raise RuntimeError("This text was stored with zstd, but zstandard is not installed.")
+            data = _zstd.ZstdDecompressor().decompress(block)
+        else:
+            data = zlib.decompress(block)
+        text = data.decode("utf-8")
+        with self._lock:
+            self._cache[ref] = text
+            self._cache.move_to_end(ref)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return text
+
+    # --- HOUSEKEEPING ---
+    def size_on_disk(self) -> int:
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def close(self, delete: Optional[bool] = None):
+        """Close the file; temporary stores (and `delete=True`) also delete it."""
+        with self._lock:
+            if self._writer.closed:
+                return
+            self._release()
+        if delete if delete is not None else self.temporary:
+            _remove(self.path)
+
+
+def _temporary_path() -> str:
+    return os.path.join(tempfile.gettempdir(), f"news_text_{uuid.uuid4().hex}.blob")
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+@atexit.register
+def _close_temporary_stores():
+    with _STORES_LOCK:
+        stores = [s for s in _STORES.values() if s.temporary]
+    for store in stores:
+        store.close()
+
+
+def open_store(path: str) -> FullTextStore:
+    """Return the open store for `path`, opening it if needed."""
+    with _STORES_LOCK:
+        store = _STORES.get(store_id_for(path))
+    return store if store is not None else FullTextStore(path)
+
+
+def load_text(ref: str) -> str:
+    """Decompress the text behind a ref. Returns '' if its store is gone."""
+    if not ref:
+        return ""
+    with _STORES_LOCK:
+        store = _STORES.get(ref.split(":", 1)[0])
+    if store is None:
+        return ""
+    return store.get(ref)
+
+
+def get_full_text(article) -> str:
+    """Full text of an Article record or a plain dict, wherever it is stored."""
+    text = article.get("full_text")
+    if text:
+        return text
+    return load_text(article.get("text_ref"))
@@ -1,5 +1,5 @@
-import asyncio
 from gdelt_fetcher import fetch_gdelt_simple
+from loop_service import run_async
 from article_scraper import enhance_articles_async
 import time
 
@@ -9,7 +9,7 @@ def main():
     start_time = time.time()
     
     # 1. Fetch Links (Synchronous)
-    # fetch_gdelt_simple handles its own asyncio.run internally, so we call it normally.
+    # fetch_gdelt_simple runs on the shared event loop internally, so we call it normally.
     try:
         raw_articles = fetch_gdelt_simple(keyword, days=3, max_articles=5)
     except Exception as e:
@@ -27,9 +27,9 @@ def main():
     print("\n--- 2. Testing Content Extraction (Scraping) ---")
     
     # 2. Scrape Content (Async)
-    # enhance_articles_async is an async function, so we need a loop for it.
+    # enhance_articles_async is an async function, so it runs on the shared loop too.
     try:
-        enhanced = asyncio.run(enhance_articles_async(raw_articles[:3]))
+        enhanced = run_async(enhance_articles_async(raw_articles[:3]))
     except Exception as e:
         print(f"❌ CRITICAL ERROR in article_scraper: {e}")
         return